@@ -0,0 +1,25 @@
+# Host-side tools for running and checking the game code off-device.
+# Nothing in this package is part of the game on the CircuitPython board;
+# bench.py and capture_shake.py can be copied there by hand to run.
+
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Make the device modules in src/ importable from the host
+SRC_DIR = os.path.join(ROOT_DIR, "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+# Stand-ins for CircuitPython-only modules (board, displayio, neopixel, ...)
+MODULES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "modules")
+
+
+def use_stand_ins():
+    """
+    Put the stand-in hardware modules on sys.path, ahead of anything else,
+    so `import board` and friends resolve to the simulator.
+    """
+    if MODULES_DIR not in sys.path:
+        sys.path.insert(0, MODULES_DIR)
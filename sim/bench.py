@@ -0,0 +1,447 @@
+# Benchmark suite for the per-frame hot paths.
+#
+# Each case puts the game in a known situation, then times one frame of
+# work (or one Display / Lights call) over many iterations and counts the
+# bytes allocated. Results are written as JSON and checked:
+# - allocation per iteration against ALLOC_LIMITS, everywhere
+# - on the board, p95 time against BOARD_LIMITS_US (the 10 ms game tick
+#   budget)
+# - on the host, p50 time against a stored baseline report taken with
+#   the same timing (see compare()): simulated time says little about the
+#   board in absolute terms, but a case that got much slower than it was
+#   is a regression
+#
+# This file is not part of the game and is not in src/. On the device,
+# copy it next to code.py and run it from the REPL:
+#     import bench
+#     bench.main()
+# This builds the real subsystems, so the OLED and LEDs flicker while it
+# runs. Allocation is measured with gc.mem_alloc() while the collector is
+# paused.
+#
+# On the host, sim/benchmark.py runs the same cases in the simulator,
+# with allocation measured through tracemalloc.
+
+import gc
+import time
+from array import array
+
+import config
+from events import EVT_ROTATE_CW, EVT_ROTATE_CCW, EVT_PRESS, EVT_SHAKE, EVT_RELEASE
+from states import MENU, LEVEL_START, WAIT_INPUT, GAME_OVER
+
+# Bytes allocated per iteration, checked on the board and the host
+ALLOC_LIMITS = {
+    "game.MENU idle": 64,
+    "game.MENU rotate": 512,
+    "game.WAIT_INPUT HARD L10 idle": 64,
+    "game.WAIT_INPUT HARD L10 move": 256,
+    "game.WAIT_INPUT -> GAME_OVER": 256,
+    "game.GAME_OVER -> MENU": 256,
+    "display.show_level + refresh": 256,
+    "display.set_countdown + refresh": 128,
+    "display.show_game_over + refresh": 256,
+    # A rainbow step slices a memoryview of the effect table: one small
+    # object on the board, about 250 bytes under CPython's tracemalloc
+    "lights.update": 320,
+}
+
+# p95 time in µs, checked on the board only. Game frames have to fit the
+# 10 ms game tick together with input polling and LEDs. Display cases
+# include the I2C transfer of the refreshed area, which is why a
+# whole-screen change (about 1 KB at 400 kHz) takes longer than a tick:
+# it runs in the display task, between game ticks.
+BOARD_LIMITS_US = {
+    "game.MENU idle": 1000,
+    "game.MENU rotate": 3000,
+    "game.WAIT_INPUT HARD L10 idle": 1500,
+    "game.WAIT_INPUT HARD L10 move": 6000,
+    "game.WAIT_INPUT -> GAME_OVER": 3000,
+    "game.GAME_OVER -> MENU": 3000,
+    "display.show_level + refresh": 16000,
+    "display.set_countdown + refresh": 4000,
+    "display.show_game_over + refresh": 25000,
+    "lights.update": 1000,
+}
+
+# Baseline check: a case regresses when its p50 is more than
+# (1 + tolerance) times the baseline's and at least this many µs slower
+BASELINE_SLACK_US = 200
+
+# Input event that completes each move
+_MOVE_EVENTS = {
+    config.MOVE_CW: EVT_ROTATE_CW,
+    config.MOVE_CCW: EVT_ROTATE_CCW,
+    config.MOVE_PRESS: EVT_PRESS,
+    config.MOVE_SHAKE: EVT_SHAKE,
+}
+
+
+class AllocMeter:
+    """
+    Bytes allocated between start() and stop(), from gc.mem_alloc() with
+    the collector paused (MicroPython frees nothing until a collection,
+    so the difference is everything allocated in between).
+    """
+
+    name = "gc.mem_alloc"
+
+    def __init__(self):
+        self.available = hasattr(gc, "mem_alloc")
+
+    def start(self):
+        if not self.available:
+            return
+        gc.collect()
+        gc.disable()
+        self._base = gc.mem_alloc()
+
+    def stop(self):
+        if not self.available:
+            return 0
+        used = gc.mem_alloc() - self._base
+        gc.enable()
+        return used
+
+
+class Result:
+    """
+    Timing and allocation statistics of one benchmark case.
+
+    Parameters:
+    - name: case name
+    - samples: duration of every iteration in ns
+    - alloc_bytes: bytes allocated per iteration
+    - time_limits: check p95 against BOARD_LIMITS_US
+    """
+
+    def __init__(self, name, samples, alloc_bytes, time_limits=False):
+        self.name = name
+        self.iterations = len(samples)
+        ordered = sorted(samples)
+        n = len(ordered)
+        self.mean_us = sum(ordered) // n // 1000 if n else 0
+        self.p50_us = ordered[n // 2] // 1000 if n else 0
+        self.p95_us = ordered[min(n - 1, n * 95 // 100)] // 1000 if n else 0
+        self.max_us = ordered[-1] // 1000 if n else 0
+        self.alloc_bytes = alloc_bytes
+        self.limit_us = BOARD_LIMITS_US.get(name, 0) if time_limits else 0
+        self.limit_bytes = ALLOC_LIMITS.get(name, 0)
+
+        # Set by compare(): the baseline's p50, and the most this case
+        # may take
+        self.baseline_us = 0
+        self.allowed_us = 0
+
+    @property
+    def passed(self):
+        if self.limit_us and self.p95_us > self.limit_us:
+            return False
+        if self.limit_bytes and self.alloc_bytes > self.limit_bytes:
+            return False
+        if self.allowed_us and self.p50_us > self.allowed_us:
+            return False
+        return True
+
+    def as_dict(self):
+        return {
+            "name": self.name,
+            "iterations": self.iterations,
+            "mean_us": self.mean_us,
+            "p50_us": self.p50_us,
+            "p95_us": self.p95_us,
+            "max_us": self.max_us,
+            "alloc_bytes_per_iter": self.alloc_bytes,
+            "limit_p95_us": self.limit_us,
+            "limit_alloc_bytes": self.limit_bytes,
+            "baseline_p50_us": self.baseline_us,
+            "allowed_p50_us": self.allowed_us,
+            "pass": self.passed,
+        }
+
+
+class Bench:
+    """
+    Runs the benchmark cases against live subsystems.
+
+    Parameters:
+    - inputs, display, lights, game: the subsystems, as built by code.py
+    - meter: allocation meter with start() / stop() (default: AllocMeter)
+    - iterations: timed iterations per case
+    - time_limits: check p95 times against BOARD_LIMITS_US (on the board)
+    """
+
+    def __init__(self, inputs, display, lights, game, meter=None, iterations=200,
+                 time_limits=False):
+        self.inputs = inputs
+        self.display = display
+        self.lights = lights
+        self.game = game
+        self.meter = meter if meter is not None else AllocMeter()
+        self.iterations = iterations
+        self.time_limits = time_limits
+        self.results = []
+        self.dt = 1.0 / config.GAME_RATE_HZ
+        self._overhead_ns = 0
+        self._overhead_bytes = 0
+
+        # Reaction stats are written to a scratch region in RAM, so the
+        # game cases include them without touching the records in NVM
+        if config.STATS_ENABLED and game.stats is None:
+            from stats import Stats, NvmRegion, region_size
+
+            size = region_size(4, 4)
+            game.stats = Stats(NvmRegion(bytearray(size), 0, size))
+
+    # -------------------------------
+    # Measurement
+    # -------------------------------
+
+    def measure(self, name, fn, prepare=None):
+        """
+        Time fn() over the configured iterations. prepare(), if given,
+        runs untimed before each iteration. Returns the Result.
+        """
+        n = self.iterations
+        samples = array("L", [0] * n)
+        meter = self.meter
+        alloc = 0
+        for i in range(n):
+            if prepare is not None:
+                prepare()
+            meter.start()
+            start = time.monotonic_ns()
+            fn()
+            end = time.monotonic_ns()
+            alloc += meter.stop()
+            samples[i] = max(0, end - start - self._overhead_ns)
+
+        per_iter = max(0, alloc // n - self._overhead_bytes)
+        result = Result(name, samples, per_iter, self.time_limits)
+        if name:
+            self.results.append(result)
+        return result
+
+    def calibrate(self):
+        """
+        Measure the cost of the measurement itself (clock reads allocate
+        on the board), to subtract it from every case.
+        """
+        self._overhead_ns = 0
+        self._overhead_bytes = 0
+        empty = self.measure(None, lambda: None)
+        self._overhead_ns = empty.p50_us * 1000
+        self._overhead_bytes = empty.alloc_bytes
+
+    # -------------------------------
+    # Game setup helpers
+    # -------------------------------
+
+    def _frame(self):
+        self.inputs.update()
+        self.game.update(self.dt)
+
+    def _enter_menu(self):
+        self.game.enter(MENU)
+        self.inputs.events.clear()
+        self._frame()
+
+    def _enter_level(self, difficulty="HARD", level=None):
+        game = self.game
+        game.difficulty = difficulty
+        game.level = config.TOTAL_LEVELS if level is None else level
+        game.enter(LEVEL_START)
+        self._frame()
+
+    def _keep_move_alive(self):
+        # Restart the move clock so idle frames never time out
+        if self.game.state != WAIT_INPUT:
+            self._enter_level()
+        self.game.move_start_ns = time.monotonic_ns()
+        self.game.action_cooldown_until_ns = 0
+
+    # -------------------------------
+    # Cases
+    # -------------------------------
+
+    def run(self):
+        """
+        Run every case and return the list of Results.
+        """
+        inputs = self.inputs
+        display = self.display
+        game = self.game
+
+        self.calibrate()
+
+        # Menu: nothing happening, then a rotation every frame (redraw)
+        self._enter_menu()
+        self.measure("game.MENU idle", self._frame)
+
+        def rotate():
+            inputs.inject(EVT_ROTATE_CW, time.monotonic_ns())
+
+        self.measure("game.MENU rotate", self._frame, rotate)
+
+        # Gameplay at the longest sequence: waiting, then one correct move
+        # per frame (HUD update, light change, sometimes a level change)
+        self._enter_level()
+        self.measure("game.WAIT_INPUT HARD L10 idle", self._frame, self._keep_move_alive)
+
+        def correct_move():
+            self._keep_move_alive()
+            if game.seq_index >= game.seq_len - 1:
+                # Stay inside the level so every frame is a plain advance
+                game.seq_index = 0
+            inputs.inject(_MOVE_EVENTS[game.current_move], time.monotonic_ns())
+
+        self.measure("game.WAIT_INPUT HARD L10 move", self._frame, correct_move)
+
+        # Timeout into GAME_OVER, and a press back to the menu
+        def expire():
+            self._keep_move_alive()
+            game.move_start_ns = time.monotonic_ns() - game.per_move_ns - 1
+
+        self.measure("game.WAIT_INPUT -> GAME_OVER", self._frame, expire)
+
+        def over_and_press():
+            game.enter(GAME_OVER)
+            inputs.inject(EVT_RELEASE, time.monotonic_ns())
+            inputs.inject(EVT_PRESS, time.monotonic_ns())
+
+        self.measure("game.GAME_OVER -> MENU", self._frame, over_and_press)
+        inputs.inject(EVT_RELEASE, time.monotonic_ns())
+        self._frame()
+
+        # Display calls on their own, each followed by the frame commit
+        moves = config.ALL_MOVES
+        step = [0]
+
+        def show_level():
+            i = step[0] = step[0] + 1
+            display.show_level(10, "HARD", 15, i % 15, moves[i % len(moves)], 1.0)
+            display.refresh()
+
+        self.measure("display.show_level + refresh", show_level)
+
+        def countdown():
+            i = step[0] = step[0] + 1
+            display.set_countdown(1000 - (i * 37) % 1000, 1000)
+            display.refresh()
+
+        self.measure("display.set_countdown + refresh", countdown)
+
+        def game_over():
+            display.show_game_over()
+            display.refresh()
+
+        self.measure(
+            "display.show_game_over + refresh", game_over,
+            lambda: (display.show_menu("HARD"), display.refresh()),
+        )
+
+        lights = self.lights
+        lights.set_mode("menu")
+        self.measure("lights.update", lambda: lights.update(0.02))
+
+        return self.results
+
+    # -------------------------------
+    # Reporting
+    # -------------------------------
+
+    @property
+    def passed(self):
+        for result in self.results:
+            if not result.passed:
+                return False
+        return True
+
+    def print_table(self):
+        print(
+            "BENCH: name iterations mean_us p50_us p95_us max_us alloc_B"
+            " limit_us limit_B allowed_p50_us pass"
+        )
+        for r in self.results:
+            print(
+                "BENCH:", r.name, r.iterations, r.mean_us, r.p50_us, r.p95_us,
+                r.max_us, r.alloc_bytes, r.limit_us, r.limit_bytes, r.allowed_us,
+                "ok" if r.passed else "FAIL",
+            )
+
+    def report(self, extra=None):
+        """
+        Machine-readable report as a dict (see write_report()).
+        """
+        report = {
+            "meter": self.meter.name,
+            "iterations": self.iterations,
+            "game_tick_us": 1000000 // config.GAME_RATE_HZ,
+            "cases": [r.as_dict() for r in self.results],
+            "pass": self.passed,
+        }
+        if extra:
+            report.update(extra)
+            if "pass" in extra:
+                report["pass"] = self.passed and extra["pass"]
+        return report
+
+
+def compare(bench, baseline, tolerance=0.25):
+    """
+    Check every result against a baseline report (a dict from an earlier
+    report(), taken with the same timing). Returns the number of cases
+    found in the baseline.
+    """
+    cases = {}
+    for case in baseline.get("cases", ()):
+        cases[case["name"]] = case["p50_us"]
+
+    found = 0
+    for result in bench.results:
+        base = cases.get(result.name)
+        if base is None:
+            continue
+        found += 1
+        result.baseline_us = base
+        result.allowed_us = int(result.baseline_us * (1 + tolerance)) + BASELINE_SLACK_US
+    return found
+
+
+def write_report(report, path):
+    """
+    Write a report dict as JSON. Falls back to printing it when the file
+    cannot be written (read-only filesystem on the board).
+    """
+    import json
+
+    try:
+        with open(path, "w") as f:
+            json.dump(report, f)
+    except OSError:
+        print("BENCH: cannot write", path, "- report follows")
+        print(json.dumps(report))
+
+
+def main(iterations=100, path="/bench.json"):
+    """
+    Build the subsystems like code.py does and run every case.
+    """
+    import board
+    from inputs import InputManager
+    from display_ui import Display
+    from lights import Lights
+    from game_engine import Game
+
+    i2c = board.I2C()
+    inputs = InputManager(i2c)
+    display = Display(i2c)
+    lights = Lights()
+    game = Game(inputs, display, lights)
+    display.finish_animation()
+
+    bench = Bench(inputs, display, lights, game, iterations=iterations, time_limits=True)
+    bench.run()
+    bench.print_table()
+    write_report(bench.report(), path)
+    return bench.passed
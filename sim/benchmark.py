@@ -0,0 +1,277 @@
+# Host runner for the benchmark suite in sim/bench.py.
+#
+# Runs every bench case in the simulator with a fixed cost per executed
+# line of game code (--line-us, clock.LineCharge) and I2C transfer time
+# at 400 kHz charged to the virtual clock, so the times are the same on
+# every run and every host. --host-scale charges scaled host CPU time
+# instead. Allocation is measured in a second pass under tracemalloc,
+# so tracing overhead does not distort the timings.
+#
+# It also measures input latency end to end: code.py runs unmodified with
+# the auto player, and each turn or press is timed from the moment the
+# input is physically complete to the game tick that accepts it and to the
+# display refresh that shows the next move. A shake has no such moment
+# (the detector fires partway through it), so shakes are a separate case
+# timed from the start of the shake to the accepting tick.
+#
+# Allocation is checked against bench.ALLOC_LIMITS. Times are checked
+# against a stored baseline report (sim/bench_baseline.json) taken with
+# the same timing and iterations (bench.compare); --save-baseline stores
+# the run as the new baseline.
+#
+# Usage:
+#     python -m sim.benchmark [--iterations 200] [--line-us 3 | --host-scale 50]
+#                             [--latency-seconds 60] [--out /tmp/bench.json]
+#                             [--baseline sim/bench_baseline.json]
+#                             [--tolerance 0.25] [--save-baseline]
+# Exits with status 1 if any case allocates too much or regressed.
+
+import argparse
+import json
+import os
+import tempfile
+import tracemalloc
+
+from sim.runner import Simulator
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+
+
+class NullMeter:
+    name = "none"
+
+    def start(self):
+        pass
+
+    def stop(self):
+        return 0
+
+
+class TraceMeter:
+    """
+    Peak bytes traced by tracemalloc between start() and stop(): memory a
+    frame needed on top of what was already live. CPython frees most
+    temporaries at once, so this is a lower bound of what the board
+    allocates, and the allocating lines are the same.
+    """
+
+    name = "tracemalloc peak"
+
+    def start(self):
+        tracemalloc.reset_peak()
+        self._base = tracemalloc.get_traced_memory()[0]
+
+    def stop(self):
+        return max(0, tracemalloc.get_traced_memory()[1] - self._base)
+
+
+class _NoInput:
+    """
+    Replay source with nothing to replay: InputManager then only sees the
+    events the bench injects, and no simulated hardware runs (and
+    allocates) inside the traced frames.
+    """
+
+    def feed(self, inputs, now_ns):
+        pass
+
+
+def _timing(host_scale, line_us):
+    """
+    Simulator arguments for host time (host_scale > 0) or the line cost.
+    """
+    if host_scale > 0:
+        return {"charge_host": True, "host_scale": host_scale}
+    return {"line_us": line_us}
+
+
+def run_cases(iterations, host_scale, line_us=3.0):
+    """
+    Run the bench cases twice on one simulated board: timed against the
+    simulated hardware, then traced with hardware-free input so only the
+    game's own allocations are counted. Returns the timed Bench with
+    allocation figures merged in.
+    """
+    with Simulator(quiet=True, trace=False, **_timing(host_scale, line_us)) as s:
+        from sim import bench
+        from display_ui import Display
+        from game_engine import Game
+        from inputs import InputManager
+        from lights import Lights
+
+        i2c = s.machine.i2c
+        inputs = InputManager(i2c)
+        display = Display(i2c)
+        lights = Lights()
+        lights.pixels.keep_log = False
+        game = Game(inputs, display, lights)
+        display.finish_animation()
+
+        from contextlib import redirect_stdout
+
+        with redirect_stdout(s.serial):
+            timed = bench.Bench(inputs, display, lights, game, NullMeter(), iterations)
+            timed.run()
+
+            # Rasterising the simulated OLED and the cost model's own
+            # bookkeeping would be counted otherwise
+            s.machine.render = False
+            if s.cost is not None:
+                s.cost.stop()
+            inputs = InputManager(None, _NoInput())
+            game = Game(inputs, display, lights)
+            display.finish_animation()
+            tracemalloc.start()
+            try:
+                traced = bench.Bench(inputs, display, lights, game, TraceMeter(), iterations)
+                traced.run()
+            finally:
+                tracemalloc.stop()
+
+        for t, a in zip(timed.results, traced.results):
+            t.alloc_bytes = a.alloc_bytes
+        timed.meter = traced.meter
+        return timed
+
+
+class _LatencySimulator(Simulator):
+    """
+    Simulator that also logs when the game accepts each move and when
+    the OLED actually receives new pixels.
+    """
+
+    def _trace(self, game):
+        Simulator._trace(self, game)
+        self.progress = []      # (level, seq_index, time_ns) of accepted moves
+        self.refreshes = []     # time_ns of every refresh that sent bytes
+        update = game.update
+        clock = self.clock
+        progress = self.progress
+
+        def traced(dt):
+            before = (game.level, game.seq_index, game.state_name)
+            update(dt)
+            if before[2] != "WAIT_INPUT" or game.state_name == "GAME_OVER":
+                return
+            if (game.level, game.seq_index) != before[:2]:
+                progress.append((before[0], before[1], clock.now_ns))
+
+        game.update = traced
+
+        model = self.display.model
+        refresh = model.refresh
+        refreshes = self.refreshes
+
+        def logged(root):
+            sent = refresh(root)
+            if sent:
+                refreshes.append(clock.now_ns)
+            return sent
+
+        model.refresh = logged
+
+
+def run_latency(seconds, host_scale, seed=0, entry="code.py", line_us=0.0):
+    """
+    Play for seconds of virtual time and return (game_ns, display_ns,
+    shake_ns, slept): latency samples of turns and presses, samples of
+    shakes from their start to the accepting tick, and the share of the
+    time the device slept. Host time is charged, or the line cost when
+    host_scale is 0.
+    """
+    import bisect
+
+    with _LatencySimulator(seed, quiet=True, **_timing(host_scale, line_us)) as s:
+        player = s.autoplay(seed=seed)
+        s.run_main(seconds, entry)
+
+        shake = player.config.MOVE_SHAKE
+        done = {}
+        for level, index, move, input_ns in player.log:
+            done[(level, index)] = (move, input_ns)
+
+        to_game = []
+        to_display = []
+        shakes = []
+        for level, index, accepted_ns in s.progress:
+            move, input_ns = done.get((level, index), (None, None))
+            if input_ns is None or accepted_ns < input_ns:
+                continue
+            if move == shake:
+                shakes.append(accepted_ns - input_ns)
+                continue
+            to_game.append(accepted_ns - input_ns)
+            i = bisect.bisect_left(s.refreshes, accepted_ns)
+            if i < len(s.refreshes):
+                to_display.append(s.refreshes[i] - input_ns)
+        idle = s.clock.slept_ns / max(1, s.virtual_seconds * 1000000000)
+        return to_game, to_display, shakes, idle
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the benchmark suite.")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--line-us", type=float, default=3.0,
+                        help="virtual µs per executed line of game code")
+    parser.add_argument("--host-scale", type=float, default=0.0,
+                        help="charge host time this many times over instead "
+                             "(depends on the host)")
+    parser.add_argument("--latency-seconds", type=float, default=60.0)
+    parser.add_argument("--out", default=os.path.join(tempfile.gettempdir(), "bench.json"))
+    parser.add_argument("--baseline", default=BASELINE_PATH,
+                        help="report to compare times against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown over the baseline (0.25 = 25%%)")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store this run as the baseline instead of comparing")
+    args = parser.parse_args(argv)
+
+    import sim
+
+    sim.use_stand_ins()
+    b = run_cases(args.iterations, args.host_scale, args.line_us)
+    if args.host_scale > 0:
+        timing = "host x%g" % args.host_scale
+    else:
+        timing = "%g us/line" % args.line_us
+
+    from sim import bench
+
+    # Input latency, in the same units as the cases (virtual time with
+    # host time charged)
+    to_game, to_display, shakes, _ = run_latency(
+        args.latency_seconds, args.host_scale, line_us=args.line_us
+    )
+    b.results.append(bench.Result("latency.input_to_game", to_game, 0))
+    b.results.append(bench.Result("latency.input_to_display", to_display, 0))
+    b.results.append(bench.Result("latency.shake_to_game", shakes, 0))
+
+    if not args.save_baseline:
+        found = 0
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+            if (baseline.get("timing"), baseline.get("iterations"),
+                    baseline.get("latency_seconds")) == (
+                    timing, args.iterations, args.latency_seconds):
+                found = bench.compare(b, baseline, args.tolerance)
+        if not found:
+            print("BENCH: no baseline with this timing in", args.baseline,
+                  "- times not checked")
+
+    b.print_table()
+    report = b.report({
+        "timing": timing, "latency_seconds": args.latency_seconds, "platform": "sim",
+    })
+    bench.write_report(report, args.out)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=1, sort_keys=True)
+            f.write("\n")
+        print("BENCH: baseline ->", args.baseline)
+    print("BENCH:", "pass" if report["pass"] else "FAIL", "->", args.out)
+    return 0 if report["pass"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
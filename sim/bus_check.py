@@ -0,0 +1,137 @@
+# Shared I2C bus check for the arbiter in src/bus.py.
+#
+# Plays the game with the auto player while a share of the transfers to
+# the ADXL345 fail, with the arbiter on and off, and reports for each
+# shake mode how many of the player's shakes the game missed (no shake
+# event within half a second), extra shake events, encoder turns the
+# game lost, the I2C errors the bus saw, game overs, and the per-device
+# bus time from the arbiter.
+# Time is charged with the fixed cost model (--line-us, see
+# clock.LineCharge) plus the I2C transfer time, so screen changes hold
+# the bus as they would on the board and every run gives the same
+# counts. Each seed is a different player and fault sequence.
+#
+# Usage:
+#     python -m sim.bus_check [--seconds 120] [--seeds 10]
+#                             [--fault-rate 0.05] [--line-us 3]
+#                             [--host-scale 0] [--modes activity,fifo,poll]
+
+import argparse
+import io
+from contextlib import redirect_stdout
+
+from sim.runner import Simulator
+
+_ACCEL_ADDRESS = 0x53
+
+# A shake counts as seen if an event follows within this time
+_MATCH_NS = 500000000
+
+
+def _missed(performed, events, end_ns):
+    """
+    Moves performed at least _MATCH_NS before end_ns with no event of
+    theirs within _MATCH_NS.
+    """
+    return sum(
+        1 for t in performed
+        if t + _MATCH_NS <= end_ns and not any(t <= e < t + _MATCH_NS for e in events)
+    )
+
+
+def run(seconds, fault_rate, mode, arbiter, seed=0, line_us=3.0, host_scale=0.0):
+    """
+    Returns (shakes performed, shakes missed, extra shake events, turns
+    lost, failed transfers, game overs, bus report lines).
+    """
+    overrides = {"SHAKE_MODE": mode, "BUS_ARBITER": arbiter}
+    with Simulator(
+        seed, charge_host=host_scale > 0, host_scale=host_scale,
+        overrides=overrides, quiet=True, line_us=line_us,
+    ) as s:
+        import inputs
+        from events import EVT_ROTATE_CCW, EVT_ROTATE_CW, EVT_SHAKE
+
+        shakes = []
+        turns = []
+        emit = inputs.InputManager._emit
+
+        def counted(manager, kind, t_ns):
+            if kind == EVT_SHAKE:
+                shakes.append(t_ns)
+            elif kind == EVT_ROTATE_CW or kind == EVT_ROTATE_CCW:
+                turns.append(t_ns)
+            emit(manager, kind, t_ns)
+
+        inputs.InputManager._emit = counted
+
+        # Start failing once the accelerometer is set up
+        s.at(2.0, lambda: s.machine.i2c.faults.__setitem__(_ACCEL_ADDRESS, fault_rate))
+        player = s.autoplay(seed=seed)
+        s.run_main(seconds)
+        end_ns = s.clock.now_ns
+
+        config = s.config
+        performed = [t for _, _, move, t in player.log if move == config.MOVE_SHAKE]
+        turned = [
+            t for _, _, move, t in player.log
+            if move == config.MOVE_CW or move == config.MOVE_CCW
+        ]
+        # Shakes cut off by the end of the run count as neither
+        missed = _missed(performed, shakes, end_ns)
+        extra = sum(
+            1 for e in shakes if not any(t <= e < t + _MATCH_NS for t in performed)
+        )
+        game_overs = sum(1 for _, _, new in s.transitions if new == "GAME_OVER")
+        report = []
+        bus = s.game.display.bus
+        if bus is not None:
+            out = io.StringIO()
+            with redirect_stdout(out):
+                bus.report()
+            report = out.getvalue().splitlines()
+        return (
+            len(performed), missed, extra, _missed(turned, turns, end_ns),
+            s.machine.i2c.failed, game_overs, report,
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check shakes under bus errors.")
+    parser.add_argument("--seconds", type=float, default=120.0)
+    parser.add_argument("--seeds", type=int, default=10)
+    parser.add_argument("--fault-rate", type=float, default=0.05,
+                        help="share of ADXL345 transfers that fail")
+    parser.add_argument("--line-us", type=float, default=3.0,
+                        help="fixed cost per executed line of game code")
+    parser.add_argument("--host-scale", type=float, default=0.0,
+                        help="charge host CPU time instead (not repeatable)")
+    parser.add_argument("--modes", default="activity,fifo,poll")
+    args = parser.parse_args(argv)
+    line_us = 0.0 if args.host_scale > 0 else args.line_us
+
+    print("%-9s %-8s %7s %7s %7s %11s %7s %10s" % (
+        "mode", "arbiter", "shakes", "missed", "extra", "turns lost", "errors", "game overs"))
+    reports = []
+    for mode in args.modes.split(","):
+        for arbiter in (False, True):
+            totals = [0, 0, 0, 0, 0, 0]
+            for seed in range(args.seeds):
+                result = run(
+                    args.seconds, args.fault_rate, mode, arbiter, seed,
+                    line_us, args.host_scale,
+                )
+                for i in range(6):
+                    totals[i] += result[i]
+            print("%-9s %-8s %7d %7d %7d %11d %7d %10d" % (
+                (mode, "on" if arbiter else "off") + tuple(totals)))
+            if result[6]:
+                reports.append((mode, result[6]))
+    for mode, report in reports:
+        print("%s:" % mode)
+        for line in report:
+            print("  " + line)
+
+
+if __name__ == "__main__":
+    main()
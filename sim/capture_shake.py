@@ -0,0 +1,51 @@
+# Device-side recorder for sim/shake_harness.py.
+#
+# Copy this file to the board as code.py (together with src/), open the
+# serial console and log the output to a .csv file. Hold the encoder
+# button down for the whole duration of every intentional shake so the
+# samples are labelled; shake-free periods should include normal handling
+# and desk knocks to measure false positives.
+
+import time
+import board
+import digitalio
+
+import config
+from shake import AccelFifo
+
+
+class _Printer:
+    """
+    Takes the place of ShakeDetector in AccelFifo.drain() and prints
+    every raw sample with the current button label.
+    """
+
+    def __init__(self, button):
+        self.button = button
+
+    def feed(self, x, y, z):
+        print("%d,%d,%d,%d" % (x, y, z, 0 if self.button.value else 1))
+        return False
+
+
+def main():
+    i2c = board.I2C()
+
+    # The Adafruit driver powers the sensor up and sets measure mode
+    from adafruit_adxl34x import ADXL345
+
+    ADXL345(i2c)
+    fifo = AccelFifo(i2c, config.ACCEL_FIFO_RATE)
+
+    button = digitalio.DigitalInOut(config.ENCODER_BUTTON)
+    button.switch_to_input(pull=digitalio.Pull.UP)
+    printer = _Printer(button)
+
+    print("# rate=%d" % config.ACCEL_FIFO_RATE)
+    print("x,y,z,label")
+    while True:
+        fifo.drain(printer)
+        time.sleep(0.05)
+
+
+main()
@@ -0,0 +1,195 @@
+# Virtual clock for running the game faster than real time.
+#
+# The simulator replaces the `time` module seen by the device code with
+# one backed by this clock: sleep() advances virtual time instantly and
+# fires any scripted hardware changes that fall inside the sleep.
+
+import heapq
+import sys
+import time as _host_time
+import types
+
+
+class StopSimulation(Exception):
+    """
+    Raised from sleep() once the run deadline has been reached.
+    """
+
+
+class VirtualClock:
+    """
+    Monotonic nanosecond clock with scheduled callbacks.
+
+    Parameters:
+    - start_ns: initial reading (non-zero, like a board that has been on)
+    - charge_host: also advance virtual time by the host CPU time spent
+      between clock reads, so compute cost shows up in frame timings
+    - host_scale: multiplier for charged host time (e.g. 20 to approximate
+      a microcontroller that is 20x slower than the host)
+    """
+
+    def __init__(self, start_ns=1000000000, charge_host=False, host_scale=1.0):
+        self.now_ns = start_ns
+        self.deadline_ns = None
+        self.charge_host = charge_host
+        self.host_scale = host_scale
+        self._host_last = _host_time.perf_counter_ns()
+        self._timers = []
+        self._seq = 0
+        # Virtual time spent in sleep(), i.e. with the device idle
+        self.slept_ns = 0
+        self.time_module = self._make_time_module()
+
+    # -------------------------------
+    # Readings
+    # -------------------------------
+
+    def _charge(self):
+        if self.charge_host:
+            host = _host_time.perf_counter_ns()
+            self.now_ns += int((host - self._host_last) * self.host_scale)
+            self._host_last = host
+        # Time charged here or by a cost model (LineCharge) has passed
+        # scripted hardware changes, e.g. encoder edges; apply them before
+        # the device reads the clock or its pins
+        self._fire_due()
+
+    def hold(self):
+        """
+        Stop charging host time, e.g. while a device model does work the
+        real hardware would do in parallel. Pair with release().
+        """
+        self._charge()
+
+    def release(self):
+        self._host_last = _host_time.perf_counter_ns()
+
+    def spend(self, ns):
+        """
+        Account device time (such as an I2C transfer) without firing
+        timers, as a blocking call on the board would.
+        """
+        self.now_ns += ns
+
+    def monotonic_ns(self):
+        self._charge()
+        return self.now_ns
+
+    def monotonic(self):
+        return self.monotonic_ns() / 1000000000
+
+    def sleep(self, seconds):
+        self._charge()
+        ns = max(0, int(seconds * 1000000000))
+        self.slept_ns += ns
+        self.advance(ns)
+
+    def sleep_until(self, predicate):
+        """
+        Sleep from timer to timer until predicate() is true, as a board
+        in light sleep waits for a wake-up source. The time counts as
+        slept; raises StopSimulation at the deadline like sleep().
+        """
+        self._charge()
+        while not predicate():
+            if self._timers:
+                target = self._timers[0][0]
+            elif self.deadline_ns is not None:
+                target = self.deadline_ns
+            else:
+                raise RuntimeError("nothing scheduled can end the sleep")
+            ns = max(0, target - self.now_ns)
+            self.slept_ns += ns
+            self.advance(ns)
+        self.release()
+
+    # -------------------------------
+    # Time control
+    # -------------------------------
+
+    def call_at(self, t_ns, fn):
+        """
+        Run fn() when virtual time reaches t_ns.
+        """
+        self._seq += 1
+        heapq.heappush(self._timers, (t_ns, self._seq, fn))
+
+    def call_later(self, seconds, fn):
+        self.call_at(self.now_ns + int(seconds * 1000000000), fn)
+
+    def _fire_due(self):
+        timers = self._timers
+        while timers and timers[0][0] <= self.now_ns:
+            _, _, fn = heapq.heappop(timers)
+            fn()
+
+    def advance(self, ns):
+        """
+        Move time forward by ns, firing timers in order on the way.
+        Raises StopSimulation when the deadline is passed.
+        """
+        target = self.now_ns + max(0, ns)
+        timers = self._timers
+        while timers and timers[0][0] <= target:
+            t_ns, _, fn = heapq.heappop(timers)
+            if t_ns > self.now_ns:
+                self.now_ns = t_ns
+            fn()
+        self.now_ns = target
+        if self.deadline_ns is not None and self.now_ns >= self.deadline_ns:
+            raise StopSimulation()
+
+    def _make_time_module(self):
+        """
+        Build a stand-in `time` module: monotonic(), monotonic_ns() and
+        sleep() use this clock, everything else is the host's time module.
+        """
+        module = types.ModuleType("time")
+        module.__dict__.update(
+            (name, getattr(_host_time, name))
+            for name in dir(_host_time)
+            if not name.startswith("__")
+        )
+        module.monotonic = self.monotonic
+        module.monotonic_ns = self.monotonic_ns
+        module.sleep = self.sleep
+        return module
+
+
+class LineCharge:
+    """
+    Fixed cost model for device code: every executed line of a file
+    under one of the roots advances the clock by ns_per_line. Unlike
+    charging host time, runs are deterministic and the same on any host.
+    Uses sys.settrace, so only one can be active at a time. Timers
+    that fall due fire at the next clock reading, as with charge_host.
+
+    Parameters:
+    - clock: VirtualClock
+    - ns_per_line: virtual time per executed line
+    - roots: directories whose files count as device code
+    """
+
+    def __init__(self, clock, ns_per_line, roots):
+        self.clock = clock
+        self.ns_per_line = ns_per_line
+        self.roots = tuple(roots)
+        self.lines = 0
+
+    def start(self):
+        sys.settrace(self._call)
+
+    def stop(self):
+        sys.settrace(None)
+
+    def _call(self, frame, event, arg):
+        # Only frames of device code are traced line by line
+        if frame.f_code.co_filename.startswith(self.roots):
+            return self._line
+        return None
+
+    def _line(self, frame, event, arg):
+        if event == "line":
+            self.lines += 1
+            self.clock.now_ns += self.ns_per_line
+        return self._line
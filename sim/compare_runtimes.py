@@ -0,0 +1,68 @@
+# Compare the scheduler loop (code.py) with the asyncio variant
+# (code_async.py) in the simulator, with host CPU time charged to the
+# virtual clock:
+# - input latency of turns and presses while the auto player plays,
+#   timed as in sim/benchmark.py from the input being physically complete
+#   to the game tick that accepts it and to the OLED refresh that shows
+#   the next move
+# - busy share (100% minus the time asleep) while playing, and while the
+#   menu sits untouched after start-up has finished
+#
+# Usage:
+#     python -m sim.compare_runtimes [--host-scale 50] [--seconds 60]
+#                                    [--idle-seconds 10]
+
+import argparse
+
+from sim.runner import Simulator
+from sim.benchmark import run_latency
+
+ENTRIES = ("code.py", "code_async.py")
+
+# Virtual seconds left for boot and the splash before idle is measured
+_SETTLE_SECONDS = 3.0
+
+
+def run_idle(seconds, host_scale, entry):
+    """
+    Busy share of seconds of virtual time with nobody touching the board.
+    """
+    with Simulator(charge_host=True, host_scale=host_scale, quiet=True, trace=False) as s:
+        clock = s.clock
+        mark = []
+        s.at(_SETTLE_SECONDS, lambda: mark.append((clock.now_ns, clock.slept_ns)))
+        s.run_main(_SETTLE_SECONDS + seconds, entry)
+        start_ns, start_slept = mark[0]
+        elapsed = clock.now_ns - start_ns
+        return 1 - (clock.slept_ns - start_slept) / max(1, elapsed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare code.py with code_async.py.")
+    parser.add_argument("--host-scale", type=float, default=50.0,
+                        help="how many times slower than this host the board is")
+    parser.add_argument("--seconds", type=float, default=60.0,
+                        help="virtual seconds of play for the latency run")
+    parser.add_argument("--idle-seconds", type=float, default=10.0)
+    args = parser.parse_args(argv)
+
+    import sim
+
+    sim.use_stand_ins()
+    from sim import bench
+
+    print("%-14s %9s %9s %9s %9s %7s %7s" % (
+        "entry", "game p50", "game p95", "disp p50", "disp p95", "busy", "idle"))
+    for entry in ENTRIES:
+        to_game, to_display, _, slept = run_latency(args.seconds, args.host_scale, entry=entry)
+        game = bench.Result("game", to_game, 0)
+        display = bench.Result("display", to_display, 0)
+        idle_busy = run_idle(args.idle_seconds, args.host_scale, entry)
+        print("%-14s %7dus %7dus %7dus %7dus %6.1f%% %6.1f%%" % (
+            entry, game.p50_us, game.p95_us, display.p50_us, display.p95_us,
+            100 * (1 - slept), 100 * idle_busy))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
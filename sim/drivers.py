@@ -0,0 +1,168 @@
+# Scripted input drivers for the simulated board.
+#
+# Each driver schedules pin or sensor changes on the Machine's virtual
+# clock, so they happen at exact virtual times while the unmodified game
+# loop sleeps and polls as it would on the device.
+
+import random
+
+from sim.pins import QuadratureDriver
+
+_NS = 1000000000
+
+
+class VirtualEncoder:
+    """
+    Rotary encoder on two simulated board pins.
+
+    Parameters:
+    - machine: simulated Machine
+    - pin_a, pin_b: board pins (e.g. config.ENCODER_PIN_A)
+    - quarter_step: seconds between quadrature edges while turning
+    """
+
+    def __init__(self, machine, pin_a, pin_b, quarter_step=0.003):
+        self.clock = machine.clock
+        self.quarter_step_ns = int(quarter_step * _NS)
+        self.driver = QuadratureDriver(pin_a=pin_a, pin_b=pin_b)
+        self.driver.set_state(1, 1)
+        self._busy_until = 0
+
+    def turn(self, detents, at_ns=None):
+        """
+        Schedule a turn of detents (positive = clockwise). Turns queued
+        back to back play one after the other.
+        """
+        start = max(self.clock.now_ns if at_ns is None else at_ns, self._busy_until)
+        t = start
+        for a, b in self.driver.detents(detents):
+            self.clock.call_at(t, lambda a=a, b=b: self.driver.set_state(a, b))
+            t += self.quarter_step_ns
+        self._busy_until = t
+        return t
+
+
+class VirtualButton:
+    """
+    Active-low push button on a simulated board pin.
+    """
+
+    def __init__(self, machine, pin):
+        self.clock = machine.clock
+        self.pin = pin
+
+    def press(self, hold=0.08, at_ns=None):
+        """
+        Schedule a press held for hold seconds. Returns the release time.
+        """
+        start = self.clock.now_ns if at_ns is None else at_ns
+        end = start + int(hold * _NS)
+        self.clock.call_at(start, lambda: setattr(self.pin, "value", False))
+        self.clock.call_at(end, lambda: setattr(self.pin, "value", True))
+        return end
+
+
+class AutoPlayer:
+    """
+    Plays the game through the simulated hardware: presses through the
+    splash and end screens, long-presses to start from the menu, and
+    performs each requested move after a reaction delay.
+
+    The player only looks at game state, like a person watching the
+    screen; every action reaches the game through pins and the
+    accelerometer model.
+
+    Parameters:
+    - machine: simulated Machine
+    - encoder, button: VirtualEncoder and VirtualButton
+    - get_game: callable returning the Game (or None before it exists)
+    - config: the game's config module
+    - reaction: mean reaction time in seconds
+    - jitter: standard deviation of the reaction time
+    - mistakes: probability of doing a wrong move instead of the right one
+    - seed: seed for the player's own choices
+    """
+
+    def __init__(self, machine, encoder, button, get_game, config,
+                 reaction=0.35, jitter=0.05, mistakes=0.0, seed=0):
+        self.machine = machine
+        self.clock = machine.clock
+        self.encoder = encoder
+        self.button = button
+        self.get_game = get_game
+        self.config = config
+        self.reaction = reaction
+        self.jitter = jitter
+        self.mistakes = mistakes
+        self.rng = random.Random(seed)
+
+        self.think_ns = _NS // 50
+        self.busy_until = 0
+        self._acted_on = None
+        self.actions = 0
+        self.games = 0
+
+        # (level, seq_index, move, input_ns) for every move performed,
+        # input_ns being when the input is physically complete: the last
+        # encoder edge of a turn, the press of a button press. A shake
+        # has no such point (the detector fires partway through it), so
+        # its input_ns is when the shake starts.
+        self.log = []
+
+    def start(self):
+        self.clock.call_later(0, self._think)
+
+    def _think(self):
+        self.clock.call_at(self.clock.now_ns + self.think_ns, self._think)
+        game = self.get_game()
+        now = self.clock.now_ns
+        if game is None or now < self.busy_until:
+            return
+
+        state = game.state_name
+        if state in ("SPLASH", "GAME_OVER", "GAME_WIN"):
+            if state != "SPLASH" and self._acted_on is not None:
+                self.games += 1
+                self._acted_on = None
+            self.busy_until = self.button.press(0.08, now + self._delay()) + _NS // 5
+        elif state == "MENU":
+            hold = self.config.MENU_PRESS_HOLD + 0.15
+            self.busy_until = self.button.press(hold, now + self._delay()) + _NS // 5
+        elif state == "WAIT_INPUT":
+            key = (game.level, game.seq_index)
+            if key == self._acted_on:
+                return
+            self._acted_on = key
+            move = game.current_move
+            if self.mistakes and self.rng.random() < self.mistakes:
+                move = self.rng.choice(
+                    [m for m in self.config.ALL_MOVES if m != move]
+                )
+            at_ns = now + self._delay()
+            self.busy_until = self.perform(move, at_ns)
+            # Press and shake: when the input starts
+            done = at_ns
+            if move in (self.config.MOVE_CW, self.config.MOVE_CCW):
+                # A turn registers on its last edge
+                done = self.busy_until - self.encoder.quarter_step_ns
+            self.log.append((game.level, game.seq_index, move, done))
+
+    def _delay(self):
+        return int(max(0.05, self.rng.gauss(self.reaction, self.jitter)) * _NS)
+
+    def perform(self, move, at_ns):
+        """
+        Schedule one game move at at_ns. Returns when it is finished.
+        """
+        config = self.config
+        self.actions += 1
+        if move == config.MOVE_CW:
+            return self.encoder.turn(1, at_ns)
+        if move == config.MOVE_CCW:
+            return self.encoder.turn(-1, at_ns)
+        if move == config.MOVE_PRESS:
+            return self.button.press(0.08, at_ns)
+        if move == config.MOVE_SHAKE:
+            self.machine.accel.shake(0.25, at_ns=at_ns)
+            return at_ns + _NS // 4
+        return at_ns
@@ -0,0 +1,115 @@
+# Encoder decoding check with the fake quadrature pins.
+#
+# Feeds edge sequences from sim/pins.py QuadratureDriver through
+# PollingEncoder (and the QuadratureDecoder it shares with the keypad
+# backend) and asserts the detent counts the decoder documents: a clean
+# detent counts one, contact bounce at rest cancels out, a reversal
+# counts the other way, and a missed sample (both channels changed
+# between two samples) counts as no step at all. Exits non-zero on the
+# first failing check.
+#
+# Usage:
+#     python -m sim.encoder_check
+
+import sys
+
+import sim  # noqa: F401  (puts src/ on sys.path)
+from sim.pins import QuadratureDriver
+
+
+def _setup():
+    from encoder import PollingEncoder
+
+    drv = QuadratureDriver()
+    return drv, PollingEncoder(drv.pin_a, drv.pin_b)
+
+
+def check_detent():
+    drv, enc = _setup()
+    drv.feed(enc, drv.detents(1))
+    assert enc.read() == 1, "clockwise detent"
+    drv.feed(enc, drv.detents(-1))
+    assert enc.read() == -1, "counter-clockwise detent"
+
+
+def check_bounce():
+    drv, enc = _setup()
+    drv.feed(enc, drv.bounce(5))
+    assert enc.read() == 0, "bounce at rest counted"
+    # The decoder is still in step: the next detent counts once
+    drv.feed(enc, drv.detents(1))
+    assert enc.read() == 1, "detent after bounce"
+
+
+def check_reversal():
+    drv, enc = _setup()
+    drv.feed(enc, drv.detents(2))
+    drv.feed(enc, drv.detents(-1))
+    assert enc.read() == 1, "two forward, one back"
+
+    # Turned half way and back: no detent either way
+    drv.feed(enc, drv.quarter_steps(2))
+    drv.feed(enc, drv.quarter_steps(-2))
+    assert enc.read() == 0, "half step and back"
+    drv.feed(enc, drv.detents(-3))
+    assert enc.read() == -3, "detents after a half step"
+
+
+def check_missed_sample():
+    drv, enc = _setup()
+    states = list(drv.detents(1))
+    # The second state is never sampled, so the encoder sees both
+    # channels change at once: that jump counts 0, the detent is lost
+    drv.feed(enc, states[:1])
+    drv.feed(enc, states[1:2], polls_per_state=0)
+    drv.feed(enc, states[2:])
+    assert enc.read() == 0, "jump counted as a step"
+
+    # The jump spans two quarter steps and both stay lost: the two
+    # counted ones carry over, so the next detent is reported two
+    # quarter steps early and is not counted again at its end
+    states = list(drv.detents(1))
+    drv.feed(enc, states[:2])
+    assert enc.read() == 1, "detent not completed by the carried quarters"
+    drv.feed(enc, states[2:])
+    assert enc.read() == 0, "detent counted twice"
+
+
+def check_stamps():
+    # Keypad backend path: each detent keeps the time of its last edge
+    from encoder import QuadratureDecoder
+
+    drv = QuadratureDriver()
+    dec = QuadratureDecoder(drv.quarters_per_detent)
+    for t, (a, b) in enumerate(drv.detents(2), 1):
+        dec.feed(a, b, t)
+    assert dec.take() == 2, "two detents"
+    assert (dec.stamp(0), dec.stamp(1)) == (4, 8), "stamps of completing edges"
+
+
+# (name, check) in the order they run
+CHECKS = [
+    ("clean detent", check_detent),
+    ("bounce at rest", check_bounce),
+    ("direction reversal", check_reversal),
+    ("missed sample", check_missed_sample),
+    ("keypad edge stamps", check_stamps),
+]
+
+
+def main(argv=None):
+    failed = 0
+    for name, check in CHECKS:
+        try:
+            check()
+        except Exception as e:
+            failed += 1
+            print("ENCODER: %-20s FAIL %s: %s" % (name, type(e).__name__, e))
+            continue
+        print("ENCODER: %-20s ok" % name)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
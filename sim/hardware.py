@@ -0,0 +1,481 @@
+# Simulated board: pins, the shared I2C bus and the devices on it.
+#
+# The stand-in modules in sim/modules look up the current Machine here,
+# so `board.I2C()`, `digitalio.DigitalInOut(board.D9)` and friends all
+# talk to the same simulated hardware.
+
+import random
+import sys
+from collections import deque
+
+from sim.clock import VirtualClock
+
+# The Machine the stand-in modules are currently bound to
+machine = None
+
+
+def current():
+    """
+    Return the active Machine, creating a default one if needed.
+    """
+    global machine
+    if machine is None:
+        machine = Machine()
+    return machine
+
+
+# -------------------------------
+# Pins
+# -------------------------------
+
+
+class VirtualPin:
+    """
+    A board pin. Drivers set `value` to force a level; otherwise the pin
+    reads as its pull-up (True).
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.driven = None
+
+    @property
+    def value(self):
+        return True if self.driven is None else self.driven
+
+    @value.setter
+    def value(self, level):
+        self.driven = bool(level)
+
+    def release(self):
+        self.driven = None
+
+    def __repr__(self):
+        return "board." + self.name
+
+
+# -------------------------------
+# I2C bus
+# -------------------------------
+
+
+class VirtualI2C:
+    """
+    Shared I2C bus with busio.I2C's interface. Transfers are routed to the
+    device model at the target address and counted per address.
+    Setting faults[address] to a probability makes that share of the
+    transfers to the device fail with OSError (EIO), after the attempt
+    has taken its time on the wire. Like busio, start and end must be
+    ints (end defaults to sys.maxsize); None raises TypeError.
+
+    Parameters:
+    - clock: VirtualClock
+    - frequency: bus clock in Hz, used to charge transfer time
+    - timed: advance the clock by each transfer's duration on the wire
+    """
+
+    def __init__(self, clock, frequency=400000, timed=False):
+        self.clock = clock
+        self.timed = timed
+        # 9 clocks per byte (8 data bits + ACK), plus the address byte
+        self.ns_per_byte = 9 * 1000000000 // frequency
+        self.devices = {}
+        # address -> [transactions, bytes_written, bytes_read]
+        self.stats = {}
+        self.faults = {}
+        self.failed = 0
+        self._rng = random.Random(0x12C)
+        self._locked = False
+
+    def attach(self, address, device):
+        self.devices[address] = device
+
+    def _device(self, address):
+        device = self.devices.get(address)
+        if device is None:
+            raise OSError(19, "No I2C device at address: 0x%x" % address)
+        return device
+
+    def account(self, address, written, read=0):
+        stat = self.stats.setdefault(address, [0, 0, 0])
+        stat[0] += 1
+        stat[1] += written
+        stat[2] += read
+        if self.timed:
+            self.clock.spend((written + read + 1) * self.ns_per_byte)
+
+    def _fault(self, address):
+        rate = self.faults.get(address)
+        if rate and self._rng.random() < rate:
+            self.failed += 1
+            raise OSError(5, "Input/output error")
+
+    def try_lock(self):
+        if self._locked:
+            return False
+        self._locked = True
+        return True
+
+    def unlock(self):
+        self._locked = False
+
+    def scan(self):
+        return sorted(self.devices)
+
+    @staticmethod
+    def _ints(*values):
+        for value in values:
+            if not isinstance(value, int):
+                raise TypeError("can't convert %s to int" % type(value).__name__)
+
+    def writeto(self, address, buffer, *, start=0, end=sys.maxsize):
+        self._ints(start, end)
+        data = bytes(buffer[start:end])
+        self.account(address, len(data))
+        self._fault(address)
+        self.clock.hold()
+        self._device(address).handle_write(data)
+        self.clock.release()
+
+    def readfrom_into(self, address, buffer, *, start=0, end=sys.maxsize):
+        self._ints(start, end)
+        view = memoryview(buffer)[start:end]
+        self.account(address, 0, len(view))
+        self._fault(address)
+        self.clock.hold()
+        self._device(address).handle_read(view)
+        self.clock.release()
+
+    def writeto_then_readfrom(
+        self, address, out_buffer, in_buffer, *,
+        out_start=0, out_end=sys.maxsize, in_start=0, in_end=sys.maxsize
+    ):
+        self._ints(out_start, out_end, in_start, in_end)
+        data = bytes(out_buffer[out_start:out_end])
+        view = memoryview(in_buffer)[in_start:in_end]
+        self.account(address, len(data), len(view))
+        self._fault(address)
+        self.clock.hold()
+        self._device(address).handle_write_read(data, view)
+        self.clock.release()
+
+    def deinit(self):
+        pass
+
+
+# -------------------------------
+# ADXL345 accelerometer
+# -------------------------------
+
+_REG_DEVID = 0x00
+_REG_THRESH_ACT = 0x24
+_REG_BW_RATE = 0x2C
+_REG_POWER_CTL = 0x2D
+_REG_INT_ENABLE = 0x2E
+_REG_INT_SOURCE = 0x30
+_REG_DATAX0 = 0x32
+_REG_FIFO_CTL = 0x38
+_REG_FIFO_STATUS = 0x39
+
+_POWER_MEASURE = 0x08
+_RATES = {0x07: 12.5, 0x08: 25, 0x09: 50, 0x0A: 100, 0x0B: 200, 0x0C: 400}
+_INT_ACTIVITY = 0x10
+_FIFO_DEPTH = 32
+
+# Raw counts per g and per THRESH_ACT step (62.5 mg)
+_LSB_PER_G = 256
+_LSB_PER_ACT = 16
+
+
+class ADXL345Model:
+    """
+    Register-level ADXL345: direct data reads, FIFO stream mode and the
+    AC-coupled activity interrupt, sampled from a scripted motion signal.
+    Nothing is sampled in standby (POWER_CTL measure bit clear).
+
+    Parameters:
+    - clock: VirtualClock
+    - seed: noise seed
+    - noise: resting noise (standard deviation in raw counts)
+    """
+
+    def __init__(self, clock, seed=0, noise=2.0):
+        self.clock = clock
+        self.rng = random.Random(seed)
+        self.noise = noise
+        self.regs = bytearray(64)
+        self.regs[_REG_DEVID] = 0xE5
+        self.regs[_REG_BW_RATE] = 0x0A
+        self.fifo = deque(maxlen=_FIFO_DEPTH)
+        self.shakes = []      # (start_ns, end_ns, amplitude_counts, freq_hz)
+        self.samples = 0      # Samples produced at the output data rate
+        self._next_sample_ns = clock.now_ns
+        self._reference = None
+        self._pointer = 0     # Register address for plain reads
+
+    # -------------------------------
+    # Scripting
+    # -------------------------------
+
+    def shake(self, duration=0.3, amplitude_g=1.2, freq=5.0, at_ns=None):
+        """
+        Add a sideways shake starting at at_ns (default: now).
+        """
+        start = self.clock.now_ns if at_ns is None else at_ns
+        end = start + int(duration * 1000000000)
+        self.shakes.append((start, end, amplitude_g * _LSB_PER_G, freq))
+
+    def signal(self, t_ns):
+        """
+        Raw (x, y, z) counts at time t_ns.
+        """
+        x = self.rng.gauss(0, self.noise)
+        y = self.rng.gauss(0, self.noise)
+        z = _LSB_PER_G + self.rng.gauss(0, self.noise)
+        for start, end, amp, freq in self.shakes:
+            if start <= t_ns < end:
+                phase = (t_ns - start) * freq / 1000000000
+                # Triangle wave keeps this cheap and clearly periodic
+                tri = 4 * abs(phase - int(phase) - 0.5) - 1
+                x += amp * tri
+                y -= 0.5 * amp * tri
+        return int(x), int(y), int(z)
+
+    # -------------------------------
+    # Sampling
+    # -------------------------------
+
+    def _period_ns(self):
+        return int(1000000000 // _RATES.get(self.regs[_REG_BW_RATE] & 0x0F, 100))
+
+    def _sample_until_now(self):
+        """
+        Produce every output-data-rate sample up to the current time,
+        feeding the FIFO and the activity detector.
+        """
+        now = self.clock.now_ns
+        period = self._period_ns()
+        if not self.regs[_REG_POWER_CTL] & _POWER_MEASURE:
+            self._next_sample_ns = now + period
+            return
+
+        # Drop finished shakes so signal() stays cheap on long runs
+        if self.shakes and self.shakes[0][1] < now - period:
+            self.shakes = [s for s in self.shakes if s[1] >= now - period]
+
+        stream = self.regs[_REG_FIFO_CTL] & 0xC0
+        activity = self.regs[_REG_INT_ENABLE] & _INT_ACTIVITY
+        threshold = self.regs[_REG_THRESH_ACT] * _LSB_PER_ACT
+
+        # After a long idle gap only the last FIFO-full of samples matters
+        if now - self._next_sample_ns > period * _FIFO_DEPTH:
+            self._next_sample_ns = now - period * _FIFO_DEPTH
+
+        while self._next_sample_ns <= now:
+            sample = self.signal(self._next_sample_ns)
+            self._next_sample_ns += period
+            self.samples += 1
+            if stream:
+                self.fifo.append(sample)
+            if activity:
+                ref = self._reference
+                if ref is None:
+                    self._reference = sample
+                elif (
+                    abs(sample[0] - ref[0]) > threshold
+                    or abs(sample[1] - ref[1]) > threshold
+                    or abs(sample[2] - ref[2]) > threshold
+                ):
+                    self.regs[_REG_INT_SOURCE] |= _INT_ACTIVITY
+                    self._reference = sample
+
+    # -------------------------------
+    # I2C transfers
+    # -------------------------------
+
+    def handle_write(self, data):
+        if not data:
+            return  # Address probe
+        reg = data[0]
+        self._pointer = reg
+        for i, value in enumerate(data[1:]):
+            self._write_register(reg + i, value)
+
+    def _write_register(self, reg, value):
+        self._sample_until_now()
+        self.regs[reg] = value
+        if reg == _REG_FIFO_CTL:
+            self.fifo.clear()
+        elif reg == _REG_INT_ENABLE:
+            self._reference = None
+
+    def handle_read(self, view):
+        self._read(self._pointer, view)
+
+    def handle_write_read(self, data, view):
+        self._read(data[0], view)
+
+    def _read(self, reg, view):
+        self._sample_until_now()
+        if reg == _REG_DATAX0:
+            if self.regs[_REG_FIFO_CTL] & 0xC0 and self.fifo:
+                sample = self.fifo.popleft()
+            else:
+                sample = self.signal(self.clock.now_ns)
+            raw = bytearray(6)
+            for i, value in enumerate(sample):
+                value &= 0xFFFF
+                raw[2 * i] = value & 0xFF
+                raw[2 * i + 1] = value >> 8
+            n = min(len(view), 6)
+            view[:n] = raw[:n]
+            return
+        if reg == _REG_FIFO_STATUS:
+            view[0] = len(self.fifo)
+            return
+        if reg == _REG_INT_SOURCE:
+            view[0] = self.regs[_REG_INT_SOURCE]
+            self.regs[_REG_INT_SOURCE] = 0
+            return
+        for i in range(len(view)):
+            view[i] = self.regs[(reg + i) & 0x3F]
+
+
+# -------------------------------
+# SSD1306 OLED
+# -------------------------------
+
+PAGE_HEIGHT = 8
+_WINDOW_OVERHEAD_BYTES = 8
+
+
+class SSD1306Model:
+    """
+    Framebuffer-backed OLED. Each refresh renders the displayio scene into
+    a 1-bit framebuffer, works out the changed page/column window like
+    displayio does, and accounts those bytes on the I2C bus.
+
+    Parameters:
+    - machine: owning Machine
+    - address: I2C address
+    - width, height: panel size
+    """
+
+    def __init__(self, machine, address, width, height):
+        self.machine = machine
+        self.address = address
+        self.width = width
+        self.height = height
+        self.framebuffer = bytearray(width * height)
+        self.refreshes = 0
+        self.bytes_sent = 0
+        self.asleep = False
+
+    def handle_write(self, data):
+        pass
+
+    def handle_read(self, view):
+        pass
+
+    def handle_write_read(self, data, view):
+        pass
+
+    def refresh(self, root):
+        """
+        Render root and push the changed window. Returns bytes sent.
+        """
+        self.refreshes += 1
+        if not self.machine.render:
+            return 0
+
+        # Rasterising is host-side bookkeeping, not device work
+        clock = self.machine.clock
+        clock.hold()
+        try:
+            return self._push(root)
+        finally:
+            clock.release()
+
+    def _push(self, root):
+        frame = bytearray(self.width * self.height)
+        if root is not None:
+            root.render_into(frame, self.width, self.height, 0, 0)
+
+        old = self.framebuffer
+        if frame == old:
+            return 0
+
+        # Bounding box of changed pixels
+        x0 = y0 = None
+        x1 = y1 = 0
+        w = self.width
+        for i in range(len(frame)):
+            if frame[i] != old[i]:
+                x = i % w
+                y = i // w
+                if x0 is None:
+                    x0, y0 = x, y
+                x0 = min(x0, x)
+                y0 = min(y0, y)
+                x1 = max(x1, x + 1)
+                y1 = max(y1, y + 1)
+        self.framebuffer = frame
+
+        pages = (y1 + PAGE_HEIGHT - 1) // PAGE_HEIGHT - y0 // PAGE_HEIGHT
+        sent = (x1 - x0) * pages + _WINDOW_OVERHEAD_BYTES
+        self.bytes_sent += sent
+        self.machine.i2c.account(self.address, sent)
+        return sent
+
+    def ascii(self):
+        """
+        Framebuffer as text, one character per pixel.
+        """
+        w = self.width
+        fb = self.framebuffer
+        return "\n".join(
+            "".join("#" if fb[y * w + x] else "." for x in range(w))
+            for y in range(self.height)
+        )
+
+
+# -------------------------------
+# Machine
+# -------------------------------
+
+
+class Machine:
+    """
+    One simulated device: clock, pins, I2C bus, accelerometer, NVM, and
+    the displays and NeoPixel strips created by the game.
+
+    Parameters:
+    - seed: seed for sensor noise
+    - render: rasterise the OLED on refresh (off for fast batch runs)
+    - charge_host, host_scale: see VirtualClock; charge_host also charges
+      I2C transfer time at 400 kHz
+    - timed_i2c: charge I2C transfer time without charging host time
+      (with a fixed cost model, see clock.LineCharge)
+    """
+
+    def __init__(self, seed=0, render=True, charge_host=False, host_scale=1.0,
+                 timed_i2c=False):
+        self.clock = VirtualClock(charge_host=charge_host, host_scale=host_scale)
+        self.render = render
+        self.pins = {}
+        self.i2c = VirtualI2C(self.clock, timed=charge_host or timed_i2c)
+        self.accel = ADXL345Model(self.clock, seed)
+        self.i2c.attach(0x53, self.accel)
+        self.displays = []
+        self.strips = []
+        # microcontroller.nvm, erased like fresh flash
+        self.nvm = bytearray(b"\xff" * 8192)
+        # Calls to alarm.light_sleep_until_alarms()
+        self.light_sleeps = 0
+
+    def pin(self, name):
+        pin = self.pins.get(name)
+        if pin is None:
+            pin = VirtualPin(name)
+            self.pins[name] = pin
+        return pin
@@ -0,0 +1,37 @@
+# Stand-in for the adafruit_adxl34x driver: the subset InputManager uses,
+# reading the simulated ADXL345 over the simulated I2C bus.
+
+from adafruit_bus_device.i2c_device import I2CDevice
+
+_REG_DEVID = 0x00
+_REG_POWER_CTL = 0x2D
+_REG_DATA_FORMAT = 0x31
+_REG_DATAX0 = 0x32
+
+# m/s^2 per LSB in full-resolution mode (4 mg/LSB)
+_SCALE = 0.004 * 9.80665
+
+
+class ADXL345:
+    def __init__(self, i2c, address=0x53):
+        self._device = I2CDevice(i2c, address)
+        self._buffer = bytearray(6)
+        self._write_register(_REG_DATA_FORMAT, 0x0B)  # Full resolution, 16 g
+        self._write_register(_REG_POWER_CTL, 0x08)    # Measure
+
+    def _write_register(self, reg, value):
+        with self._device as dev:
+            dev.write(bytes((reg, value)))
+
+    @property
+    def acceleration(self):
+        buf = self._buffer
+        with self._device as dev:
+            dev.write_then_readinto(bytes((_REG_DATAX0,)), buf)
+        out = []
+        for i in range(3):
+            raw = buf[2 * i] | (buf[2 * i + 1] << 8)
+            if raw & 0x8000:
+                raw -= 0x10000
+            out.append(raw * _SCALE)
+        return tuple(out)
@@ -0,0 +1 @@
+# Stand-in for the adafruit_bus_device package.
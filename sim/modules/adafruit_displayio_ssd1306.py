@@ -0,0 +1,53 @@
+# Stand-in for the adafruit_displayio_ssd1306 driver, backed by the
+# framebuffer SSD1306Model on the simulated I2C bus.
+
+from sim import hardware
+
+
+class SSD1306:
+    def __init__(self, bus, *, width, height, auto_refresh=True, **kwargs):
+        machine = hardware.current()
+        self.width = width
+        self.height = height
+        self.auto_refresh = auto_refresh
+        self.root_group = None
+        self.model = hardware.SSD1306Model(
+            machine, bus.device_address, width, height
+        )
+        machine.i2c.attach(bus.device_address, self.model)
+        machine.displays.append(self)
+
+    def refresh(self, *, target_frames_per_second=None, minimum_frames_per_second=0):
+        self.model.refresh(self.root_group)
+        return True
+
+    def sleep(self):
+        self.model.asleep = True
+
+    def wake(self):
+        self.model.asleep = False
+
+    @property
+    def is_awake(self):
+        return not self.model.asleep
+
+    def text(self):
+        """
+        Text currently shown, one string per text row, read back from the
+        tile indices of every TileGrid over the terminal font.
+        """
+        import terminalio
+
+        rows = []
+        group = self.root_group
+        if group is None:
+            return rows
+        for layer in group:
+            if getattr(layer, "bitmap", None) is not terminalio.FONT.bitmap:
+                continue
+            if layer.hidden:
+                continue
+            chars = "".join(chr(32 + layer[i]) for i in range(layer.width))
+            rows.append((layer.y, chars.strip()))
+        rows.sort()
+        return [text for _, text in rows if text]
@@ -0,0 +1,26 @@
+# Stand-in for CircuitPython's alarm module: light sleep with pin alarms.
+# light_sleep_until_alarms() lets the virtual clock run from timer to
+# timer (scripted button presses, the auto player) until a pin alarm
+# matches, and counts the time as slept.
+
+from sim import hardware
+from alarm import pin
+
+
+def light_sleep_until_alarms(*alarms):
+    """
+    Sleep until one of the PinAlarms matches and return it.
+    """
+    machine = hardware.current()
+    fired = []
+
+    def matched():
+        for a in alarms:
+            if a.pin.value == a.value:
+                fired.append(a)
+                return True
+        return False
+
+    machine.clock.sleep_until(matched)
+    machine.light_sleeps += 1
+    return fired[0]
@@ -0,0 +1,9 @@
+# Stand-in for alarm.pin.
+
+
+class PinAlarm:
+    def __init__(self, pin, value=False, edge=False, pull=False):
+        self.pin = pin
+        self.value = value
+        self.edge = edge
+        self.pull = pull
@@ -0,0 +1,141 @@
+# Stand-in for CircuitPython's asyncio library on the virtual clock.
+#
+# Covers what code_async.py uses: run(), create_task(), gather(),
+# sleep(), sleep_ms() and Event. Tasks are plain coroutines stepped by
+# one loop. When no task is ready the loop calls time.sleep() until the
+# next timer, so idle time advances the virtual clock (and is counted
+# as idle) exactly like the scheduler's sleeps in code.py.
+#
+# The Simulator removes the host's asyncio from sys.modules so device
+# code imports this module instead.
+
+import heapq
+import time
+from collections import deque
+
+
+class _Sleep:
+    def __init__(self, ns):
+        self.ns = ns
+
+    def __await__(self):
+        yield self
+
+
+class _Wait:
+    def __init__(self, event):
+        self.event = event
+
+    def __await__(self):
+        if not self.event._set:
+            yield self
+        return True
+
+
+def sleep(seconds):
+    return _Sleep(int(seconds * 1000000000))
+
+
+def sleep_ms(ms):
+    return _Sleep(int(ms) * 1000000)
+
+
+class Event:
+    def __init__(self):
+        self._set = False
+        self._waiting = []
+
+    def is_set(self):
+        return self._set
+
+    def set(self):
+        self._set = True
+        if self._waiting:
+            _loop.ready.extend(self._waiting)
+            self._waiting = []
+
+    def clear(self):
+        self._set = False
+
+    def wait(self):
+        return _Wait(self)
+
+
+class Task:
+    def __init__(self, coro):
+        self.coro = coro
+        self.done = False
+        self.result = None
+        self._waiters = []
+
+    def __await__(self):
+        if not self.done:
+            yield self
+        return self.result
+
+
+class _Loop:
+    def __init__(self):
+        self.ready = deque()
+        self._timers = []
+        self._seq = 0
+
+    def _step(self, task):
+        try:
+            request = task.coro.send(None)
+        except StopIteration as e:
+            task.done = True
+            task.result = e.value
+            self.ready.extend(task._waiters)
+            task._waiters = []
+            return
+        if isinstance(request, _Sleep):
+            if request.ns <= 0:
+                self.ready.append(task)
+            else:
+                self._seq += 1
+                heapq.heappush(
+                    self._timers, (time.monotonic_ns() + request.ns, self._seq, task)
+                )
+        elif isinstance(request, _Wait):
+            request.event._waiting.append(task)
+        elif isinstance(request, Task):
+            request._waiters.append(task)
+        else:
+            raise RuntimeError("unsupported awaitable: %r" % (request,))
+
+    def run_until(self, main):
+        timers = self._timers
+        while not main.done:
+            now = time.monotonic_ns()
+            while timers and timers[0][0] <= now:
+                self.ready.append(heapq.heappop(timers)[2])
+            if not self.ready:
+                if not timers:
+                    raise RuntimeError("deadlock: no task can run")
+                time.sleep((timers[0][0] - now) / 1000000000)
+                continue
+            for _ in range(len(self.ready)):
+                self._step(self.ready.popleft())
+
+
+_loop = _Loop()
+
+
+def create_task(coro):
+    task = Task(coro)
+    _loop.ready.append(task)
+    return task
+
+
+async def gather(*aws):
+    results = []
+    for aw in aws:
+        results.append(await aw)
+    return results
+
+
+def run(coro):
+    main = create_task(coro)
+    _loop.run_until(main)
+    return main.result
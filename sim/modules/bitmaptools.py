@@ -0,0 +1,31 @@
+# Stand-in for CircuitPython's bitmaptools module: only fill_region,
+# on the displayio stand-in's Bitmap.
+#
+# The native call allocates nothing, so neither may the stand-in under
+# the benchmark's tracemalloc pass: rows are cached memoryviews of the
+# bitmap and the fill bytes are cached per length, so the call only
+# works with small ints and slice assignment.
+
+_FILLS = {}
+
+
+def _fill(value, n):
+    by_length = _FILLS.get(value)
+    if by_length is None:
+        by_length = _FILLS[value] = {}
+    data = by_length.get(n)
+    if data is None:
+        data = by_length[n] = bytes([value]) * n
+    return data
+
+
+def fill_region(dest_bitmap, x1, y1, x2, y2, value):
+    """
+    Set every pixel with x1 <= x < x2 and y1 <= y < y2 to value.
+    """
+    rows = dest_bitmap.rows()
+    data = _fill(value, x2 - x1)
+    y = y1
+    while y < y2:
+        rows[y][x1:x2] = data
+        y += 1
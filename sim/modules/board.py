@@ -0,0 +1,14 @@
+# Stand-in for CircuitPython's board module.
+# Any pin name resolves to a VirtualPin on the active simulated Machine.
+
+from sim import hardware
+
+
+def I2C():
+    return hardware.current().i2c
+
+
+def __getattr__(name):
+    if name[:1] in ("D", "A") and name[1:].isdigit() or name in ("SCL", "SDA"):
+        return hardware.current().pin(name)
+    raise AttributeError(name)
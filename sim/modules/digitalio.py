@@ -0,0 +1,37 @@
+# Stand-in for CircuitPython's digitalio module, backed by VirtualPins.
+
+
+class Direction:
+    INPUT = "INPUT"
+    OUTPUT = "OUTPUT"
+
+
+class Pull:
+    UP = "UP"
+    DOWN = "DOWN"
+
+
+class DigitalInOut:
+    def __init__(self, pin):
+        self.pin = pin
+        self.direction = Direction.INPUT
+        self.pull = None
+
+    def switch_to_input(self, pull=None):
+        self.direction = Direction.INPUT
+        self.pull = pull
+
+    def switch_to_output(self, value=False, drive_mode=None):
+        self.direction = Direction.OUTPUT
+        self.pin.value = value
+
+    @property
+    def value(self):
+        return self.pin.value
+
+    @value.setter
+    def value(self, level):
+        self.pin.value = level
+
+    def deinit(self):
+        pass
@@ -0,0 +1,182 @@
+# Stand-in for CircuitPython's displayio module.
+#
+# Only what the game uses: Group, Bitmap, Palette and TileGrid, with the
+# same indexing rules. Each element can render itself into a 1-bit
+# framebuffer (one byte per pixel) for the simulated SSD1306.
+
+
+def release_displays():
+    pass
+
+
+class Palette:
+    def __init__(self, color_count):
+        self._colors = [0] * color_count
+        self._transparent = [False] * color_count
+
+    def __len__(self):
+        return len(self._colors)
+
+    def __getitem__(self, index):
+        return self._colors[index]
+
+    def __setitem__(self, index, color):
+        if not isinstance(color, int):
+            r, g, b = color
+            color = (r << 16) | (g << 8) | b
+        self._colors[index] = color
+
+    def make_transparent(self, index):
+        self._transparent[index] = True
+
+    def make_opaque(self, index):
+        self._transparent[index] = False
+
+    def is_transparent(self, index):
+        return self._transparent[index]
+
+
+class Bitmap:
+    def __init__(self, width, height, value_count):
+        self.width = width
+        self.height = height
+        self.value_count = value_count
+        self.data = bytearray(width * height)
+        self._rows = None
+
+    def rows(self):
+        """
+        One memoryview per pixel row, made once (for bitmaptools).
+        """
+        if self._rows is None:
+            view = memoryview(self.data)
+            w = self.width
+            self._rows = [view[y * w:(y + 1) * w] for y in range(self.height)]
+        return self._rows
+
+    def __getitem__(self, index):
+        if isinstance(index, tuple):
+            x, y = index
+            return self.data[y * self.width + x]
+        return self.data[index]
+
+    def __setitem__(self, index, value):
+        if isinstance(index, tuple):
+            x, y = index
+            self.data[y * self.width + x] = value
+        else:
+            self.data[index] = value
+
+    def fill(self, value):
+        # No range iterator: the native fill allocates nothing
+        data = self.data
+        i = len(data)
+        while i:
+            i -= 1
+            data[i] = value
+
+
+class TileGrid:
+    def __init__(self, bitmap, *, pixel_shader, width=1, height=1,
+                 tile_width=None, tile_height=None, default_tile=0, x=0, y=0):
+        self.bitmap = bitmap
+        self.pixel_shader = pixel_shader
+        self.width = width
+        self.height = height
+        self.tile_width = bitmap.width if tile_width is None else tile_width
+        self.tile_height = bitmap.height if tile_height is None else tile_height
+        self.x = x
+        self.y = y
+        self.hidden = False
+        self._tiles = [default_tile] * (width * height)
+        self._tiles_per_row = bitmap.width // self.tile_width
+
+    def _index(self, index):
+        if index.__class__ is tuple:
+            x, y = index
+            return y * self.width + x
+        if index < 0:
+            raise IndexError("Tile index out of bounds")
+        return index
+
+    def __getitem__(self, index):
+        if index.__class__ is int and index >= 0:
+            return self._tiles[index]
+        return self._tiles[self._index(index)]
+
+    def __setitem__(self, index, tile):
+        if index.__class__ is int and index >= 0:
+            self._tiles[index] = tile
+        else:
+            self._tiles[self._index(index)] = tile
+
+    def render_into(self, frame, fb_width, fb_height, ox, oy):
+        if self.hidden:
+            return
+        bitmap = self.bitmap
+        data = bitmap.data
+        bw = bitmap.width
+        tw = self.tile_width
+        th = self.tile_height
+        palette = self.pixel_shader
+        colors = palette._colors
+        transparent = palette._transparent
+        left = ox + self.x
+        top = oy + self.y
+        for ty in range(self.height):
+            for tx in range(self.width):
+                tile = self._tiles[ty * self.width + tx]
+                sx = (tile % self._tiles_per_row) * tw
+                sy = (tile // self._tiles_per_row) * th
+                px = left + tx * tw
+                py = top + ty * th
+                for y in range(th):
+                    fy = py + y
+                    if not 0 <= fy < fb_height:
+                        continue
+                    row = (sy + y) * bw + sx
+                    base = fy * fb_width
+                    for x in range(tw):
+                        fx = px + x
+                        if not 0 <= fx < fb_width:
+                            continue
+                        value = data[row + x]
+                        if transparent[value]:
+                            continue
+                        frame[base + fx] = 1 if colors[value] else 0
+
+
+class Group:
+    def __init__(self, *, scale=1, x=0, y=0):
+        self.scale = scale
+        self.x = x
+        self.y = y
+        self.hidden = False
+        self._children = []
+
+    def append(self, layer):
+        self._children.append(layer)
+
+    def insert(self, index, layer):
+        self._children.insert(index, layer)
+
+    def remove(self, layer):
+        self._children.remove(layer)
+
+    def pop(self, index=-1):
+        return self._children.pop(index)
+
+    def __len__(self):
+        return len(self._children)
+
+    def __getitem__(self, index):
+        return self._children[index]
+
+    def __iter__(self):
+        return iter(self._children)
+
+    def render_into(self, frame, fb_width, fb_height, ox, oy):
+        if self.hidden:
+            return
+        for child in self._children:
+            child.render_into(frame, fb_width, fb_height, ox + self.x, oy + self.y)
@@ -0,0 +1,7 @@
+# Stand-in for CircuitPython's i2cdisplaybus module.
+
+
+class I2CDisplayBus:
+    def __init__(self, i2c_bus, *, device_address, reset=None):
+        self.i2c = i2c_bus
+        self.device_address = device_address
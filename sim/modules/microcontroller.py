@@ -0,0 +1,11 @@
+# Stand-in for CircuitPython's microcontroller module.
+# nvm is the active simulated Machine's non-volatile memory, a bytearray
+# that keeps its contents for as long as the Machine exists.
+
+from sim import hardware
+
+
+def __getattr__(name):
+    if name == "nvm":
+        return hardware.current().nvm
+    raise AttributeError(name)
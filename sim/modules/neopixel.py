@@ -0,0 +1,96 @@
+# Stand-in for the neopixel driver. Pixels are kept in memory and every
+# show() is logged on the strip with its virtual timestamp, so tests can
+# check what the LEDs displayed and how often the strip was written.
+#
+# Colors are stored as flat RGB bytearrays, so writing a frame buffer
+# and showing it do not allocate (allocation benchmarks run through this
+# module).
+
+from sim import hardware
+
+GRB = "GRB"
+RGB = "RGB"
+
+
+def _unpack(color):
+    if isinstance(color, int):
+        return ((color >> 16) & 0xFF, (color >> 8) & 0xFF, color & 0xFF)
+    return tuple(color)
+
+
+def _pixels_of(buf):
+    return [tuple(buf[i:i + 3]) for i in range(0, len(buf), 3)]
+
+
+class NeoPixel:
+    def __init__(self, pin, n, *, bpp=3, brightness=1.0, auto_write=True,
+                 pixel_order=None):
+        self.pin = pin
+        self.n = n
+        self.brightness = brightness
+        self.auto_write = auto_write
+        self._buf = bytearray(3 * n)
+        self._shown = bytearray(3 * n)
+        self.shows = 0
+        self.writes = 0     # Pixel assignments, including redundant ones
+        self.log = []       # (time_ns, pixels) for each show()
+        self.keep_log = True
+        self._machine = hardware.current()
+        self._machine.strips.append(self)
+
+    @property
+    def shown(self):
+        """
+        (r, g, b) of every pixel as of the last show().
+        """
+        return _pixels_of(self._shown)
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.n))]
+        if index < 0:
+            index += self.n
+        return tuple(self._buf[3 * index:3 * index + 3])
+
+    def _put(self, i, color):
+        r, g, b = _unpack(color)
+        self._buf[3 * i] = r
+        self._buf[3 * i + 1] = g
+        self._buf[3 * i + 2] = b
+
+    def __setitem__(self, index, color):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.n)
+            count = len(range(start, stop, step))
+            if step == 1 and len(color) == 3 * count and not isinstance(color[0], tuple):
+                # Flat buffer of r, g, b values, as _pixelbuf accepts
+                self._buf[3 * start:3 * stop] = color
+            else:
+                for i, c in zip(range(start, stop, step), color):
+                    self._put(i, c)
+        else:
+            if index < 0:
+                index += self.n
+            self._put(index, color)
+        self.writes += 1
+        if self.auto_write:
+            self.show()
+
+    def fill(self, color):
+        for i in range(self.n):
+            self._put(i, color)
+        self.writes += 1
+        if self.auto_write:
+            self.show()
+
+    def show(self):
+        self.shows += 1
+        self._shown[:] = self._buf
+        if self.keep_log:
+            self.log.append((self._machine.clock.now_ns, tuple(self.shown)))
+
+    def deinit(self):
+        pass
@@ -0,0 +1,16 @@
+# Stand-in for CircuitPython's rainbowio module.
+
+
+def colorwheel(pos):
+    """
+    Same mapping as the native colorwheel: 0-255 around the hue circle,
+    returned as a packed 0xRRGGBB int.
+    """
+    pos = int(pos) & 255
+    if pos < 85:
+        return ((255 - pos * 3) << 16) | ((pos * 3) << 8)
+    if pos < 170:
+        pos -= 85
+        return ((255 - pos * 3) << 8) | (pos * 3)
+    pos -= 170
+    return ((pos * 3) << 16) | (255 - pos * 3)
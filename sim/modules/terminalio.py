@@ -0,0 +1,45 @@
+# Stand-in for CircuitPython's terminalio module.
+#
+# FONT mimics the built-in 6x12 terminal font closely enough for layout:
+# same glyph box, one tile per printable ASCII character in a single-row
+# bitmap (tile index = code - 32). Each glyph is a simple block pattern
+# derived from its code so different characters render differently.
+
+import displayio
+
+_W = 6
+_H = 12
+_FIRST = 32
+_LAST = 126
+
+
+class Glyph:
+    def __init__(self, tile_index):
+        self.tile_index = tile_index
+        self.width = _W
+        self.height = _H
+
+
+class _TerminalFont:
+    def __init__(self):
+        count = _LAST - _FIRST + 1
+        self.bitmap = displayio.Bitmap(_W * count, _H, 2)
+        for i in range(1, count):  # Tile 0 (space) stays blank
+            pattern = _FIRST + i
+            for y in range(2, _H - 2):
+                row = (pattern >> (y % 7)) | 1
+                for x in range(1, _W - 1):
+                    if row & (1 << (x - 1)):
+                        self.bitmap[i * _W + x, y] = 1
+        self._glyphs = [Glyph(i) for i in range(count)]
+
+    def get_bounding_box(self):
+        return (_W, _H)
+
+    def get_glyph(self, code):
+        if _FIRST <= code <= _LAST:
+            return self._glyphs[code - _FIRST]
+        return None
+
+
+FONT = _TerminalFont()
@@ -0,0 +1,91 @@
+# Fake pins and an edge driver for exercising the encoder backends on the host.
+#
+# Example:
+#     from sim.pins import QuadratureDriver
+#     from encoder import PollingEncoder
+#
+#     drv = QuadratureDriver()
+#     enc = PollingEncoder(drv.pin_a, drv.pin_b)
+#     drv.feed(enc, drv.detents(3))
+#     assert enc.read() == 3
+
+# Clockwise Gray sequence of (A, B) states, starting from the detent rest state
+_CW_STATES = ((1, 0), (0, 0), (0, 1), (1, 1))
+
+
+class FakePin:
+    """
+    Stand-in for digitalio.DigitalInOut with a settable boolean value.
+    """
+
+    def __init__(self, value=True):
+        self.value = value
+
+    def switch_to_input(self, pull=None):
+        pass
+
+    def deinit(self):
+        pass
+
+
+class QuadratureDriver:
+    """
+    Drives a pair of FakePins through quadrature edge sequences.
+
+    Parameters:
+    - quarters_per_detent: quarter steps the simulated encoder makes per detent
+    - pin_a, pin_b: pins to drive (default: new FakePins); anything with a
+      settable `value` works, e.g. the simulator's board pins
+    """
+
+    def __init__(self, quarters_per_detent=4, pin_a=None, pin_b=None):
+        self.pin_a = FakePin(True) if pin_a is None else pin_a
+        self.pin_b = FakePin(True) if pin_b is None else pin_b
+        self.quarters_per_detent = quarters_per_detent
+        self._phase = 3  # Index into _CW_STATES, resting at A=1 B=1
+
+    def set_state(self, a, b):
+        self.pin_a.value = bool(a)
+        self.pin_b.value = bool(b)
+
+    def quarter_steps(self, count):
+        """
+        Yield (A, B) states for count quarter steps.
+        Positive count turns clockwise, negative counter-clockwise.
+        """
+        step = 1 if count > 0 else -1
+        for _ in range(abs(count)):
+            self._phase = (self._phase + step) % 4
+            yield _CW_STATES[self._phase]
+
+    def detents(self, count):
+        """
+        Yield (A, B) states for count full detents (signed).
+        """
+        return self.quarter_steps(count * self.quarters_per_detent)
+
+    def bounce(self, times=3):
+        """
+        Yield contact bounce on the channel that would change next:
+        it toggles forward and back without completing the step.
+        """
+        here = _CW_STATES[self._phase]
+        ahead = _CW_STATES[(self._phase + 1) % 4]
+        for _ in range(times):
+            yield ahead
+            yield here
+
+    def feed(self, encoder, states, polls_per_state=1):
+        """
+        Apply each (A, B) state to the pins and let the encoder sample it.
+
+        Parameters:
+        - encoder: backend with a poll() method (e.g. PollingEncoder)
+        - states: iterable of (A, B) pairs
+        - polls_per_state: samples taken while each state is held
+          (0 simulates edges arriving faster than the poll rate)
+        """
+        for a, b in states:
+            self.set_state(a, b)
+            for _ in range(polls_per_state):
+                encoder.poll()
@@ -0,0 +1,117 @@
+# Idle power check for power.PowerManager.
+#
+# Boots the game with nobody playing, lets it step down to idle and to
+# sleep, then presses the button and reports:
+# - when each mode was entered
+# - how long after the press the game was back in ACTIVE mode and when
+#   its first full-rate tick ran
+# - game ticks per second in each mode
+# - the manager's per-mode current estimate
+#
+# Usage:
+#     python -m sim.power_report [--idle-after 5] [--sleep-after 15]
+#                                [--press-at 30] [--seconds 40]
+#                                [--host-scale 20] [--no-light-sleep]
+#                                [--entry code.py]
+
+import argparse
+
+from sim.runner import Simulator
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check idle power modes.")
+    parser.add_argument("--idle-after", type=float, default=5.0)
+    parser.add_argument("--sleep-after", type=float, default=15.0)
+    parser.add_argument("--press-at", type=float, default=30.0,
+                        help="virtual second of the wake-up press")
+    parser.add_argument("--seconds", type=float, default=40.0)
+    parser.add_argument("--host-scale", type=float, default=20.0)
+    parser.add_argument("--no-light-sleep", action="store_true")
+    parser.add_argument("--entry", default="code.py")
+    args = parser.parse_args(argv)
+
+    overrides = {
+        "POWER_ENABLED": True,
+        "POWER_IDLE_AFTER": args.idle_after,
+        "POWER_SLEEP_AFTER": args.sleep_after,
+        "POWER_LIGHT_SLEEP": not args.no_light_sleep,
+        "POWER_REPORT": False,
+    }
+    with Simulator(
+        charge_host=args.host_scale > 0, host_scale=args.host_scale,
+        overrides=overrides, quiet=True,
+    ) as s:
+        import power
+
+        clock = s.clock
+        start_ns = clock.now_ns
+        managers = []
+        modes = []      # (time_ns, mode)
+        ticks = []      # time_ns of every game tick
+
+        init = power.PowerManager.__init__
+        switch = power.PowerManager._switch
+
+        def capture(manager, *a, **kw):
+            init(manager, *a, **kw)
+            managers.append(manager)
+            update = manager.game.update
+
+            def counted(dt):
+                ticks.append(clock.now_ns)
+                update(dt)
+
+            manager.game.update = counted
+
+        def logged(manager, mode):
+            modes.append((clock.now_ns, mode))
+            switch(manager, mode)
+
+        power.PowerManager.__init__ = capture
+        power.PowerManager._switch = logged
+
+        press_ns = start_ns + int(args.press_at * 1000000000)
+        s.button.press(at_ns=press_ns)
+        s.run_main(args.seconds, args.entry)
+
+        def ms(t_ns, since=start_ns):
+            return (t_ns - since) / 1000000
+
+        print("mode changes:")
+        for t_ns, mode in modes:
+            print("  %9.0f ms  %s" % (ms(t_ns), power.MODE_NAMES[mode]))
+
+        print("game ticks per second:")
+        bounds = [(start_ns, power.ACTIVE)] + modes + [(clock.now_ns, None)]
+        for (t0, mode), (t1, _) in zip(bounds, bounds[1:]):
+            n = sum(1 for t in ticks if t0 <= t < t1)
+            if t1 > t0:
+                print("  %-6s %6.1f s  %6.1f" % (
+                    power.MODE_NAMES[mode], (t1 - t0) / 1000000000,
+                    n * 1000000000 / (t1 - t0)))
+
+        wake = [t for t, mode in modes if mode == power.ACTIVE and t >= press_ns]
+        if wake:
+            after = [t for t in ticks if t > wake[0]]
+            print("press -> ACTIVE: %.1f ms" % ms(wake[0], press_ns))
+            if len(after) > 1:
+                print("press -> first full-rate tick: %.1f ms (next tick %.1f ms later)"
+                      % (ms(after[0], press_ns), ms(after[1], after[0])))
+        else:
+            print("press -> ACTIVE: not woken")
+        print("light sleeps:", s.machine.light_sleeps)
+        print("state:", s.game.state_name, "| screen:", " | ".join(s.display.text()))
+
+        if managers:
+            import io
+            from contextlib import redirect_stdout
+
+            out = io.StringIO()
+            with redirect_stdout(out):
+                managers[0].report()
+            print(out.getvalue(), end="")
+
+
+if __name__ == "__main__":
+    main()
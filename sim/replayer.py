@@ -0,0 +1,201 @@
+# Fast host replay of recorded sessions.
+#
+# Each session is fed through a real InputManager (with a ReplaySource in
+# place of the hardware) and a real Game, on the game's fixed tick grid.
+# Frames in which nothing can happen are skipped: the next frame run is
+# the one holding the next recorded event or the game's own next
+# deadline (Game.next_deadline_ns). Every transition up to the last
+# recorded time is checked against the recording.
+#
+# Usage:
+#     python -m sim.replayer sessions.agr [...]
+#     python -m sim.replayer --generate 20 --seconds 40 --out /tmp/s.agr
+# --generate records sessions first by running code.py in the simulator
+# with RECORD_ENABLED and the auto player, then replays them.
+
+import argparse
+import os
+import random
+import time as _host_time
+from contextlib import redirect_stdout
+
+from sim.runner import Simulator
+
+
+class _NullWriter:
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+class _NullOutput:
+    """
+    Accepts every Display and Lights call the game makes and does nothing.
+    Transitions do not depend on what is drawn, so the default replay
+    skips drawing altogether.
+    """
+
+    animating = False
+
+    def __getattr__(self, name):
+        return self._ignore
+
+    def _ignore(self, *args, **kwargs):
+        pass
+
+
+class Replayer:
+    """
+    Replays sessions on one simulated board. InputManager and Game are
+    new per session; Display and Lights are built once and shared.
+
+    Parameters:
+    - full: drive the real Display and Lights as well (slower, but
+      covers the drawing code too)
+    """
+
+    def __init__(self, full=False):
+        self.sim = Simulator(render=False, quiet=True, trace=False)
+        self.clock = self.sim.clock
+
+        import display_ui
+        import game_engine
+        import inputs
+        import lights
+        import replay
+
+        self._game_cls = game_engine.Game
+        self._inputs_cls = inputs.InputManager
+        self._source_cls = replay.ReplaySource
+        if full:
+            self.display = display_ui.Display(self.sim.machine.i2c)
+            self.lights = lights.Lights()
+            self.lights.pixels.keep_log = False
+        else:
+            self.display = self.lights = _NullOutput()
+        self.ticks = 0
+
+    def run(self, session):
+        """
+        Replay one session. Returns its ReplaySource, whose `matched`
+        and `mismatches` tell whether the game took the recorded path.
+        """
+        clock = self.clock
+        period = 1000000000 // session.rate
+        t0 = clock.now_ns
+
+        source = self._source_cls(session)
+        source.start(t0)
+        random.seed(session.seed)
+        inputs = self._inputs_cls(None, source)
+        game = self._game_cls(inputs, self.display, self.lights)
+        game.add_listener(lambda old, new: source.check(new, clock.now_ns))
+
+        # The recording ends with its last record (times are whole
+        # microseconds); nothing after it can be compared
+        end_ns = source.end_ns + 1000
+
+        frame = 0
+        with redirect_stdout(_NullWriter()):
+            while True:
+                wake = source.next_time_ns()
+                deadline = game.next_deadline_ns()
+                if deadline is not None and (wake is None or deadline < wake):
+                    wake = deadline
+                if wake is None:
+                    break
+
+                # First tick on the grid at or after the wake-up time
+                k = -(-(wake - t0) // period)
+                if k <= frame:
+                    k = frame + 1
+                if t0 + k * period >= end_ns:
+                    break
+                clock.now_ns = t0 + k * period
+                dt = (k - frame) * period / 1000000000
+                frame = k
+
+                inputs.update()
+                game.update(dt)
+                self.ticks += 1
+        return source
+
+    def close(self):
+        self.sim.close()
+
+
+def generate(path, count, seconds, seed=0):
+    """
+    Record count sessions of the auto player into path.
+    """
+    for i in range(count):
+        overrides = {
+            "RECORD_ENABLED": True,
+            "RECORD_PATH": path,
+            "RECORD_SEED": seed + i,
+        }
+        with Simulator(seed + i, render=False, quiet=True, overrides=overrides) as s:
+            # Occasional mistakes and slow reactions end games early
+            s.autoplay(
+                reaction=0.3 + 0.1 * (i % 3), mistakes=0.05 * (i % 4), seed=seed + i
+            )
+            s.run_main(seconds)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay recorded sessions.")
+    parser.add_argument("paths", nargs="*")
+    parser.add_argument("--generate", type=int, default=0,
+                        help="record this many simulated sessions first")
+    parser.add_argument("--seconds", type=float, default=40.0,
+                        help="length of each generated session")
+    parser.add_argument("--out", default="sessions.agr",
+                        help="recording file for --generate")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="replay every session this many times (timing)")
+    parser.add_argument("--full", action="store_true",
+                        help="also drive the real Display and Lights")
+    args = parser.parse_args(argv)
+
+    paths = list(args.paths)
+    if args.generate:
+        if os.path.exists(args.out):
+            os.remove(args.out)
+        generate(args.out, args.generate, args.seconds)
+        paths.append(args.out)
+
+    replayer = Replayer(args.full)
+    from replay import parse_sessions
+
+    sessions = []
+    for path in paths:
+        with open(path, "rb") as f:
+            sessions.extend(parse_sessions(f.read()))
+
+    failed = 0
+    start = _host_time.perf_counter()
+    for _ in range(args.repeat):
+        for i, session in enumerate(sessions):
+            source = replayer.run(session)
+            if not source.matched:
+                failed += 1
+                print(
+                    "session %d (seed %d): %d mismatching transitions"
+                    % (i, session.seed, source.mismatches)
+                )
+    elapsed = _host_time.perf_counter() - start
+    replayer.close()
+
+    runs = len(sessions) * args.repeat
+    events = sum(len(s.kinds) for s in sessions) * args.repeat
+    print(
+        "%d replays, %d events, %d game ticks in %.3f s (%.0f sessions/s), %d failed"
+        % (runs, events, replayer.ticks, elapsed, runs / max(elapsed, 1e-9), failed)
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
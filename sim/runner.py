@@ -0,0 +1,303 @@
+# Run the unmodified game headless on the host.
+#
+# Simulator binds the stand-in CircuitPython modules in sim/modules to a
+# fresh simulated Machine, swaps in a virtual `time` module, and runs
+# src/code.py's main() until a virtual-time deadline. Scripted drivers
+# (or the AutoPlayer) change pins and sensor readings at exact virtual
+# times while the game's own scheduler sleeps through the gaps.
+#
+# Usage:
+#     python -m sim.runner [--seconds 60] [--seed 0] [--profile] [--screen]
+#                          [--host-scale 20 | --line-us 10] [--mistakes 0.1]
+#
+# Compute is free by default. --host-scale charges the host CPU time
+# spent in the game (times the factor), --line-us a fixed time per
+# executed line of game code, which is deterministic; both also charge
+# I2C transfer time.
+#
+# From Python:
+#     with Simulator(seed=3) as s:
+#         s.autoplay()
+#         s.run_main(30)
+#         print(s.transitions[-1], s.display.text())
+
+import argparse
+import io
+import os
+import random
+import runpy
+import sys
+import time as _host_time
+from contextlib import redirect_stdout
+
+import sim
+from sim import hardware
+from sim.clock import LineCharge, StopSimulation
+from sim.drivers import AutoPlayer, VirtualButton, VirtualEncoder
+
+
+# Tools in sim/ that also run on the board and import from src/
+_DEVICE_TOOLS = ("sim.bench",)
+
+
+def _purge_device_modules():
+    """
+    Forget every module imported from src/ or the stand-ins, so the next
+    import binds to the current Machine and virtual time module.
+    """
+    roots = (sim.SRC_DIR, sim.MODULES_DIR)
+    for name, module in list(sys.modules.items()):
+        path = getattr(module, "__file__", None) or ""
+        if path.startswith(roots) or name in _DEVICE_TOOLS:
+            del sys.modules[name]
+
+
+class Simulator:
+    """
+    One simulated device running the game.
+
+    Parameters:
+    - seed: seeds sensor noise and the game's random module
+    - render: rasterise OLED frames (turn off for fast batch runs)
+    - charge_host: add host CPU time (times host_scale) to virtual time
+    - host_scale: how much slower than the host the device is assumed to be
+    - line_us: instead, charge this many µs per executed line of src/
+      (fixed cost model, see clock.LineCharge) and the I2C transfer time
+    - overrides: dict of config attributes to replace before the game starts
+    - quiet: swallow the game's serial prints
+    - trace: record the game's state transitions in `transitions`
+    """
+
+    def __init__(self, seed=0, render=True, charge_host=False, host_scale=1.0,
+                 overrides=None, quiet=False, trace=True, line_us=0.0):
+        sim.use_stand_ins()
+        self.machine = hardware.Machine(
+            seed, render, charge_host, host_scale, timed_i2c=line_us > 0
+        )
+        self.clock = self.machine.clock
+        self.quiet = quiet
+        self.trace = trace
+        self.serial = io.StringIO() if quiet else None
+
+        self._saved_time = sys.modules.get("time")
+        self._saved_machine = hardware.machine
+        hardware.machine = self.machine
+        sys.modules["time"] = self.clock.time_module
+        # Device code gets the virtual-clock asyncio from sim/modules
+        self._saved_asyncio = sys.modules.pop("asyncio", None)
+        _purge_device_modules()
+        random.seed(seed)
+
+        import config
+
+        for name, value in (overrides or {}).items():
+            setattr(config, name, value)
+        self.config = config
+
+        self.encoder = VirtualEncoder(
+            self.machine, config.ENCODER_PIN_A, config.ENCODER_PIN_B
+        )
+        self.button = VirtualButton(self.machine, config.ENCODER_BUTTON)
+        self.player = None
+
+        # Captured when code.py constructs them
+        self.game = None
+        self.profiler = None
+        self.transitions = []  # (time_ns, old_state, new_state) as names
+        self._hook_game()
+
+        self.host_seconds = 0.0
+        self.virtual_seconds = 0.0
+
+        self.cost = None
+        if line_us > 0:
+            self.cost = LineCharge(self.clock, int(line_us * 1000), (sim.SRC_DIR,))
+            self.cost.start()
+
+    def _hook_game(self):
+        import game_engine
+        import profiler
+
+        sim_ = self
+        game_init = game_engine.Game.__init__
+        profiler_init = profiler.Profiler.__init__
+
+        def capture_game(game, *args, **kwargs):
+            game_init(game, *args, **kwargs)
+            sim_.game = game
+            if sim_.trace:
+                sim_._trace(game)
+
+        def capture_profiler(prof, *args, **kwargs):
+            profiler_init(prof, *args, **kwargs)
+            sim_.profiler = prof
+
+        game_engine.Game.__init__ = capture_game
+        profiler.Profiler.__init__ = capture_profiler
+
+    def _trace(self, game):
+        """
+        Record every state transition with its virtual time.
+        """
+        from states import STATE_NAMES
+
+        transitions = self.transitions
+        clock = self.clock
+
+        def traced(old, new):
+            transitions.append((clock.now_ns, STATE_NAMES[old], STATE_NAMES[new]))
+
+        game.add_listener(traced)
+
+    @property
+    def display(self):
+        """
+        The simulated SSD1306 the game created, or None before start-up.
+        """
+        displays = self.machine.displays
+        return displays[0] if displays else None
+
+    @property
+    def pixels(self):
+        strips = self.machine.strips
+        return strips[0] if strips else None
+
+    def autoplay(self, **kwargs):
+        """
+        Let an AutoPlayer drive the inputs (keyword arguments as AutoPlayer).
+        """
+        self.player = AutoPlayer(
+            self.machine, self.encoder, self.button,
+            lambda: self.game, self.config, **kwargs
+        )
+        self.player.start()
+        return self.player
+
+    def at(self, seconds, fn):
+        """
+        Run fn() at the given virtual time, in seconds from now.
+        """
+        self.clock.call_later(seconds, fn)
+
+    def run_main(self, seconds, entry="code.py"):
+        """
+        Run src/code.py (or another entry point in src/, such as
+        code_async.py) as the board would, for seconds of virtual time.
+        """
+        self.clock.deadline_ns = self.clock.now_ns + int(seconds * 1000000000)
+        path = os.path.join(sim.SRC_DIR, entry)
+        start_virtual = self.clock.now_ns
+        start_host = _host_time.perf_counter()
+        try:
+            if self.serial is not None:
+                with redirect_stdout(self.serial):
+                    runpy.run_path(path, run_name="__main__")
+            else:
+                runpy.run_path(path, run_name="__main__")
+        except StopSimulation:
+            pass
+        self.host_seconds += _host_time.perf_counter() - start_host
+        self.virtual_seconds += (self.clock.now_ns - start_virtual) / 1000000000
+
+    def close(self):
+        """
+        Restore the host time module and unbind the stand-ins.
+        """
+        if self.cost is not None:
+            self.cost.stop()
+        if self._saved_time is not None:
+            sys.modules["time"] = self._saved_time
+        hardware.machine = self._saved_machine
+        _purge_device_modules()
+        if self._saved_asyncio is not None:
+            sys.modules["asyncio"] = self._saved_asyncio
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the game headless.")
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--reaction", type=float, default=0.35,
+                        help="autoplayer reaction time in seconds")
+    parser.add_argument("--mistakes", type=float, default=0.0,
+                        help="chance the autoplayer does a wrong move")
+    parser.add_argument("--profile", action="store_true",
+                        help="enable the frame profiler and dump it at the end")
+    parser.add_argument("--boot", action="store_true",
+                        help="print the boot timeline (use with --host-scale)")
+    parser.add_argument("--host-scale", type=float, default=0.0,
+                        help="charge host CPU time to the virtual clock, "
+                             "scaled by this factor (0 = compute is free)")
+    parser.add_argument("--line-us", type=float, default=0.0,
+                        help="charge this many µs per executed line of game "
+                             "code instead (deterministic)")
+    parser.add_argument("--screen", action="store_true",
+                        help="print the final OLED framebuffer")
+    parser.add_argument("--entry", default="code.py",
+                        help="entry point in src/ (code.py or code_async.py)")
+    parser.add_argument("--verbose", action="store_true",
+                        help="show the game's serial output")
+    args = parser.parse_args(argv)
+
+    overrides = {}
+    if args.profile:
+        overrides["PROFILE_ENABLED"] = True
+        overrides["PROFILE_DUMP_ON_GAME_OVER"] = False
+    if args.boot:
+        overrides["BOOT_TRACE"] = True
+
+    with Simulator(
+        args.seed,
+        charge_host=args.host_scale > 0,
+        host_scale=args.host_scale,
+        overrides=overrides,
+        quiet=not args.verbose,
+        line_us=args.line_us,
+    ) as s:
+        s.autoplay(reaction=args.reaction, mistakes=args.mistakes, seed=args.seed)
+        s.run_main(args.seconds, args.entry)
+
+        print(
+            "simulated %.1f s in %.2f s host time (%.0fx real time)"
+            % (s.virtual_seconds, s.host_seconds,
+               s.virtual_seconds / max(s.host_seconds, 1e-9))
+        )
+        game = s.game
+        # A game is finished when it reaches an end screen, whether or
+        # not the player dismissed it before the run ended
+        lost = sum(1 for _, _, new in s.transitions if new == "GAME_OVER")
+        won = sum(1 for _, _, new in s.transitions if new == "GAME_WIN")
+        print(
+            "state = %s  difficulty = %s  level = %d  games finished = %d (won %d)"
+            % (game.state_name, game.difficulty, game.level, lost + won, won)
+        )
+        print("transitions =", len(s.transitions), " actions =", s.player.actions)
+        for address, (txns, wrote, read) in sorted(s.machine.i2c.stats.items()):
+            print(
+                "i2c 0x%02x txns = %d wrote = %d read = %d"
+                % (address, txns, wrote, read)
+            )
+        if s.pixels is not None:
+            print("neopixel shows =", s.pixels.shows)
+        print("screen:", " | ".join(s.display.text()))
+        if args.screen:
+            print(s.display.model.ascii())
+
+        if args.boot and s.serial is not None:
+            for line in s.serial.getvalue().splitlines():
+                if line.startswith("BOOT:"):
+                    print(line)
+
+        if s.profiler is not None:
+            s.profiler.dump()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+# Recorded-sample harness for tuning shake detection.
+#
+# Replays raw ADXL345 recordings through the streaming ShakeDetector and
+# the original per-frame magnitude detector, then reports detection rate
+# and false positives for thresholds around config.SHAKE_DELTA_THRESHOLD.
+#
+# Recording format (CSV, raw counts at 3.9 mg/LSB):
+#     # rate=100
+#     x,y,z,label
+#     3,-1,255,0
+#     ...
+# label is 1 while an intentional shake is happening and 0 otherwise.
+# sim/capture_shake.py records files in this format on the device.
+#
+# Usage:
+#     python -m sim.shake_harness [recording.csv ...] [--seconds 120]
+#                                 [--seed 1]
+# Without recordings a synthetic one (rest noise, desk taps and shakes)
+# is generated so the harness can run anywhere.
+
+import argparse
+import math
+import random
+
+import sim
+from shake import ShakeDetector, delta_to_mag_sq, LSB_PER_G, STANDARD_GRAVITY
+
+# Threshold multipliers swept around the configured value
+SWEEP = (0.5, 0.75, 1.0, 1.5, 2.0, 3.0)
+
+# Main loop rate seen by the original detector (one read per frame)
+LEGACY_LOOP_HZ = 50
+
+
+def load_config():
+    """
+    Import src/config.py on the host, with board pins from the simulator.
+    """
+    sim.use_stand_ins()
+    import config
+
+    return config
+
+
+def read_recording(path):
+    """
+    Return (rate, samples, labels) from a CSV recording.
+    """
+    rate = 100
+    samples = []
+    labels = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("#"):
+                if "rate=" in line:
+                    rate = int(line.split("rate=")[1])
+                continue
+            if line[0].isalpha():
+                continue  # Header row
+            x, y, z, label = line.split(",")
+            samples.append((int(x), int(y), int(z)))
+            labels.append(int(label))
+    return rate, samples, labels
+
+
+def synthesize(seconds=120, rate=100, seed=1):
+    """
+    Build a synthetic recording with resting noise, short desk taps
+    (3-7 m/s^2 spikes, as noted in config.py) and labelled shakes.
+    """
+    rng = random.Random(seed)
+    n = seconds * rate
+    samples = [
+        [rng.gauss(0, 2), rng.gauss(0, 2), LSB_PER_G + rng.gauss(0, 2)]
+        for _ in range(n)
+    ]
+    labels = [0] * n
+
+    lsb_per_ms2 = LSB_PER_G / STANDARD_GRAVITY
+    i = rate
+    while i < n - 2 * rate:
+        if rng.random() < 0.5:
+            # Desk tap: one or two samples of vertical spike
+            spike = rng.uniform(3, 7) * lsb_per_ms2 * rng.choice((-1, 1))
+            for k in range(rng.randint(1, 2)):
+                samples[i + k][2] += spike
+        else:
+            # Shake: a few cycles of a strong sideways oscillation
+            length = int(rng.uniform(0.4, 0.8) * rate)
+            freq = rng.uniform(3, 6)
+            amp = rng.uniform(0.8, 1.5) * LSB_PER_G
+            for k in range(length):
+                phase = 2 * math.pi * freq * k / rate
+                samples[i + k][0] += amp * math.sin(phase)
+                samples[i + k][1] += 0.5 * amp * math.cos(phase)
+                labels[i + k] = 1
+        i += int(rng.uniform(1.5, 3.0) * rate)
+
+    clip = 2 * 4 * LSB_PER_G  # +/-4 g full-resolution range
+    out = []
+    for x, y, z in samples:
+        out.append(
+            (
+                max(-clip, min(clip, int(x))),
+                max(-clip, min(clip, int(y))),
+                max(-clip, min(clip, int(z))),
+            )
+        )
+    return rate, out, labels
+
+
+def segments(labels):
+    """
+    Return (start, end) index pairs for each run of label 1.
+    """
+    runs = []
+    start = None
+    for i, label in enumerate(labels):
+        if label and start is None:
+            start = i
+        elif not label and start is not None:
+            runs.append((start, i))
+            start = None
+    if start is not None:
+        runs.append((start, len(labels)))
+    return runs
+
+
+def score(hits, labels, rate):
+    """
+    Return (detection_rate, false_positives) for a list of hit indices.
+    A hit within 0.2 s after a labelled shake still counts as that shake.
+    """
+    runs = segments(labels)
+    slack = rate // 5
+    detected = 0
+    matched = set()
+    for start, end in runs:
+        found = [h for h in hits if start <= h < end + slack]
+        if found:
+            detected += 1
+            matched.update(found)
+    false_pos = len([h for h in hits if h not in matched])
+    rate_pct = 100.0 * detected / len(runs) if runs else 0.0
+    return rate_pct, false_pos
+
+
+def run_streaming(samples, rate, delta, config):
+    detector = ShakeDetector(
+        delta_to_mag_sq(delta),
+        delta_to_mag_sq(config.SHAKE_MAX_DELTA),
+        int(config.SHAKE_COOLDOWN * rate),
+        config.SHAKE_FILTER_WINDOW,
+        config.SHAKE_MIN_HITS,
+    )
+    return [i for i, (x, y, z) in enumerate(samples) if detector.feed(x, y, z)]
+
+
+def run_legacy(samples, rate, delta, config):
+    """
+    The original detector: one read per frame, sqrt magnitude,
+    delta from the previous frame's magnitude.
+    """
+    scale = STANDARD_GRAVITY / LSB_PER_G
+    step = max(1, rate // LEGACY_LOOP_HZ)
+    cooldown = int(config.SHAKE_COOLDOWN * rate)
+    hits = []
+    last_mag = None
+    last_hit = -cooldown - 1
+    for i in range(0, len(samples), step):
+        x, y, z = samples[i]
+        mag = math.sqrt(x * x + y * y + z * z) * scale
+        if last_mag is not None:
+            d = abs(mag - last_mag)
+            if d >= delta and i - last_hit > cooldown:
+                hits.append(i)
+                last_hit = i
+        last_mag = mag
+    return hits
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report shake detection rates.")
+    parser.add_argument("recordings", nargs="*",
+                        help="CSV files from sim/capture_shake.py")
+    parser.add_argument("--seconds", type=int, default=120,
+                        help="length of the synthetic recording")
+    parser.add_argument("--seed", type=int, default=1,
+                        help="seed of the synthetic recording")
+    args = parser.parse_args(argv)
+
+    config = load_config()
+    if args.recordings:
+        recordings = [(p,) + read_recording(p) for p in args.recordings]
+    else:
+        recordings = [("synthetic",) + synthesize(args.seconds, seed=args.seed)]
+
+    for name, rate, samples, labels in recordings:
+        minutes = len(samples) / rate / 60
+        print(
+            "%s: %d samples @ %d Hz, %d labelled shakes"
+            % (name, len(samples), rate, len(segments(labels)))
+        )
+        print("  threshold  detector   detect%  false+  false+/min")
+        for mult in SWEEP:
+            delta = config.SHAKE_DELTA_THRESHOLD * mult
+            for label, fn in (("stream", run_streaming), ("legacy", run_legacy)):
+                hits = fn(samples, rate, delta, config)
+                pct, fp = score(hits, labels, rate)
+                marker = " <- config" if mult == 1.0 else ""
+                print(
+                    "  %8.2f   %-8s  %7.1f  %6d  %10.2f%s"
+                    % (delta, label, pct, fp, fp / minutes, marker)
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+# Builds the game and the subsystems it drives.
+#
+# Shared by the two entry points: code.py runs the subsystems on the
+# fixed-timestep scheduler, code_async.py as asyncio tasks. Both only
+# decide how often each part runs; everything they run is built here.
+#
+# Start-up is staged (see startup.py): the OLED shows the splash first,
+# the game is interactive next, and the accelerometer, NeoPixels and
+# stats store are set up by the main loop in the frames after that.
+
+import random
+import time
+import board
+
+import config
+import log
+from display_ui import Display
+from startup import Timeline, Stages
+
+
+class App:
+    """
+    The running game: display, inputs, lights, game engine, the idle
+    power manager and the optional profiler, recorder or replay source.
+
+    Parameters:
+    - boot_ns: time.monotonic_ns() at the top of the entry point, time
+      zero of the boot timeline
+    """
+
+    def __init__(self, boot_ns):
+        self.timeline = Timeline(boot_ns)
+        self.stages = Stages(self.timeline, config.BOOT_TRACE)
+
+        # Initialize a shared I2C bus used by both OLED and accelerometer
+        # The ESP32 board maps SCL to D5 and SDA to D4 in this project
+        i2c = board.I2C()
+
+        # Display controller manages the SSD1306 OLED screen
+        # (the native display bus needs the real I2C object).
+        # It comes up first so the splash shows while the rest starts.
+        self.display = display = Display(i2c)
+        display.start_splash_animation()
+        display.refresh()
+        self.timeline.mark("first frame")
+
+        # Everything else is imported once the first frame is up
+        from inputs import InputManager
+        from lights import Lights
+        from game_engine import Game
+        from states import GAME_OVER, GAME_WIN
+
+        # Bus arbiter: the accelerometer's transfers go through it, and
+        # the display tells it about every refresh
+        self.bus = bus = None
+        sensor_i2c = i2c
+        if config.BUS_ARBITER:
+            from bus import Bus
+
+            self.bus = bus = sensor_i2c = Bus(
+                i2c, config.BUS_RETRIES, config.BUS_BACKOFF_US, config.BUS_BULK_BYTES
+            )
+            display.bus = bus
+
+        # Optional frame profiler. When disabled nothing is wrapped,
+        # so the hot paths run exactly as without it.
+        self.profiler = profiler = None
+        if config.PROFILE_ENABLED:
+            from profiler import Profiler
+
+            self.profiler = profiler = Profiler(config.PROFILE_DUMP_ON_GAME_OVER)
+            sensor_i2c = profiler.count_i2c(sensor_i2c)
+            profiler.bus = bus
+
+        # Optional session recording or replay. Both fix the random seed so
+        # the move sequences can be reproduced.
+        self.recorder = recorder = None
+        self.source = source = None
+        if config.REPLAY_PATH:
+            from replay import ReplaySource, load_session
+
+            session = load_session(config.REPLAY_PATH, config.REPLAY_SESSION)
+            random.seed(session.seed)
+            self.source = source = ReplaySource(session)
+        elif config.RECORD_ENABLED:
+            from replay import Recorder, new_seed
+
+            seed = config.RECORD_SEED
+            if seed is None:
+                seed = new_seed()
+            random.seed(seed)
+            self.recorder = recorder = Recorder(
+                config.RECORD_PATH, seed, config.GAME_RATE_HZ,
+                config.RECORD_BUFFER, config.RECORD_MAX_BYTES,
+            )
+
+        # Input manager handles rotary encoder input, button press,
+        # and accelerometer-based shake detection (started in a later stage)
+        self.inputs = inputs = InputManager(sensor_i2c, source, accel=False)
+        inputs.recorder = recorder
+        self.stages.add("accelerometer", inputs.start_accel)
+        if bus:
+            # Read the accelerometer before long display transfers
+            bus.add_service(inputs.service_accel)
+
+        # LED controller manages NeoPixel lighting effects for the game
+        # (the strip is started in a later stage)
+        self.lights = lights = Lights(start=False)
+        self.stages.add("lights", lights.start)
+
+        if profiler:
+            profiler.instrument_inputs(inputs)
+            profiler.instrument_display(display)
+            profiler.instrument_lights(lights)
+
+        # Game engine handles all game states, difficulty logic,
+        # sequences, timers, and interactions with input and display
+        self.game = game = Game(inputs, display, lights)
+        if profiler:
+            profiler.instrument_game(game)
+
+        # Optional reaction stats, kept in NVM (or a file) across power
+        # cycles. Reading the stored records waits for a later stage.
+        if config.STATS_ENABLED:
+            self.stages.add("stats", self._load_stats)
+
+        # Idle power manager. Recording and replay need the game ticks at
+        # their normal times, so it is left out for both.
+        self.power = None
+        if config.POWER_ENABLED and recorder is None and source is None:
+            from power import PowerManager
+
+            self.power = PowerManager(inputs, display, lights, game)
+
+        # Follow state transitions for recording, replay checks and log dumps
+        if recorder:
+            game.add_listener(
+                lambda old, new: recorder.transition(new, time.monotonic_ns())
+            )
+        if source:
+            game.add_listener(lambda old, new: source.check(new, time.monotonic_ns()))
+        if config.LOG_FLUSH_ON_GAME_END:
+            def flush_log(old, new):
+                if new == GAME_OVER or new == GAME_WIN:
+                    log.flush(config.LOG_PATH)
+
+            game.add_listener(flush_log)
+
+    def _load_stats(self):
+        from stats import Stats, open_region
+
+        region = open_region(
+            config.STATS_PATH, config.STATS_NVM_OFFSET, config.STATS_SLOTS,
+            config.STATS_HIGH_SCORES,
+        )
+        if region is not None:
+            self.game.stats = Stats(
+                region, config.STATS_CAPACITY, config.STATS_BATCH,
+                config.STATS_HIGH_SCORES,
+            )
+
+    def game_tick(self, dt):
+        """
+        Collect the frame's input flags, then update the game state machine.
+        """
+        self.inputs.update()
+        if self.power:
+            self.power.tick()
+        if self.profiler:
+            self.profiler.check_gesture(self.inputs, self.game.state)
+        self.game.update(dt)
+
+    def start(self):
+        """
+        Call right before the main loop: session time zero is the first
+        game tick, and from here on the game takes input.
+        """
+        if self.recorder:
+            self.recorder.start(time.monotonic_ns())
+        if self.source:
+            self.source.start(time.monotonic_ns())
+        self.timeline.mark("interactive")
+
+    def stop(self):
+        """
+        Call when the main loop ends (Ctrl-C or an auto-reload): writes
+        out the recording's buffered records.
+        """
+        if self.recorder:
+            self.recorder.flush()
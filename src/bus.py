@@ -0,0 +1,199 @@
+# Arbiter for the I2C bus shared by the OLED and the ADXL345.
+#
+# The OLED is driven by displayio, and a refresh is one C call that holds
+# the bus until its whole window is sent (up to about 1 KB, 25 ms at
+# 400 kHz, for a screen change). It cannot be cut into pieces from
+# Python, so the arbiter orders the work around it instead:
+#
+# - sensor drivers talk to the bus through Bus, which has busio.I2C's
+#   interface (like profiler.CountingI2C)
+# - before a refresh of at least config.BUS_BULK_BYTES, the registered
+#   sensor services run first (InputManager.service_accel), so the
+#   accelerometer is read right before the bus is taken; during the
+#   transfer the chip keeps its activity latch or FIFO (32 samples,
+#   320 ms at 100 Hz), so a shake is still there for the next read
+# - a failed sensor transfer is retried up to config.BUS_RETRIES times,
+#   waiting config.BUS_BACKOFF_US, then twice as long, ... in between
+# - bus time is accounted per device: timed sensor transfers, and the
+#   display's refresh calls with the bytes Display estimates they sent
+#
+# report() prints the accounting; the profiler dump includes it.
+#
+# busio.I2C takes end, out_end and in_end as ints only (None raises
+# TypeError), while drivers pass None for "to the end of the buffer", so
+# the wrapper resolves them before forwarding.
+
+import time
+from array import array
+
+# Per-device counters
+_TXNS = 0
+_BYTES = 1
+_BUSY_US = 2
+_RETRIES = 3
+_FAILURES = 4
+
+
+class Bus:
+    """
+    Pass-through busio.I2C wrapper with retries and per-device bus time,
+    and the hook Display uses before and after a refresh.
+
+    Parameters:
+    - i2c: the shared busio.I2C
+    - retries: extra attempts for a failed transfer
+    - backoff_us: wait before the first retry, doubled for each next one
+    - bulk_bytes: display refreshes of at least this many bytes run the
+      sensor services first
+    """
+
+    def __init__(self, i2c, retries=2, backoff_us=200, bulk_bytes=128):
+        self._i2c = i2c
+        self.retries = retries
+        self.backoff_us = backoff_us
+        self.bulk_bytes = bulk_bytes
+        # address -> array [transactions, bytes, busy_us, retries, failures]
+        self.devices = {}
+        self._services = []
+
+    def _stat(self, address):
+        stat = self.devices.get(address)
+        if stat is None:
+            stat = array("L", [0, 0, 0, 0, 0])
+            self.devices[address] = stat
+        return stat
+
+    def _retry(self, stat, attempt):
+        """
+        Count a failed attempt. Returns False once the retries are used
+        up; otherwise waits out the backoff and returns True.
+        """
+        if attempt >= self.retries:
+            stat[_FAILURES] += 1
+            return False
+        stat[_RETRIES] += 1
+        time.sleep((self.backoff_us << attempt) / 1000000)
+        return True
+
+    def account(self, address, nbytes, ns):
+        """
+        Add a transfer made outside the wrapper (a display refresh).
+        """
+        stat = self._stat(address)
+        stat[_TXNS] += 1
+        stat[_BYTES] += nbytes
+        stat[_BUSY_US] += ns // 1000
+
+    # -------------------------------
+    # Priorities
+    # -------------------------------
+
+    def add_service(self, fn):
+        """
+        Register fn() to run before every bulk display transfer.
+        """
+        self._services.append(fn)
+
+    def before_refresh(self, nbytes):
+        """
+        Called by Display right before a refresh of about nbytes.
+        """
+        if nbytes >= self.bulk_bytes:
+            for fn in self._services:
+                fn()
+
+    # -------------------------------
+    # busio.I2C interface
+    # -------------------------------
+
+    def try_lock(self):
+        return self._i2c.try_lock()
+
+    def unlock(self):
+        self._i2c.unlock()
+
+    def scan(self):
+        return self._i2c.scan()
+
+    def writeto(self, address, buffer, *, start=0, end=None):
+        if end is None:
+            end = len(buffer)
+        stat = self._stat(address)
+        begin = time.monotonic_ns()
+        attempt = 0
+        while True:
+            try:
+                self._i2c.writeto(address, buffer, start=start, end=end)
+                break
+            except OSError:
+                if not self._retry(stat, attempt):
+                    raise
+                attempt += 1
+        stat[_TXNS] += 1
+        stat[_BYTES] += end - start
+        stat[_BUSY_US] += (time.monotonic_ns() - begin) // 1000
+
+    def readfrom_into(self, address, buffer, *, start=0, end=None):
+        if end is None:
+            end = len(buffer)
+        stat = self._stat(address)
+        begin = time.monotonic_ns()
+        attempt = 0
+        while True:
+            try:
+                self._i2c.readfrom_into(address, buffer, start=start, end=end)
+                break
+            except OSError:
+                if not self._retry(stat, attempt):
+                    raise
+                attempt += 1
+        stat[_TXNS] += 1
+        stat[_BYTES] += end - start
+        stat[_BUSY_US] += (time.monotonic_ns() - begin) // 1000
+
+    def writeto_then_readfrom(
+        self, address, out_buffer, in_buffer, *,
+        out_start=0, out_end=None, in_start=0, in_end=None
+    ):
+        if out_end is None:
+            out_end = len(out_buffer)
+        if in_end is None:
+            in_end = len(in_buffer)
+        stat = self._stat(address)
+        begin = time.monotonic_ns()
+        attempt = 0
+        while True:
+            try:
+                self._i2c.writeto_then_readfrom(
+                    address, out_buffer, in_buffer,
+                    out_start=out_start, out_end=out_end,
+                    in_start=in_start, in_end=in_end,
+                )
+                break
+            except OSError:
+                if not self._retry(stat, attempt):
+                    raise
+                attempt += 1
+        stat[_TXNS] += 1
+        stat[_BYTES] += out_end - out_start + in_end - in_start
+        stat[_BUSY_US] += (time.monotonic_ns() - begin) // 1000
+
+    # -------------------------------
+    # Accounting
+    # -------------------------------
+
+    def report(self):
+        """
+        Print transactions, bytes, bus time, retries and failures per device.
+        """
+        for address, stat in sorted(self.devices.items()):
+            print(
+                "BUS: 0x%02x txns = %d bytes = %d busy = %d ms retries = %d failures = %d"
+                % (address, stat[_TXNS], stat[_BYTES], stat[_BUSY_US] // 1000,
+                   stat[_RETRIES], stat[_FAILURES])
+            )
+
+    def reset(self):
+        for stat in self.devices.values():
+            for i in range(len(stat)):
+                stat[i] = 0
@@ -1,57 +1,67 @@
 import time
-import board
 
-from inputs import InputManager
-from display_ui import Display
-from lights import Lights
-from game_engine import Game
+# Time zero of the boot timeline, before anything else is imported
+_BOOT_NS = time.monotonic_ns()
+
+import config
+from app import App
 
 
 def main():
     """
     Main entry point of the Rhythm GBA game.
-    Initializes all hardware interfaces and managers, then enters
-    the main update loop that keeps the game running.
+    Initializes all hardware interfaces and managers (app.py), then hands
+    the subsystems to a fixed-timestep scheduler that keeps the game
+    running. code_async.py runs the same game on asyncio instead.
     """
-
-    # Initialize a shared I2C bus used by both OLED and accelerometer
-    # The ESP32 board maps SCL to D5 and SDA to D4 in this project
-    i2c = board.I2C()
-
-    # Input manager handles rotary encoder input, button press,
-    # and accelerometer-based shake detection
-    inputs = InputManager(i2c)
-
-    # Display controller manages the SSD1306 OLED screen
-    display = Display(i2c)
-
-    # LED controller manages NeoPixel lighting effects for the game
-    lights = Lights()
-
-    # Game engine handles all game states, difficulty logic,
-    # sequences, timers, and interactions with input and display
-    game = Game(inputs, display, lights)
-
-    # Track time between frames for delta-time updates
-    last = time.monotonic()
+    app = App(_BOOT_NS)
+
+    from scheduler import Scheduler
+
+    # Each subsystem ticks at its own fixed rate.
+    # Deadlines are absolute, so the frame rate does not drift with the
+    # cost of a redraw, and the loop sleeps only until the next deadline.
+    scheduler = Scheduler()
+
+    # Sample encoder and button edges between game ticks
+    inputs = app.inputs
+    input_task = scheduler.add("input", lambda dt: inputs.poll(), config.INPUT_RATE_HZ)
+
+    # Collect the frame's input flags, then update the game state machine.
+    # Game logic may run a few ticks back to back to catch up after a stall.
+    game_task = scheduler.add(
+        "game", app.game_tick, config.GAME_RATE_HZ, config.SCHED_MAX_CATCHUP
+    )
+
+    # Update lighting animations
+    lights_task = scheduler.add("lights", app.lights.update, config.LIGHTS_RATE_HZ)
+
+    # Commit display changes; skipped cheaply when nothing changed
+    game = app.game
+    display_task = scheduler.add("display", lambda dt: game.render(), config.DISPLAY_RATE_HZ)
+
+    # Slow everything down while a screen waits for input; the first
+    # input event brings the full rates back
+    power = app.power
+    if power is not None:
+        idle_rate = config.POWER_IDLE_RATE_HZ
+        power.attach(scheduler, (
+            (input_task, config.INPUT_RATE_HZ, config.POWER_IDLE_INPUT_HZ),
+            (game_task, config.GAME_RATE_HZ, idle_rate),
+            (lights_task, config.LIGHTS_RATE_HZ, idle_rate),
+            (display_task, config.DISPLAY_RATE_HZ, idle_rate),
+        ))
+        inputs.ready = power
+
+    # Deferred start-up, one stage per scheduler pass
+    app.stages.start(scheduler.add("startup", app.stages.run, 0))
 
     # Main game loop
-    while True:
-        now = time.monotonic()
-        dt = now - last   # Time elapsed since previous frame
-        last = now
-
-        # Read inputs from encoder, button, and accelerometer
-        inputs.update()
-
-        # Update the game state machine
-        game.update(dt)
-
-        # Update lighting animations
-        lights.update(dt)
-
-        # Reduce CPU load and stabilize update frequency
-        time.sleep(0.01)
+    app.start()
+    try:
+        scheduler.run_forever(config.SCHED_REPORT_INTERVAL)
+    finally:
+        app.stop()
 
 
 # Run the application
@@ -0,0 +1,145 @@
+# Alternative entry point: the same game as cooperative asyncio tasks.
+#
+# To use it, copy this file over code.py on the board (or run
+# `import code_async` from the REPL). It needs the asyncio and
+# adafruit_ticks libraries in lib/.
+#
+# Tasks, in place of the scheduler's fixed-rate slots in code.py:
+#     input    samples the encoder and button at INPUT_RATE_HZ
+#     game     ticks the state machine at GAME_RATE_HZ while something can
+#              happen without input (animation, countdown, held button);
+#              otherwise it awaits InputManager.ready, which is set for
+#              every queued input event, and costs nothing until then
+#     lights   LED animation at LIGHTS_RATE_HZ
+#     display  OLED refresh at DISPLAY_RATE_HZ
+#     startup  deferred start-up stages, one per pass of the event loop
+#     power    wakes the waiting game task when the power manager is due
+#              to step down (power.py); the task rates stay the same
+#
+# The splash animation advances with game ticks, and every task awaits
+# between frames, so input sampling carries on while a screen animates.
+# A refresh itself is one displayio call and cannot be split; a screen
+# change (about 1 KB over I2C) still holds the loop for its transfer,
+# and encoder edges in that time are counted by the rotaryio or keypad
+# backend in the background.
+
+import time
+
+# Time zero of the boot timeline, before anything else is imported
+_BOOT_NS = time.monotonic_ns()
+
+import asyncio
+
+import config
+from app import App
+
+
+async def _every(rate, fn):
+    """
+    Call fn(dt) rate times a second on absolute deadlines, resyncing
+    instead of catching up after a stall.
+    """
+    period_ns = 1000000000 // rate
+    dt = period_ns / 1000000000
+    next_ns = time.monotonic_ns()
+    while True:
+        fn(dt)
+        next_ns += period_ns
+        now = time.monotonic_ns()
+        if next_ns < now:
+            next_ns = now
+        await asyncio.sleep_ms((next_ns - now) // 1000000)
+
+
+def _idle(app):
+    """
+    True if the game cannot change state or screen without new input.
+    """
+    return (
+        app.game.next_deadline_ns() is None
+        and not app.display.animating
+        and not app.inputs.button_down
+    )
+
+
+async def _game(app):
+    """
+    Game ticks while the game is active; otherwise wait for input.
+    """
+    game = app.game
+    ready = app.inputs.ready
+    period_ns = 1000000000 // config.GAME_RATE_HZ
+    last_ns = next_ns = time.monotonic_ns()
+    while True:
+        # Cleared before the tick, so an event queued from here on wakes
+        # the wait below at once
+        ready.clear()
+        now = time.monotonic_ns()
+        state = game.state
+        app.game_tick((now - last_ns) / 1000000000)
+        last_ns = now
+
+        # A new state gets one more tick for its first-frame work
+        if game.state == state and _idle(app):
+            await ready.wait()
+            next_ns = time.monotonic_ns()
+            continue
+
+        next_ns += period_ns
+        now = time.monotonic_ns()
+        if next_ns < now:
+            next_ns = now
+        await asyncio.sleep_ms((next_ns - now) // 1000000)
+
+
+async def _startup(stages):
+    while not stages.done:
+        stages.run(0)
+        await asyncio.sleep_ms(0)
+
+
+async def _power(power, ready):
+    """
+    Let the game tick when the power manager may step down, even if the
+    game task is waiting for input.
+    """
+    while True:
+        now = time.monotonic_ns()
+        due = power.next_step_ns()
+        if due is None:
+            due = now + 1000000000
+        elif due <= now:
+            ready.set()
+            due = now + 1000000000 // config.POWER_IDLE_RATE_HZ
+        await asyncio.sleep_ms((due - now) // 1000000 + 1)
+
+
+async def _main(app):
+    inputs = app.inputs
+    game = app.game
+    tasks = [
+        asyncio.create_task(_every(config.INPUT_RATE_HZ, lambda dt: inputs.poll())),
+        asyncio.create_task(_game(app)),
+        asyncio.create_task(_every(config.LIGHTS_RATE_HZ, app.lights.update)),
+        asyncio.create_task(_every(config.DISPLAY_RATE_HZ, lambda dt: game.render())),
+        asyncio.create_task(_startup(app.stages)),
+    ]
+    if app.power is not None:
+        tasks.append(asyncio.create_task(_power(app.power, inputs.ready)))
+    await asyncio.gather(*tasks)
+
+
+def main():
+    """
+    Build the game like code.py and run it on the asyncio event loop.
+    """
+    app = App(_BOOT_NS)
+    app.inputs.ready = asyncio.Event()
+    app.start()
+    try:
+        asyncio.run(_main(app))
+    finally:
+        app.stop()
+
+
+main()
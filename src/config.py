@@ -24,6 +24,17 @@ ENCODER_BUTTON = board.D9
 # - Red for game over, etc.
 NEOPIXEL_PIN = board.D10
 NEOPIXEL_COUNT = 4
+NEOPIXEL_BRIGHTNESS = 0.3
+
+# Whole-strip flash on every correct move
+LIGHTS_FLASH_TIME = 0.08        # Seconds
+LIGHTS_FLASH_COLOR = (255, 255, 255)
+
+# Most pixels.show() calls per second. Each show bit-bangs the LED data
+# with interrupts off, so a cap keeps it from delaying encoder edges.
+# A color set in between is shown once the interval has passed.
+# 0 = no limit.
+LIGHTS_MAX_SHOW_HZ = 30
 
 
 # ----------------------------------------
@@ -31,10 +42,13 @@ NEOPIXEL_COUNT = 4
 # ----------------------------------------
 # Each difficulty defines:
 # - base_moves: number of moves in Level 1
-# - level_time: total time budget per level
+# - level_time: total time budget per level, either seconds for every
+#   level or a curve of (level, seconds) points, linear in between and
+#   flat past either end, e.g. ((1, 20.0), (5, 18.0), (10, 12.0))
 #
 # Each subsequent level increases move count by +1.
-# Per-move time = level_time / number_of_moves.
+# Per-move time = level_time / number_of_moves * MOVE_TIME_WEIGHTS[move].
+# All of it is tabulated at boot (schedule.py).
 DIFFICULTIES = {
     "EASY": {
         "base_moves": 2,      # Level 1 contains 2 actions
@@ -57,15 +71,68 @@ TOTAL_LEVELS = 10
 # ----------------------------------------
 # Move Identifiers
 # ----------------------------------------
-# These string constants are used by the game engine
-# to match player input with the expected action.
-MOVE_CW = "ROTATE_RIGHT"   # Clockwise rotation
-MOVE_CCW = "ROTATE_LEFT"   # Counter-clockwise rotation
-MOVE_PRESS = "PRESS"       # Encoder button press
-MOVE_SHAKE = "SHAKE"       # Accelerometer shake gesture
+# Moves are small ints so a level's sequence fits in a bytearray and
+# per-move data (names, colors, matching input events) is a table lookup.
+MOVE_CW = 0       # Clockwise rotation
+MOVE_CCW = 1      # Counter-clockwise rotation
+MOVE_PRESS = 2    # Encoder button press
+MOVE_SHAKE = 3    # Accelerometer shake gesture
 
 # The set of all possible actions the game may generate
-ALL_MOVES = [MOVE_CW, MOVE_CCW, MOVE_PRESS, MOVE_SHAKE]
+ALL_MOVES = (MOVE_CW, MOVE_CCW, MOVE_PRESS, MOVE_SHAKE)
+
+# Text shown on the HUD for each move, indexed by move id
+MOVE_NAMES = ("ROTATE_RIGHT", "ROTATE_LEFT", "PRESS", "SHAKE")
+
+# Share of the average per-move time each move gets, indexed by move id.
+# A shake takes longer to perform than a press. Keep the mean at 1.0 so
+# a level still takes level_time on average.
+MOVE_TIME_WEIGHTS = (1.0, 1.0, 0.8, 1.2)
+
+# NeoPixel color for each move, indexed by move id
+MOVE_COLORS = (
+    (255, 255, 0),      # Rotate right: yellow
+    (0, 255, 255),      # Rotate left: cyan
+    (0, 255, 0),        # Button press: green
+    (255, 255, 255),    # Shake: white
+)
+
+
+# ----------------------------------------
+# Adaptive Difficulty
+# ----------------------------------------
+# When enabled, per-move times are scaled by one of ADAPTIVE_SCALES,
+# chosen from the player's recent reactions. The reaction to each correct
+# move is measured as a share of the time allowed for it. At every level
+# start the mean of the last ADAPTIVE_WINDOW reactions is compared with
+# the limits below. A fast mean moves one scale step harder and a slow
+# mean moves one step easier. Scaling starts at 1.0.
+ADAPTIVE_ENABLED = False
+ADAPTIVE_WINDOW = 8
+ADAPTIVE_FAST = 0.35            # Mean share below this: less time
+ADAPTIVE_SLOW = 0.70            # Mean share above this: more time
+ADAPTIVE_SCALES = (0.6, 0.7, 0.8, 0.9, 1.0, 1.15, 1.3, 1.5)
+
+
+# ----------------------------------------
+# Reaction Stats
+# ----------------------------------------
+# Reaction times of each game are summarised when it ends (per-move
+# median and 90th percentile, level reached, correct moves) and kept in
+# a ring of STATS_SLOTS records (see stats.py). The all-time best runs
+# and high scores are kept beside the ring, so they survive power cycles
+# and the ring wrapping. A short press in the menu shows them.
+# Records go to microcontroller.nvm, which needs no writable filesystem,
+# or to STATS_PATH if set (needs the filesystem remounted in boot.py).
+# Nothing is written during play; finished games are queued and written
+# STATS_BATCH at a time from an idle frame (a power cut loses the queue).
+STATS_ENABLED = True
+STATS_PATH = None               # File instead of NVM (None = NVM)
+STATS_NVM_OFFSET = 0            # First NVM byte used
+STATS_SLOTS = 128               # Games kept before the oldest is overwritten
+STATS_CAPACITY = 256            # Reactions kept per game
+STATS_BATCH = 1                 # Finished games per write
+STATS_HIGH_SCORES = 4           # Entries in the high-score table
 
 
 # ----------------------------------------
@@ -80,13 +147,85 @@ SHAKE_DELTA_THRESHOLD = 2.0     # Minimum delta magnitude required to count as a
 SHAKE_MAX_DELTA = 100.0         # Discard extreme spikes as sensor noise or error
 SHAKE_COOLDOWN = 0.3            # Prevent repeated triggering from a single shake
 
+# Shake detection mode:
+# - "activity": the ADXL345 activity interrupt detects the shake on-chip;
+#   each frame reads one INT_SOURCE byte (or only the INT1 pin)
+# - "fifo": ADXL345 samples into its FIFO at ACCEL_FIFO_RATE; the whole
+#   batch is drained each frame and run through a streaming detector
+# - "poll": one acceleration read per frame (original detector)
+# The thresholds above are in m/s^2 in every mode; "activity" and "fifo"
+# convert them to register / raw count units once at start-up.
+# "fifo" stays the default: sim/shake_harness.py measures its false
+# positives on recordings, while "activity" has no such numbers yet and
+# fires on any desk knock above the threshold.
+SHAKE_MODE = "fifo"
+
+# Optional pin wired to the ADXL345 INT1 output, used in "activity" mode.
+# With None, INT_SOURCE is read over I2C every frame instead.
+ACCEL_INT_PIN = None
+ACCEL_FIFO_RATE = 100           # Output data rate in Hz (25, 50, 100, 200, 400)
+SHAKE_FILTER_WINDOW = 8         # High-pass moving-average length (power of two)
+SHAKE_MIN_HITS = 3              # Over-threshold samples needed, rejects single taps
+
+
+# ----------------------------------------
+# Rotary Encoder Backend
+# ----------------------------------------
+# Where encoder edges are counted:
+# - "auto": try rotaryio, then keypad, then polling
+# - "rotaryio": hardware/background quadrature counter
+# - "keypad": background-scanned edges through the keypad event queue
+# - "polling": sample encA/encB from the main loop (fallback)
+# All backends decode both channels, so bounce cancels out
+# and no rotation cooldown is needed.
+ENCODER_BACKEND = "auto"
+
+# Quarter steps per physical detent (4 for most detented encoders)
+ENCODER_DIVISOR = 4
+
+# Background scan interval for the keypad backend (seconds)
+ENCODER_SCAN_INTERVAL = 0.001
+
+# Flip the sign of rotation if the encoder is wired the other way round
+ENCODER_REVERSE = False
+
+
+# ----------------------------------------
+# Input Event Queue
+# ----------------------------------------
+# Maximum number of timestamped input events kept between frames.
+# When full, the oldest event is dropped.
+INPUT_QUEUE_SIZE = 16
+
+
+# ----------------------------------------
+# Main Loop Scheduling
+# ----------------------------------------
+# Tick rates (Hz) for each subsystem in code.py.
+# - Input: encoder/button sampling between game ticks
+# - Game: input flags + game state machine
+# - Lights: NeoPixel animation
+# - Display: most OLED refreshes per second (only when something changed)
+INPUT_RATE_HZ = 500
+GAME_RATE_HZ = 100
+LIGHTS_RATE_HZ = 50
+DISPLAY_RATE_HZ = 30
+
+# Most game ticks run back to back after a slow frame before the
+# scheduler gives up and resynchronises
+SCHED_MAX_CATCHUP = 3
+
+# Seconds between overrun reports over serial, 0 to disable
+SCHED_REPORT_INTERVAL = 0
+
 
 # ----------------------------------------
-# Rotary Encoder Cooldown
+# HUD Countdown Bar
 # ----------------------------------------
-# Prevent multiple rotation events being triggered
-# from a single physical detent or due to bouncing.
-ROTATE_COOLDOWN = 0.5
+# Most countdown bar updates per second. Each update only redraws the
+# columns the bar shrank by, and this cap keeps display traffic small
+# even when per-move time is well under a second.
+COUNTDOWN_BAR_HZ = 15
 
 
 # ----------------------------------------
@@ -95,6 +234,7 @@ ROTATE_COOLDOWN = 0.5
 # Duration the encoder button must be held
 # in the difficulty menu to start the game.
 MENU_PRESS_HOLD = 0.2
+MENU_PRESS_HOLD_NS = int(MENU_PRESS_HOLD * 1000000000)
 
 
 # ----------------------------------------
@@ -103,3 +243,106 @@ MENU_PRESS_HOLD = 0.2
 # Prevents a single gesture from being interpreted
 # as multiple valid actions in rapid succession.
 ACTION_COOLDOWN = 0.25
+ACTION_COOLDOWN_NS = int(ACTION_COOLDOWN * 1000000000)
+
+
+# ----------------------------------------
+# Shared I2C Bus
+# ----------------------------------------
+# The accelerometer talks through the bus arbiter (bus.py): failed
+# transfers are retried BUS_RETRIES times with a backoff starting at
+# BUS_BACKOFF_US and doubling, the activity latch or FIFO is read right
+# before every display refresh of BUS_BULK_BYTES or more (the poll
+# detector keeps its one read per frame), and bus time is accounted per
+# device (in the profiler dump).
+BUS_ARBITER = True
+BUS_RETRIES = 2
+BUS_BACKOFF_US = 200
+BUS_BULK_BYTES = 128            # About 3 ms on the wire at 400 kHz
+
+
+# ----------------------------------------
+# Start-up
+# ----------------------------------------
+# The OLED and splash come up first; the accelerometer, NeoPixels and
+# stats store are set up over the first frames after that (startup.py).
+# With BOOT_TRACE the boot timeline (ms from the start of code.py to the
+# first frame, to interactive and to each later stage) is printed over
+# serial once start-up is complete.
+BOOT_TRACE = False
+
+
+# ----------------------------------------
+# Power Saving
+# ----------------------------------------
+# On a screen that only waits for input (splash, menu, stats, end
+# screens), after POWER_IDLE_AFTER seconds without input the loop slows
+# down, the LEDs dim and the accelerometer samples in low-power mode.
+# After POWER_SLEEP_AFTER seconds the LEDs and the OLED are turned off,
+# the accelerometer is put in standby and the board light-sleeps until
+# the button is pressed (alarm module). Any input goes back to the full
+# rates on the next frame; the press that wakes the board is not
+# treated as a press. Not used while recording or replaying a session.
+POWER_ENABLED = True
+POWER_IDLE_AFTER = 20.0         # Seconds
+POWER_SLEEP_AFTER = 120.0       # Seconds (0 = never sleep)
+POWER_IDLE_RATE_HZ = 10         # Game, lights and display rate while idle
+POWER_IDLE_INPUT_HZ = 50        # Input sampling while idle (catches short taps)
+POWER_IDLE_BRIGHTNESS = 0.05
+POWER_LIGHT_SLEEP = True        # False: sleep mode keeps polling at idle rates
+POWER_REPORT = False            # Print the current estimate on every mode change
+
+# Estimated supply current (mA) of each part, for the report
+POWER_MA_CPU_BUSY = 25.0        # ESP32-C3 running code
+POWER_MA_CPU_WAIT = 15.0        # In time.sleep() between frames
+POWER_MA_CPU_LIGHT_SLEEP = 1.0  # alarm light sleep, regulator included
+POWER_MA_OLED = 8.0             # SSD1306 on, menu-sized text
+POWER_MA_OLED_SLEEP = 0.01
+POWER_MA_ACCEL = (0.14, 0.035, 0.0001)  # ADXL345 on, low power, standby
+POWER_MA_PIXEL = 0.7            # NeoPixel quiescent, each
+POWER_MA_PIXEL_FULL = 60.0      # Extra for one pixel at full white and brightness 1.0
+
+
+# ----------------------------------------
+# Profiling
+# ----------------------------------------
+# Wraps InputManager, Game (per state), Display.show_* and Lights.update
+# with timing probes and counts sensor I2C traffic. Off by default; when
+# off, no wrappers are installed and there is no runtime cost.
+# The summary is printed over serial when the board is shaken in the
+# splash screen or the menu, and optionally at game over / win.
+PROFILE_ENABLED = False
+PROFILE_DUMP_ON_GAME_OVER = True
+
+
+# ----------------------------------------
+# Logging
+# ----------------------------------------
+# Game code logs compact records into a RAM ring buffer instead of
+# printing (see log.py); printing over serial stalls the game loop.
+# Levels: 10 = DEBUG, 20 = INFO, 30 = WARN, 40 = ERROR, 100 = OFF.
+# DEBUG adds per-move and per-frame shake records.
+LOG_LEVEL = 20
+LOG_ECHO_LEVEL = 30             # Records at or above this level print at once
+LOG_CAPACITY = 64               # Records kept before the oldest are overwritten
+LOG_FLUSH_ON_GAME_END = False   # Dump the buffer at game over / win
+LOG_PATH = None                 # File to append dumps to (None = serial)
+
+
+# ----------------------------------------
+# Session Record / Replay
+# ----------------------------------------
+# Recording logs the random seed and every input event to flash so a
+# session can be reproduced (see replay.py). Writing needs the filesystem
+# remounted writable in boot.py; without that, recording switches itself
+# off. Records are buffered and written when a game ends.
+RECORD_ENABLED = False
+RECORD_PATH = "/sessions.agr"
+RECORD_BUFFER = 2048            # Bytes buffered between flash writes: one whole game
+RECORD_MAX_BYTES = 65536        # Recording stops once the file is this big
+RECORD_SEED = None              # Fixed seed, or None for a new one each boot
+
+# Replay a recorded session instead of reading the encoder, button and
+# accelerometer. Transitions are checked against the recording.
+REPLAY_PATH = None
+REPLAY_SESSION = -1             # Index into the file (-1 = latest session)
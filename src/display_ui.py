@@ -1,11 +1,282 @@
 import time
 import board
+import bitmaptools
 import displayio
 import terminalio
-from adafruit_display_text import label
+from array import array
 import i2cdisplaybus
 import adafruit_displayio_ssd1306
 
+import config
+from tween import Tween
+
+
+# Screen size in pixels
+WIDTH = 128
+HEIGHT = 64
+
+# SSD1306 address on the shared I2C bus
+I2C_ADDRESS = 0x3C
+
+# The SSD1306 stores 8 vertical pixels per byte ("pages"), so a full
+# frame is WIDTH * HEIGHT / 8 bytes. Each refreshed window also costs a
+# few addressing command bytes.
+PAGE_HEIGHT = 8
+FULL_FRAME_BYTES = WIDTH * HEIGHT // PAGE_HEIGHT
+_WINDOW_OVERHEAD_BYTES = 8
+
+# The built-in terminal font is monospaced, so every glyph has the same
+# width and centering is plain arithmetic instead of measuring a label
+_FONT = terminalio.FONT
+GLYPH_W, GLYPH_H = _FONT.get_bounding_box()[:2]
+LINE_CHARS = WIDTH // GLYPH_W
+
+# Tile index of every printable ASCII character in the font bitmap,
+# looked up once at import (characters without a glyph show as blank)
+_FIRST_CHAR = 32
+_LAST_CHAR = 126
+
+
+def _build_tile_table():
+    table = array("H", [0] * (_LAST_CHAR - _FIRST_CHAR + 1))
+    blank = _FONT.get_glyph(_FIRST_CHAR).tile_index
+    for code in range(_FIRST_CHAR, _LAST_CHAR + 1):
+        glyph = _FONT.get_glyph(code)
+        table[code - _FIRST_CHAR] = glyph.tile_index if glyph else blank
+    return table
+
+
+_TILES = _build_tile_table()
+_BLANK = _TILES[0]
+
+# Encoded bytes of every string written so far. Text comes from
+# constants (screen captions, difficulty and move names), so this stays
+# small, and iterating bytes yields ints instead of new 1-char strings.
+_ENCODED = {}
+
+# HUD instruction line for each move id, encoded once
+_MOVE_TEXT = tuple(("Do: " + name).encode() for name in config.MOVE_NAMES)
+
+# Move names on the stats viewer, shortened to fit the numbers beside
+# them and encoded once
+_MOVE_LABELS = tuple(
+    (name.replace("ROTATE_", "") + " ").encode() for name in config.MOVE_NAMES
+)
+
+# Monochrome palette shared by every text line
+_PALETTE = displayio.Palette(2)
+_PALETTE[0] = 0x000000
+_PALETTE[1] = 0xFFFFFF
+_PALETTE.make_transparent(0)
+
+# Splash slide-in: (start, target) vertical centers, starting off-screen
+_SPLASH_TITLE_Y = (80, 20)
+_SPLASH_SUBTITLE_Y = (100, 42)
+SPLASH_DURATION = 0.3
+
+
+class TextLine:
+    """
+    One persistent line of horizontally centered text.
+
+    The line is a TileGrid over the font bitmap with one tile per
+    character, so changing the text only rewrites tile indices: no
+    labels, strings or bounding boxes are created. Tiles whose glyph is
+    unchanged are not touched, and the line keeps a dirty box of the
+    pixels it changed since the last refresh.
+
+    Text is written with begin() / write() / write_int() / end(), or
+    set_text() for a single string.
+
+    Parameters:
+    - y: vertical center of the line in pixels
+    - text: initial text
+    """
+
+    def __init__(self, y, text=""):
+        self.grid = displayio.TileGrid(
+            _FONT.bitmap,
+            pixel_shader=_PALETTE,
+            width=LINE_CHARS,
+            height=1,
+            tile_width=GLYPH_W,
+            tile_height=GLYPH_H,
+            default_tile=_BLANK,
+        )
+        self.grid.y = y - GLYPH_H // 2
+        self._cursor = 0
+        self._length = 0
+
+        # Pixel box changed since the last refresh
+        self.dirty = False
+        self.dirty_x0 = self.dirty_y0 = self.dirty_x1 = self.dirty_y1 = 0
+
+        self.set_text(text)
+
+    def _mark(self, x0, x1):
+        """
+        Add columns x0..x1 of the line's current rows to the dirty box.
+        """
+        y0 = self.grid.y
+        y1 = y0 + GLYPH_H
+        if not self.dirty:
+            self.dirty = True
+            self.dirty_x0, self.dirty_y0, self.dirty_x1, self.dirty_y1 = x0, y0, x1, y1
+            return
+        if x0 < self.dirty_x0:
+            self.dirty_x0 = x0
+        if y0 < self.dirty_y0:
+            self.dirty_y0 = y0
+        if x1 > self.dirty_x1:
+            self.dirty_x1 = x1
+        if y1 > self.dirty_y1:
+            self.dirty_y1 = y1
+
+    def _mark_text(self):
+        x = self.grid.x
+        self._mark(x, x + self._length * GLYPH_W)
+
+    @property
+    def y(self):
+        return self.grid.y + GLYPH_H // 2
+
+    @y.setter
+    def y(self, value):
+        top = value - GLYPH_H // 2
+        if top != self.grid.y:
+            self._mark_text()
+            self.grid.y = top
+            self._mark_text()
+
+    def begin(self):
+        self._cursor = 0
+
+    def _put(self, code):
+        if self._cursor >= LINE_CHARS:
+            return
+        if _FIRST_CHAR <= code <= _LAST_CHAR:
+            tile = _TILES[code - _FIRST_CHAR]
+        else:
+            tile = _BLANK
+        cursor = self._cursor
+        if self.grid[cursor] != tile:
+            self.grid[cursor] = tile
+            x = self.grid.x + cursor * GLYPH_W
+            self._mark(x, x + GLYPH_W)
+        self._cursor = cursor + 1
+
+    def write(self, txt):
+        data = _ENCODED.get(txt)
+        if data is None:
+            data = txt.encode()
+            _ENCODED[txt] = data
+        self.write_bytes(data)
+
+    def write_bytes(self, data):
+        """
+        Write pre-encoded ASCII bytes.
+        """
+        for code in data:
+            self._put(code)
+
+    def write_int(self, value):
+        """
+        Write a non-negative integer without building a string.
+        """
+        div = 1
+        while div * 10 <= value:
+            div *= 10
+        while div:
+            self._put(48 + (value // div) % 10)
+            div //= 10
+
+    def end(self):
+        """
+        Blank the unused tail and re-center if the length changed.
+        """
+        length = self._cursor
+        if length == self._length:
+            return
+
+        # Old extent, including the tail about to be blanked
+        self._mark_text()
+        for i in range(length, self._length):
+            self.grid[i] = _BLANK
+        self._length = length
+        self.grid.x = (WIDTH - length * GLYPH_W) // 2
+        self._mark_text()
+
+    def set_text(self, txt):
+        self.begin()
+        self.write(txt)
+        self.end()
+
+
+class CountdownBar:
+    """
+    Horizontal bar that shrinks as the time for a move runs out.
+
+    The bar is a Bitmap shown through a TileGrid. Changing its length
+    only rewrites the pixel columns between the old and new length (one
+    native fill call), and that slice becomes the dirty box, so each step
+    pushes a few bytes of one SSD1306 page instead of redrawing a shape.
+
+    Parameters:
+    - y: top row in pixels
+    - height: bar thickness in pixels
+    """
+
+    def __init__(self, y, height):
+        self.height = height
+        self.bitmap = displayio.Bitmap(WIDTH, height, 2)
+        self.grid = displayio.TileGrid(self.bitmap, pixel_shader=_PALETTE, y=y)
+        self.width = 0
+
+        self.dirty = False
+        self.dirty_x0 = self.dirty_x1 = 0
+        self.dirty_y0 = y
+        self.dirty_y1 = y + height
+
+    def set_width(self, width):
+        """
+        Grow or shrink the bar to width pixels.
+        """
+        width = max(0, min(WIDTH, width))
+        old = self.width
+        if width == old:
+            return
+
+        if width < old:
+            x0, x1, value = width, old, 0
+        else:
+            x0, x1, value = old, width, 1
+
+        if x1 - x0 == WIDTH:
+            self.bitmap.fill(value)
+        else:
+            bitmaptools.fill_region(self.bitmap, x0, 0, x1, self.height, value)
+        self.width = width
+
+        if self.dirty:
+            self.dirty_x0 = min(self.dirty_x0, x0)
+            self.dirty_x1 = max(self.dirty_x1, x1)
+        else:
+            self.dirty = True
+            self.dirty_x0 = x0
+            self.dirty_x1 = x1
+
+
+class Screen:
+    """
+    A persistent Group and the elements (TextLines, CountdownBar) it holds.
+    """
+
+    def __init__(self, *lines):
+        self.lines = lines
+        self.group = displayio.Group()
+        for line in lines:
+            self.group.append(line.grid)
+
 
 class Display:
     """
@@ -15,6 +286,15 @@ class Display:
     - Difficulty menu
     - Game HUD (levels and move instructions)
     - Game Over / Game Win screens
+    - Stats viewer pages
+
+    Every screen is built once at start-up. Showing a screen switches
+    the display's root group, and updating text only rewrites the tiles
+    of existing lines, so redraws during gameplay do not allocate.
+
+    Auto refresh is off: show_* calls only change the scene, and nothing
+    is sent over I2C until refresh() commits the frame. displayio then
+    pushes only the dirty area, as an SSD1306 page/column window.
     """
 
     def __init__(self, i2c):
@@ -26,16 +306,68 @@ class Display:
         displayio.release_displays()
 
         # Construct the display bus using the shared I2C instance
-        display_bus = i2cdisplaybus.I2CDisplayBus(i2c, device_address=0x3C)
+        display_bus = i2cdisplaybus.I2CDisplayBus(i2c, device_address=I2C_ADDRESS)
 
         # Initialize the 128x64 OLED
         self.display = adafruit_displayio_ssd1306.SSD1306(
-            display_bus, width=128, height=64
+            display_bus, width=WIDTH, height=HEIGHT, auto_refresh=False
         )
 
-        # Root group for all drawn elements
-        self.main_group = displayio.Group()
-        self.display.root_group = self.main_group
+        # The screen currently shown and whether it changed as a whole
+        self.screen = None
+        self._switched = False
+
+        # Optional bus.Bus, told about every refresh (see refresh())
+        self.bus = None
+
+        # Refresh statistics: estimated bytes actually sent, and what
+        # pushing a full frame on every refresh would have cost
+        self.refresh_count = 0
+        self.bytes_sent = 0
+        self.bytes_full_frame = 0
+
+        # Splash screen
+        self.splash_title = TextLine(20, "ACTION GBA")
+        self.splash_subtitle = TextLine(42, "Press to start")
+        self.splash_screen = Screen(self.splash_title, self.splash_subtitle)
+
+        # Difficulty menu
+        self.menu_choice = TextLine(32)
+        self.menu_screen = Screen(
+            TextLine(12, "Select Difficulty"),
+            self.menu_choice,
+            TextLine(52, "Hold=play Tap=stats" if config.STATS_ENABLED else "Press to confirm"),
+        )
+
+        # End screens
+        self.game_over_screen = Screen(
+            TextLine(22, "GAME OVER"), TextLine(44, "Press to retry")
+        )
+        self.game_win_screen = Screen(
+            TextLine(22, "YOU WIN!"), TextLine(44, "Press to replay")
+        )
+
+        # Stats viewer: a title and one row per entry
+        self.stats_title = TextLine(6)
+        self.stats_rows = tuple(TextLine(18 + 12 * i) for i in range(4))
+        self.stats_screen = Screen(self.stats_title, *self.stats_rows)
+
+        # Gameplay HUD
+        self.hud_diff = TextLine(10)
+        self.hud_level = TextLine(22)
+        self.hud_move = TextLine(34)
+        self.hud_action = TextLine(46)
+        self.hud_bar = CountdownBar(58, 4)
+        self.hud_screen = Screen(
+            self.hud_diff, self.hud_level, self.hud_move, self.hud_action,
+            self.hud_bar,
+        )
+
+        # Empty screen
+        self.blank_screen = Screen()
+
+        # Running screen animation, advanced by animate(dt)
+        self.tween = None
 
         # Clear screen on startup
         self.clear()
@@ -44,93 +376,138 @@ class Display:
     # Core Utility Methods
     # -----------------------------------------------------
 
+    def _switch(self, screen):
+        """
+        Make a prebuilt screen the visible one.
+        """
+        if self.screen is not screen:
+            self.screen = screen
+            self.display.root_group = screen.group
+            self._switched = True
+
+    def refresh(self):
+        """
+        Commit the current frame to the OLED if anything changed.
+
+        Returns the estimated number of bytes sent (0 if nothing was dirty).
+        """
+        if self._switched:
+            x0, y0, x1, y1 = 0, 0, WIDTH, HEIGHT
+            dirty = True
+        else:
+            dirty = False
+            x0 = y0 = WIDTH
+            x1 = y1 = 0
+            for line in self.screen.lines:
+                if not line.dirty:
+                    continue
+                dirty = True
+                x0 = min(x0, line.dirty_x0)
+                y0 = min(y0, line.dirty_y0)
+                x1 = max(x1, line.dirty_x1)
+                y1 = max(y1, line.dirty_y1)
+
+        if not dirty:
+            return 0
+
+        for line in self.screen.lines:
+            line.dirty = False
+        self._switched = False
+
+        # Clip to the panel and round rows out to whole pages
+        x0 = max(0, x0)
+        x1 = min(WIDTH, x1)
+        y0 = max(0, y0) // PAGE_HEIGHT
+        y1 = (min(HEIGHT, y1) + PAGE_HEIGHT - 1) // PAGE_HEIGHT
+        sent = 0
+        if x1 > x0 and y1 > y0:
+            sent = (x1 - x0) * (y1 - y0) + _WINDOW_OVERHEAD_BYTES
+
+        # The bus arbiter reads the sensors before a long transfer and
+        # accounts the time the refresh held the bus
+        bus = self.bus
+        if bus is not None:
+            bus.before_refresh(sent)
+            start = time.monotonic_ns()
+        self.display.refresh(target_frames_per_second=None)
+        if bus is not None:
+            bus.account(I2C_ADDRESS, sent, time.monotonic_ns() - start)
+
+        self.refresh_count += 1
+        self.bytes_sent += sent
+        self.bytes_full_frame += FULL_FRAME_BYTES + _WINDOW_OVERHEAD_BYTES
+        return sent
+
     def clear(self):
         """
-        Clears the screen by resetting the display group.
-        Ensures new content draws cleanly without residual artifacts.
+        Shows an empty screen.
+        """
+        self._switch(self.blank_screen)
+
+    def sleep(self):
+        """
+        Turn the OLED panel off (its RAM and the scene are kept).
         """
-        self.main_group = displayio.Group()
-        self.display.root_group = self.main_group
+        self.display.sleep()
 
-    def _text_center(self, txt, y):
+    def wake(self):
         """
-        Draw centered text horizontally on the OLED.
+        Turn the OLED panel back on, showing the last frame.
+        """
+        self.display.wake()
 
-        Parameters:
-        - txt: string to render
-        - y: vertical pixel coordinate
+    # -----------------------------------------------------
+    # Screen Transitions
+    # -----------------------------------------------------
+
+    def start_tween(self, duration, apply, easing=None, on_done=None):
         """
-        text_obj = label.Label(terminalio.FONT, text=txt)
+        Start a frame-driven animation, replacing any running one.
+        It advances each time animate(dt) is called.
+        """
+        self.tween = Tween(duration, apply, easing, on_done)
 
-        # Compute width using the label bounding box
-        w = text_obj.bounding_box[2]
-        text_obj.x = int((128 - w) / 2)  # Center horizontally
-        text_obj.y = y
+    @property
+    def animating(self):
+        return self.tween is not None and self.tween.active
 
-        self.main_group.append(text_obj)
+    def animate(self, dt):
+        """
+        Advance the running animation, if any, by dt seconds.
+        """
+        if self.tween is not None and not self.tween.advance(dt):
+            self.tween = None
 
-    # Legacy absolute-position text method (kept for backward compatibility)
-    def _text(self, txt, x, y):
-        text_obj = label.Label(terminalio.FONT, text=txt, x=x, y=y)
-        self.main_group.append(text_obj)
+    def finish_animation(self):
+        """
+        Skip the running animation to its final frame.
+        """
+        if self.tween is not None:
+            self.tween.finish()
+            self.tween = None
 
     # -----------------------------------------------------
     # Animated Splash Screen
     # -----------------------------------------------------
 
-    def play_splash_animation(self):
+    def start_splash_animation(self):
         """
-        Plays a short vertical slide-in animation for the startup screen.
+        Starts a short vertical slide-in animation for the startup screen.
         This animation only plays once at power-up (not on game restart).
 
         Implementation strategy:
         - Start title/subtitle below visible screen
-        - Move upward for a fixed number of frames
+        - Move upward over SPLASH_DURATION, advanced by animate(dt)
         - Finish in static splash screen layout
         """
+        self._switch(self.splash_screen)
+        self.start_tween(SPLASH_DURATION, self._splash_frame)
 
-        self.clear()
-
-        title = label.Label(terminalio.FONT, text="ACTION GBA")
-        subtitle = label.Label(terminalio.FONT, text="Press to start")
-
-        # Helper to center label horizontally
-        def center_x(lbl):
-            w = lbl.bounding_box[2]
-            lbl.x = int((128 - w) / 2)
-
-        center_x(title)
-        center_x(subtitle)
-
-        # Start positions (off-screen below)
-        start_title_y = 80
-        start_sub_y = 100
-
-        # Target positions (final resting positions)
-        target_title_y = 20
-        target_sub_y = 42
-
-        title.y = start_title_y
-        subtitle.y = start_sub_y
-
-        # Add labels to group so animation is visible
-        self.main_group.append(title)
-        self.main_group.append(subtitle)
-
-        # Short, fast animation: ~0.3 seconds total
-        frames = 15
-        for i in range(frames):
-            ratio = (i + 1) / frames
-            title.y = int(start_title_y + (target_title_y - start_title_y) * ratio)
-            subtitle.y = int(start_sub_y + (target_sub_y - start_sub_y) * ratio)
-            time.sleep(0.02)
-
-        # Snap to exact final location for clean result
-        title.y = target_title_y
-        subtitle.y = target_sub_y
-
-        # Transition into the standard splash screen
-        self.show_splash()
+    def _splash_frame(self, progress):
+        start, target = _SPLASH_TITLE_Y
+        self.splash_title.y = start + int((target - start) * progress)
+        start, target = _SPLASH_SUBTITLE_Y
+        self.splash_subtitle.y = start + int((target - start) * progress)
 
     # -----------------------------------------------------
     # UI Screens
@@ -138,11 +515,11 @@ class Display:
 
     def show_splash(self):
         """
-        Static splash screen shown immediately after the animation.
+        Static splash screen shown after the animation.
         """
-        self.clear()
-        self._text_center("ACTION GBA", 20)
-        self._text_center("Press to start", 42)
+        self.splash_title.y = _SPLASH_TITLE_Y[1]
+        self.splash_subtitle.y = _SPLASH_SUBTITLE_Y[1]
+        self._switch(self.splash_screen)
 
     def show_menu(self, difficulty):
         """
@@ -151,29 +528,97 @@ class Display:
         Parameters:
         - difficulty: currently selected difficulty (EASY / MEDIUM / HARD)
         """
-        self.clear()
-        self._text_center("Select Difficulty", 12)
-        self._text_center("> " + difficulty, 32)
-        self._text_center("Press to confirm", 52)
+        line = self.menu_choice
+        line.begin()
+        line.write("> ")
+        line.write(difficulty)
+        line.end()
+        self._switch(self.menu_screen)
 
     def show_game_over(self):
         """
         Game Over screen displayed when the player runs out of time
         or performs the wrong move.
         """
-        self.clear()
-        self._text_center("GAME OVER", 22)
-        self._text_center("Press to retry", 44)
+        self._switch(self.game_over_screen)
 
     def show_game_win(self):
         """
         Screen displayed when the player clears all 10 levels.
         """
-        self.clear()
-        self._text_center("YOU WIN!", 22)
-        self._text_center("Press to replay", 44)
+        self._switch(self.game_win_screen)
+
+    def show_reaction_stats(self, p50, p90):
+        """
+        Stats page with the median and 90th percentile reaction of each
+        move in the last game.
+
+        Parameters:
+        - p50, p90: milliseconds indexed by move id (0 = no sample)
+        """
+        self.stats_title.set_text("Reaction p50/p90 ms")
+        for move, line in enumerate(self.stats_rows):
+            line.begin()
+            if move < len(p50):
+                line.write_bytes(_MOVE_LABELS[move])
+                if p50[move]:
+                    line.write_int(p50[move])
+                    line.write("/")
+                    line.write_int(p90[move])
+                else:
+                    line.write("-")
+            line.end()
+        self._switch(self.stats_screen)
+
+    def show_best_runs(self, names, levels, moves):
+        """
+        Stats page with the best run per difficulty.
+
+        Parameters:
+        - names: difficulty names, indexed like levels and moves
+        - levels: level each best run ended on (0 = never played)
+        - moves: correct moves of each best run
+        """
+        self.stats_title.set_text("Best runs")
+        for i, line in enumerate(self.stats_rows):
+            line.begin()
+            if i < len(names):
+                line.write(names[i])
+                if levels[i]:
+                    line.write(" lvl ")
+                    line.write_int(levels[i] - 1)
+                    line.write(", ")
+                    line.write_int(moves[i])
+                    line.write(" mv")
+                else:
+                    line.write(" -")
+            line.end()
+        self._switch(self.stats_screen)
+
+    def show_high_scores(self, names, scores):
+        """
+        Stats page with the high-score table.
 
-    def show_level(self, level, difficulty, seq_len, index, move, ratio_unused):
+        Parameters:
+        - names: difficulty names
+        - scores: (moves, level, difficulty index) tuples, best first
+        """
+        self.stats_title.set_text("High scores")
+        for i, line in enumerate(self.stats_rows):
+            line.begin()
+            if i < len(scores):
+                moves, level, difficulty = scores[i]
+                line.write_int(i + 1)
+                line.write(". ")
+                line.write_int(moves)
+                line.write(" mv ")
+                line.write(names[difficulty])
+                line.write(" L")
+                line.write_int(level - 1)
+            line.end()
+        self._switch(self.stats_screen)
+
+    def show_level(self, level, difficulty, seq_len, index, move, ratio):
         """
         HUD shown during gameplay, updated each time the expected move changes.
 
@@ -182,11 +627,44 @@ class Display:
         - difficulty: selected difficulty
         - seq_len: total actions in this level
         - index: current action number
-        - move: move name (ROTATE, PRESS, SHAKE, etc.)
-        - ratio_unused: placeholder for potential progress bar
+        - move: move id (config.MOVE_*)
+        - ratio: fraction of the move time left (1.0 = full countdown bar)
         """
-        self.clear()
-        self._text_center(f"Diff: {difficulty}", 10)
-        self._text_center(f"Level: {level}", 22)
-        self._text_center(f"Move: {index + 1}/{seq_len}", 34)
-        self._text_center("Do: " + move, 46)
+        line = self.hud_diff
+        line.begin()
+        line.write("Diff: ")
+        line.write(difficulty)
+        line.end()
+
+        line = self.hud_level
+        line.begin()
+        line.write("Level: ")
+        line.write_int(level)
+        line.end()
+
+        line = self.hud_move
+        line.begin()
+        line.write("Move: ")
+        line.write_int(index + 1)
+        line.write("/")
+        line.write_int(seq_len)
+        line.end()
+
+        line = self.hud_action
+        line.begin()
+        line.write_bytes(_MOVE_TEXT[move])
+        line.end()
+
+        self.hud_bar.set_width(int(WIDTH * ratio))
+        self._switch(self.hud_screen)
+
+    def set_countdown(self, remaining, total):
+        """
+        Update the HUD countdown bar to remaining / total of its length.
+        Both are integers in the same unit (nanoseconds from the game).
+        """
+        if remaining <= 0:
+            width = 0
+        else:
+            width = WIDTH * remaining // total
+        self.hud_bar.set_width(width)
@@ -0,0 +1,107 @@
+# LED strip effects.
+#
+# Effects render into one preallocated frame bytearray (3 bytes per
+# pixel, RGB order) that Lights hands to the strip in a single slice
+# assignment before show(). Every effect is a couple of slice copies out
+# of tables prepared here, so a frame costs the same few calls whether
+# the strip has 1 pixel or 30, instead of a Python loop over the pixels.
+
+from rainbowio import colorwheel
+
+# Levels between two neighbouring pixels in the countdown chase
+CHASE_STEPS = 16
+
+
+def _build_wheel():
+    """
+    colorwheel() for every position as 256 RGB triples.
+    """
+    wheel = bytearray(3 * 256)
+    for i in range(256):
+        color = colorwheel(i)
+        wheel[3 * i] = (color >> 16) & 0xFF
+        wheel[3 * i + 1] = (color >> 8) & 0xFF
+        wheel[3 * i + 2] = color & 0xFF
+    return wheel
+
+
+WHEEL = _build_wheel()
+
+
+class Strip:
+    """
+    Frame buffer and effect renderers for a strip of pixels.
+
+    Parameters:
+    - n: number of pixels
+    """
+
+    def __init__(self, n):
+        self.n = n
+        self.frame = bytearray(3 * n)
+        self._off = memoryview(bytes(3 * n))
+        self._solid = {}
+
+        # Per-pixel rainbow. Neighbouring pixels are `step` wheel
+        # positions apart, so the whole strip spans one turn of the
+        # wheel. For wheel position base = q * step + r, pixel i shows
+        # WHEEL[r + (q + i) * step]: row r of the table below holds the
+        # colors r, r + step, r + 2 * step, ... back to back, and every
+        # frame is one contiguous slice of it.
+        step = max(1, 256 // n)
+        row = 255 // step + n + 1
+        table = bytearray(3 * row * step)
+        for r in range(step):
+            for k in range(row):
+                src = 3 * ((r + k * step) & 255)
+                dst = 3 * (r * row + k)
+                table[dst:dst + 3] = WHEEL[src:src + 3]
+        self._step = step
+        self._row = row
+        self._rainbow = memoryview(table)
+
+    def _solid_frame(self, color):
+        frame = self._solid.get(color)
+        if frame is None:
+            frame = memoryview(bytes(color) * self.n)
+            self._solid[color] = frame
+        return frame
+
+    def solid(self, color):
+        """
+        Every pixel in one (r, g, b) color.
+        """
+        self.frame[:] = self._solid_frame(color)
+
+    def rainbow(self, base):
+        """
+        Rainbow spread over the strip, starting at wheel position base.
+        """
+        base &= 255
+        q = base // self._step
+        r = base - q * self._step
+        start = 3 * (r * self._row + q)
+        self.frame[:] = self._rainbow[start:start + 3 * self.n]
+
+    def chase(self, color, level):
+        """
+        Countdown: the first level / CHASE_STEPS pixels lit in color, the
+        last partly lit one dimmed in proportion, the rest off.
+
+        Parameters:
+        - color: (r, g, b)
+        - level: 0 ... n * CHASE_STEPS
+        """
+        frame = self.frame
+        lit = level // CHASE_STEPS
+        part = level - lit * CHASE_STEPS
+        if lit >= self.n:
+            frame[:] = self._solid_frame(color)
+            return
+        end = 3 * lit
+        frame[:end] = self._solid_frame(color)[:end]
+        frame[end:] = self._off[end:]
+        if part:
+            frame[end] = color[0] * part // CHASE_STEPS
+            frame[end + 1] = color[1] * part // CHASE_STEPS
+            frame[end + 2] = color[2] * part // CHASE_STEPS
@@ -0,0 +1,263 @@
+# Rotary encoder backends.
+#
+# Every backend exposes the same small interface so InputManager does not
+# care where the quadrature edges come from:
+#   poll()  sample the pins if the backend needs it (no-op for hardware counters)
+#   read()  return the signed number of detents since the previous read()
+#           positive = clockwise, negative = counter-clockwise
+#   stamp_ns(i, now_ns)
+#           time.monotonic_ns() time of the i-th detent returned by the
+#           last read(); backends that do not time edges return now_ns
+#
+# Backends, from best to worst:
+# - RotaryioEncoder: hardware/background counter (rotaryio.IncrementalEncoder)
+# - KeypadEncoder:   background-scanned edges through the keypad event queue
+# - PollingEncoder:  software sampling of two DigitalInOut pins, kept as a fallback
+#
+# Only the keypad backend knows when each edge happened (keypad.Event
+# timestamps). The others report now_ns, the time of the read, which is
+# late by up to one input poll (config.INPUT_RATE_HZ).
+#
+# countio is not used: it counts edges on a single pin and cannot tell
+# the direction of rotation.
+
+
+import time
+from array import array
+
+# Quadrature transition table indexed by (previous_state << 2) | new_state,
+# where state = (A << 1) | B.
+# Clockwise Gray sequence is 00 -> 01 -> 11 -> 10 -> 00.
+# Bounce produces a forward step followed by a backward step, which cancel.
+# Invalid jumps (both channels changed between samples) count as 0.
+_QUAD_TABLE = (
+    0, 1, -1, 0,
+    -1, 0, 0, 1,
+    1, 0, 0, -1,
+    0, -1, 1, 0,
+)
+
+# Detent times kept per read(); later detents share the last slot
+_MAX_STAMPS = 8
+
+# supervisor.ticks_ms() and keypad.Event.timestamp wrap at 2**29 ms
+_TICKS_PERIOD = 1 << 29
+_TICKS_MASK = _TICKS_PERIOD - 1
+_TICKS_HALF = _TICKS_PERIOD >> 1
+
+
+class QuadratureDecoder:
+    """
+    Software quadrature state machine shared by the polling and keypad backends.
+
+    Parameters:
+    - divisor: quarter steps per detent (4 for most detented encoders)
+    """
+
+    def __init__(self, divisor=4, state=3):
+        self.divisor = divisor
+        self.state = state
+        self._quarters = 0  # Quarter steps not yet forming a full detent
+        self._delta = 0     # Detents accumulated since the last take()
+
+        # Times passed to feed() for the detents in _delta, in order
+        self.stamps = array("q", [0] * _MAX_STAMPS)
+
+    def feed(self, a, b, t_ns=0):
+        """
+        Feed one sampled (A, B) pair seen at t_ns. Repeated states are
+        ignored.
+        """
+        new_state = (a << 1) | b
+        if new_state == self.state:
+            return
+
+        self._quarters += _QUAD_TABLE[(self.state << 2) | new_state]
+        self.state = new_state
+
+        # Emit a detent once a full cycle of quarter steps has accumulated
+        if self._quarters >= self.divisor:
+            self._quarters -= self.divisor
+            self._delta += 1
+            if self._delta > 0:
+                self.stamps[min(self._delta, _MAX_STAMPS) - 1] = t_ns
+        elif self._quarters <= -self.divisor:
+            self._quarters += self.divisor
+            self._delta -= 1
+            if self._delta < 0:
+                self.stamps[min(-self._delta, _MAX_STAMPS) - 1] = t_ns
+
+    def take(self):
+        """
+        Return detents accumulated since the previous call and reset the count.
+        """
+        delta = self._delta
+        self._delta = 0
+        return delta
+
+    def stamp(self, i):
+        """
+        Time passed to feed() for the i-th detent of the last take().
+        """
+        return self.stamps[min(i, _MAX_STAMPS - 1)]
+
+
+class PollingEncoder:
+    """
+    Fallback backend that samples both channels whenever poll() is called.
+
+    Unlike the old A-edge-only check, both channels go through the
+    quadrature state machine, so bounce cancels out instead of needing
+    a cooldown. Edges faster than the poll rate can still be missed, so
+    poll() may be called more often than once per frame.
+
+    Parameters:
+    - pin_a, pin_b: objects with a boolean .value (DigitalInOut or a fake pin)
+    - divisor: quarter steps per detent
+    """
+
+    def __init__(self, pin_a, pin_b, divisor=4):
+        self.pin_a = pin_a
+        self.pin_b = pin_b
+        self.decoder = QuadratureDecoder(
+            divisor, (int(pin_a.value) << 1) | int(pin_b.value)
+        )
+
+    def poll(self):
+        self.decoder.feed(int(self.pin_a.value), int(self.pin_b.value))
+
+    def read(self):
+        self.poll()
+        return self.decoder.take()
+
+    def stamp_ns(self, i, now_ns):
+        return now_ns
+
+    def deinit(self):
+        pass
+
+
+class KeypadEncoder:
+    """
+    Background-scanned backend built on keypad.Keys.
+
+    The keypad module samples both pins in the background and queues every
+    level change, so edges are captured even while the main loop is busy
+    redrawing the OLED. Events are drained into a preallocated Event object
+    to avoid allocation in the hot loop. Each detent keeps the timestamp
+    of the edge that completed it, moved to the time.monotonic_ns() clock.
+
+    Parameters:
+    - pin_a, pin_b: board pins for the encoder channels
+    - divisor: quarter steps per detent
+    - interval: background scan interval in seconds
+    """
+
+    def __init__(self, pin_a, pin_b, divisor=4, interval=0.001):
+        import keypad
+        import supervisor
+
+        self._ticks_ms = supervisor.ticks_ms
+
+        # Encoder channels are active low, so "pressed" means the pin reads 0
+        self._keys = keypad.Keys(
+            (pin_a, pin_b), value_when_pressed=False, pull=True, interval=interval
+        )
+        self._event = keypad.Event()
+        self._levels = [1, 1]
+        self.decoder = QuadratureDecoder(divisor, 3)
+
+    def poll(self):
+        events = self._keys.events
+        event = self._event
+        levels = self._levels
+        now_ms = self._ticks_ms()
+        now_ns = time.monotonic_ns()
+        while events.get_into(event):
+            levels[event.key_number] = 0 if event.pressed else 1
+            # Age of the edge; one queued after now_ms was read counts as now
+            age_ms = (now_ms - event.timestamp) & _TICKS_MASK
+            if age_ms >= _TICKS_HALF:
+                age_ms = 0
+            self.decoder.feed(levels[0], levels[1], now_ns - age_ms * 1000000)
+
+    def read(self):
+        self.poll()
+        return self.decoder.take()
+
+    def stamp_ns(self, i, now_ns):
+        return self.decoder.stamp(i)
+
+    def deinit(self):
+        self._keys.deinit()
+
+
+class RotaryioEncoder:
+    """
+    Hardware/background counter backend built on rotaryio.IncrementalEncoder.
+
+    The counter keeps running independently of the main loop, so no detents
+    are lost no matter how long a frame takes.
+
+    Parameters:
+    - pin_a, pin_b: board pins for the encoder channels
+    - divisor: quarter steps per detent
+    """
+
+    def __init__(self, pin_a, pin_b, divisor=4):
+        import rotaryio
+
+        self._encoder = rotaryio.IncrementalEncoder(pin_a, pin_b, divisor=divisor)
+        self._last_position = self._encoder.position
+
+    def poll(self):
+        pass
+
+    def read(self):
+        position = self._encoder.position
+        delta = position - self._last_position
+        self._last_position = position
+        return delta
+
+    def stamp_ns(self, i, now_ns):
+        return now_ns
+
+    def deinit(self):
+        self._encoder.deinit()
+
+
+def make_encoder(pin_a, pin_b, backend="auto", divisor=4, interval=0.001):
+    """
+    Build the best available encoder backend.
+
+    Parameters:
+    - pin_a, pin_b: board pins for the encoder channels
+    - backend: "auto", "rotaryio", "keypad" or "polling"
+    - divisor: quarter steps per detent
+    - interval: scan interval for the keypad backend
+
+    "auto" tries rotaryio, then keypad, then falls back to polling.
+    Boards without the native module (the ESP32-C3 has no rotaryio)
+    simply move on to the next backend.
+    """
+    if backend in ("auto", "rotaryio"):
+        try:
+            return RotaryioEncoder(pin_a, pin_b, divisor)
+        except (ImportError, NotImplementedError, ValueError):
+            if backend == "rotaryio":
+                raise
+
+    if backend in ("auto", "keypad"):
+        try:
+            return KeypadEncoder(pin_a, pin_b, divisor, interval)
+        except (ImportError, NotImplementedError, ValueError):
+            if backend == "keypad":
+                raise
+
+    import digitalio
+
+    enc_a = digitalio.DigitalInOut(pin_a)
+    enc_a.switch_to_input(pull=digitalio.Pull.UP)
+    enc_b = digitalio.DigitalInOut(pin_b)
+    enc_b.switch_to_input(pull=digitalio.Pull.UP)
+    return PollingEncoder(enc_a, enc_b, divisor)
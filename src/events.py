@@ -0,0 +1,77 @@
+# Timestamped input event queue.
+#
+# InputManager pushes one event per detected action together with its
+# time.monotonic_ns() capture time. The game engine pops them in order,
+# so several actions landing in one slow frame are neither merged nor lost.
+
+# Event kinds
+EVT_NONE = 0
+EVT_ROTATE_CW = 1
+EVT_ROTATE_CCW = 2
+EVT_PRESS = 3
+EVT_SHAKE = 4
+
+# Button release edge. Never queued for the game; session recordings
+# keep it so replay can rebuild how long the button was held.
+EVT_RELEASE = 5
+
+
+class EventQueue:
+    """
+    Bounded ring buffer of (kind, timestamp) input events.
+
+    All storage is allocated once in __init__. When the queue is full the
+    oldest event is overwritten and counted in `dropped`.
+
+    Parameters:
+    - capacity: maximum number of pending events
+    """
+
+    def __init__(self, capacity=16):
+        self.capacity = capacity
+        self._kinds = bytearray(capacity)
+        self._times = [0] * capacity
+        self._head = 0    # Index of the oldest pending event
+        self._count = 0
+        self.dropped = 0
+
+        # Capture time of the event returned by the last pop()
+        self.time_ns = 0
+
+    def __len__(self):
+        return self._count
+
+    def clear(self):
+        """
+        Discard all pending events.
+        """
+        self._head = 0
+        self._count = 0
+
+    def push(self, kind, time_ns):
+        """
+        Append an event, overwriting the oldest one if the queue is full.
+        """
+        if self._count == self.capacity:
+            self._head = (self._head + 1) % self.capacity
+            self._count -= 1
+            self.dropped += 1
+
+        tail = (self._head + self._count) % self.capacity
+        self._kinds[tail] = kind
+        self._times[tail] = time_ns
+        self._count += 1
+
+    def pop(self):
+        """
+        Remove the oldest event and return its kind, or EVT_NONE if empty.
+        The capture time of the returned event is left in self.time_ns.
+        """
+        if self._count == 0:
+            return EVT_NONE
+
+        head = self._head
+        self.time_ns = self._times[head]
+        self._head = (head + 1) % self.capacity
+        self._count -= 1
+        return self._kinds[head]
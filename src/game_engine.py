@@ -1,6 +1,34 @@
 import time
-import random
 import config
+import log
+from schedule import SEQ_LEN, MOVE_NS, MOVE_COUNT, Adaptive, Sequences
+from events import (
+    EVT_NONE,
+    EVT_ROTATE_CW,
+    EVT_ROTATE_CCW,
+    EVT_PRESS,
+    EVT_SHAKE,
+)
+from states import (
+    SPLASH,
+    MENU,
+    LEVEL_START,
+    WAIT_INPUT,
+    GAME_OVER,
+    GAME_WIN,
+    STATS,
+    STATE_NAMES,
+)
+
+# Input event bits (1 << EVT_*) that complete each move, indexed by move id
+_MOVE_EVENTS = bytearray(len(config.ALL_MOVES))
+_MOVE_EVENTS[config.MOVE_CW] = 1 << EVT_ROTATE_CW
+_MOVE_EVENTS[config.MOVE_CCW] = 1 << EVT_ROTATE_CCW
+_MOVE_EVENTS[config.MOVE_PRESS] = 1 << EVT_PRESS
+_MOVE_EVENTS[config.MOVE_SHAKE] = 1 << EVT_SHAKE
+
+# Pages of the stats viewer: reactions, best runs, high scores
+_STATS_PAGES = 3
 
 
 class Game:
@@ -8,12 +36,23 @@ class Game:
     Core game state machine.
 
     This class coordinates:
-    - High level game states (splash, menu, level start, wait input, win, game over)
+    - High level game states (splash, menu, level start, wait input, win,
+      game over, stats viewer)
     - Difficulty and level progression
     - Move sequence generation and timing
     - Communication with input manager, display, and light controller
+
+    Each state has a tick handler, run every frame while the state is
+    active, and optional on_enter / on_exit hooks, run once by enter()
+    when the state changes. One-time work such as switching the light
+    mode or building a screen belongs in the hooks. To add a state, give
+    it an id and a name in states.py and register its handlers in
+    __init__.
     """
 
+    # Menu cycling order
+    _DIFFICULTY_ORDER = ("EASY", "MEDIUM", "HARD")
+
     def __init__(self, inputs, display, lights):
         """
         Initialize the game with shared subsystems.
@@ -27,288 +66,480 @@ class Game:
         self.display = display
         self.lights = lights
 
-        # Initial high level state
-        self.state = "SPLASH"
+        # Initial high level state (one of the state ids above)
+        self.state = SPLASH
         self.difficulty = "EASY"
         self.level = 1
 
-        # Sequence of moves for the current level
-        self.sequence = []
+        # Move ids (config.MOVE_*) of the current level: the first
+        # seq_len entries of a buffer that is filled ahead of time
+        self._sequences = Sequences()
+        self.sequence = self._sequences.current
+        self.seq_len = 0
         self.seq_index = 0
 
-        # Move timing parameters
+        # Move timing parameters.
+        # Gameplay timing uses integer nanoseconds so it can be compared
+        # directly with input event capture times.
         self.current_move = config.MOVE_PRESS
-        self.per_move_time = 1.0
-        self.move_start_time = time.monotonic()
+        self.per_move_ns = 1000000000
+        self.move_start_ns = time.monotonic_ns()
+
+        # Time allowed for each move id in the current level, filled in
+        # at level start from the schedule (and the adaptive scale)
+        self._move_ns = [0] * MOVE_COUNT
+        self._adaptive = None
+        if config.ADAPTIVE_ENABLED:
+            self._adaptive = Adaptive(config.ADAPTIVE_WINDOW)
+
+        # Reaction stats (stats.Stats), set by code.py when enabled
+        self.stats = None
+        self.stats_page = 0
 
         # Menu UI flags and button hold tracking
         self.menu_needs_redraw = True
-        self.menu_press_start = None  # Time stamp when button is first held in the menu
+        self.menu_press_start = None  # Time stamp (ns) when button is first held in the menu
+        self.menu_pressed = False     # Press began in the menu (a tap opens the stats)
 
         # Cooldown window to avoid one action being counted multiple times
-        self.action_cooldown_until = 0.0
+        self.action_cooldown_until_ns = 0
+
+        # Countdown bar updates are capped to COUNTDOWN_BAR_HZ
+        self.bar_period_ns = 1000000000 // config.COUNTDOWN_BAR_HZ
+        self.bar_next_ns = 0
+
+        # Handler tables indexed by state id. Bound methods are created
+        # once here, so dispatching a frame does not allocate.
+        count = len(STATE_NAMES)
+        self._ticks = [None] * count
+        self._on_enter = [None] * count
+        self._on_exit = [None] * count
+        self._define(SPLASH, self._tick_splash)
+        self._define(MENU, self._tick_menu, self._enter_menu, self._exit_menu)
+        self._define(LEVEL_START, self._tick_level_start, self._enter_level_start)
+        self._define(WAIT_INPUT, self._tick_wait_input, self._enter_wait_input)
+        self._define(GAME_OVER, self._tick_game_end, self._enter_game_over)
+        self._define(GAME_WIN, self._tick_game_end, self._enter_game_win)
+        self._define(STATS, self._tick_stats, self._enter_stats)
+
+        # Callables notified of every transition as fn(old, new)
+        self.listeners = []
 
         # Power on animation and splash:
-        # Start in splash light mode and play the animated splash screen once.
+        # Start in splash light mode and start the animated splash screen
+        # (code.py may have started it already to put a first frame up).
+        # The animation advances with each update(dt), so the game is
+        # interactive immediately and a press skips it.
         self.lights.set_mode("splash")
-        self.display.play_splash_animation()
+        if not self.display.animating:
+            self.display.start_splash_animation()
+
+    def _define(self, state, tick, on_enter=None, on_exit=None):
+        """
+        Register the handlers of one state.
+
+        Parameters:
+        - state: state id
+        - tick: called every frame while the state is active
+        - on_enter, on_exit: called once when entering / leaving it
+        """
+        self._ticks[state] = tick
+        self._on_enter[state] = on_enter
+        self._on_exit[state] = on_exit
+
+    @property
+    def state_name(self):
+        return STATE_NAMES[self.state]
+
+    def add_listener(self, fn):
+        """
+        Call fn(old_state, new_state) after every transition, once the
+        new state's on_enter hook has run.
+        """
+        self.listeners.append(fn)
+
+    def enter(self, state):
+        """
+        Switch to another state: run the old state's on_exit hook, then
+        the new state's on_enter hook, then notify the listeners.
+        """
+        old = self.state
+        hook = self._on_exit[old]
+        if hook is not None:
+            hook()
+        self.state = state
+        hook = self._on_enter[state]
+        if hook is not None:
+            hook()
+        log.debug(log.TRANSITION, old, state)
+        for fn in self.listeners:
+            fn(old, state)
 
     def update(self, dt):
         """
         Main update entry point for the game state machine.
 
         Called every frame from code.py, with dt being the elapsed time
-        since the previous frame. Each high level state is handled by
-        its own private method.
-        """
-        if self.state == "SPLASH":
-            self._state_splash()
-        elif self.state == "MENU":
-            self._state_menu()
-        elif self.state == "LEVEL_START":
-            self._state_level_start()
-        elif self.state == "WAIT_INPUT":
-            self._state_wait_input()
-        elif self.state == "GAME_OVER":
-            self._state_game_over()
-        elif self.state == "GAME_WIN":
-            self._state_game_win()
+        since the previous frame. Runs the tick handler of the current
+        state.
+        """
+        # Advance any running screen animation
+        self.display.animate(dt)
+
+        self._ticks[self.state]()
 
     def render(self):
         """
-        Optional render hook.
+        Commit the current frame to the OLED.
 
-        Currently all drawing is triggered directly inside each state method
-        by calling Display methods, so this function is kept as a placeholder
-        for possible future separation of update and render.
+        State methods only change what the screen should show by calling
+        Display methods. Nothing is sent over I2C until this is called,
+        once per display tick chosen by the main loop scheduler, and then
+        only the area that changed is pushed.
+        """
+        self.display.refresh()
+
+    def next_deadline_ns(self):
+        """
+        Earliest time (ns) at which the game changes state without any new
+        input, or None if it only reacts to input in the current state.
+        Lets a caller skip frames in which nothing can happen.
         """
-        pass
+        if self.state == LEVEL_START:
+            return time.monotonic_ns()
+        if self.state == WAIT_INPUT:
+            return self.move_start_ns + self.per_move_ns + 1
+        if self.state == MENU and self.menu_press_start is not None:
+            return self.menu_press_start + config.MENU_PRESS_HOLD_NS
+        return None
 
     # --------------- State: Splash Screen ---------------
 
-    def _state_splash(self):
+    def _tick_splash(self):
         """
         Splash state shown only on power up.
 
-        The animated splash has already been played in __init__.
-        Here we just:
-        - Keep NeoPixel in splash mode
-        - Wait for a single button press to enter the menu
+        The animated splash and rainbow lights were started in __init__
+        and play while this state runs. A single button press enters the
+        menu, skipping the rest of the animation if it is still playing.
         """
-        # Keep rainbow splash lights active
-        self.lights.set_mode("splash")
-
-        # Single press on the encoder button jumps to the difficulty menu
         if self.inputs.button_pressed:
-            print("SPLASH: button pressed, go to MENU")
-            self.state = "MENU"
-            self.menu_needs_redraw = True
-            # Use a different rainbow mode for the menu
-            self.lights.set_mode("menu")
+            log.info(log.SPLASH_PRESS)
+            self.display.finish_animation()
+            self.enter(MENU)
 
     # --------------- State: Difficulty Menu ---------------
 
-    def _state_menu(self):
+    def _enter_menu(self):
+        # Menu style rainbow lights and the difficulty screen
+        self.lights.set_mode("menu")
+        self.display.show_menu(self.difficulty)
+        self.menu_needs_redraw = False
+        self.menu_press_start = None
+        self.menu_pressed = False
+
+    def _exit_menu(self):
+        self.menu_press_start = None
+        self.menu_pressed = False
+
+    def _tick_menu(self):
         """
         Difficulty selection state.
 
         Player uses the rotary encoder to cycle through difficulty options.
-        Long press on the encoder button starts the game.
+        Long press on the encoder button starts the game; a short press
+        opens the stats viewer when stats are kept.
         """
-        # During menu, use menu style rainbow lights
-        self.lights.set_mode("menu")
-
-        # Redraw only when needed to avoid display flickering
-        if self.menu_needs_redraw:
-            self.display.show_menu(self.difficulty)
-            self.menu_needs_redraw = False
-
         # Use encoder rotation to change difficulty
         if self.inputs.rotated_cw:
             self.difficulty = self._next_difficulty()
             self.menu_needs_redraw = True
-            print("MENU: rotate CW, diff =", self.difficulty)
         elif self.inputs.rotated_ccw:
             self.difficulty = self._prev_difficulty()
             self.menu_needs_redraw = True
-            print("MENU: rotate CCW, diff =", self.difficulty)
 
-        # Long press detection for starting the game
+        # Redraw only when needed to avoid display flickering
+        if self.menu_needs_redraw:
+            self.display.show_menu(self.difficulty)
+            self.menu_needs_redraw = False
+            if log.enabled(log.DEBUG):
+                log.debug(log.MENU_DIFFICULTY, self._DIFFICULTY_ORDER.index(self.difficulty))
+
+        # Long press detection for starting the game. Only presses that
+        # began here count as taps, not the one that left the end screen.
+        if self.inputs.button_pressed:
+            self.menu_pressed = True
+        # Turning the knob while holding it is a difficulty change, so
+        # the release that follows is not a tap
+        if self.inputs.button_down and (self.inputs.rotated_cw or self.inputs.rotated_ccw):
+            self.menu_pressed = False
         if self.inputs.button_down:
             # First frame where the button is detected as down
             if self.menu_press_start is None:
-                self.menu_press_start = time.monotonic()
+                self.menu_press_start = time.monotonic_ns()
             else:
                 # Compute how long the button has been held
-                held = time.monotonic() - self.menu_press_start
-                if held >= config.MENU_PRESS_HOLD:
-                    print("MENU: long press to start game, held =", held)
+                held_ns = time.monotonic_ns() - self.menu_press_start
+                if held_ns >= config.MENU_PRESS_HOLD_NS:
+                    log.info(log.GAME_START, held_ns // 1000000)
                     self.level = 1
-                    self.state = "LEVEL_START"
-                    # Actual light mode switch for gameplay happens in _state_level_start
-                    self.menu_press_start = None
+                    # Every game, on any difficulty, starts at the
+                    # neutral pace
+                    if self._adaptive is not None:
+                        self._adaptive.reset()
+                    if self.stats is not None:
+                        self.stats.start()
+                    self.enter(LEVEL_START)
+                    return
         else:
+            # Button released before the hold time: a tap
+            if self.menu_pressed and self.stats is not None:
+                self.enter(STATS)
+                return
             # Button released, reset long press timer
             self.menu_press_start = None
+            self.menu_pressed = False
+
+        # Draw the first level's moves and store the last game's stats
+        # while the player is in the menu
+        self._sequences.prepare()
+        if self.stats is not None:
+            self.stats.idle()
 
     # --------------- State: Start a New Level ---------------
 
-    def _state_level_start(self):
+    def _enter_level_start(self):
+        # Switch lights to standard playing mode for active gameplay
+        self.lights.set_mode("playing")
+
+    def _tick_level_start(self):
         """
-        Level setup state.
+        Level setup state, run for one frame.
 
         This state:
-        - Configures level length and timing based on difficulty
-        - Randomly generates a sequence of moves
+        - Looks up level length and per-move times in the schedule tables,
+          scaled by the adaptive difficulty when enabled
+        - Swaps in the move sequence prepared while the game was idle
         - Resets sequence index and timers
-        - Switches light mode to gameplay and then transitions to WAIT_INPUT
+        - Transitions to WAIT_INPUT
         """
-        # Switch lights to standard playing mode for active gameplay
-        self.lights.set_mode("playing")
-
-        # Look up difficulty parameters
-        params = config.DIFFICULTIES[self.difficulty]
-        base_moves = params["base_moves"]
-        total_time = params["level_time"]
-
-        # Each level adds one extra move on top of the base
-        # Level 1: base_moves
-        # Level 2: base_moves + 1
-        # Level 3: base_moves + 2
-        seq_len = base_moves + (self.level - 1)
+        self.seq_len = SEQ_LEN[self.difficulty][self.level]
+        table = MOVE_NS[self.difficulty]
+        offset = self.level * MOVE_COUNT
+        move_ns = self._move_ns
+        adaptive = self._adaptive
+        if adaptive is None:
+            for move in range(MOVE_COUNT):
+                move_ns[move] = table[offset + move]
+        else:
+            # adjust() starts a fresh window when it changes step
+            mean = adaptive.mean_q8
+            scale = adaptive.adjust()
+            for move in range(MOVE_COUNT):
+                move_ns[move] = table[offset + move] * scale >> 8
 
-        # Randomly generate a sequence of moves for this level
-        self.sequence = [random.choice(config.ALL_MOVES) for _ in range(seq_len)]
+        self.sequence = self._sequences.advance()
         self.seq_index = 0
         self.current_move = self.sequence[0]
+        self.per_move_ns = move_ns[self.current_move]
+        self.move_start_ns = time.monotonic_ns()
+
+        log.info(log.LEVEL_START, self.level, self.per_move_ns // 1000000)
+        if adaptive is not None:
+            log.info(
+                log.ADAPTIVE_SCALE,
+                (scale * 100 + 128) >> 8,
+                (mean * 100 + 128) >> 8,
+            )
 
-        # Per move time budget is the total time divided by number of moves
-        self.per_move_time = total_time / seq_len
-        self.move_start_time = time.monotonic()
-
-        print(
-            "LEVEL_START:",
-            "difficulty =", self.difficulty,
-            "level =", self.level,
-            "seq_len =", seq_len,
-            "total_time =", total_time,
-            "per_move_time =", self.per_move_time,
-        )
+        self.enter(WAIT_INPUT)
+
+    # --------------- State: Wait for Player Input ---------------
+
+    def _enter_wait_input(self):
+        # HUD and lights for the first move in this level
+        self._show_move()
+
+        # Reset inter move cooldown for the new level and drop any
+        # inputs made before the first move was shown
+        self.action_cooldown_until_ns = 0
+        self.inputs.events.clear()
 
-        # Update HUD and lights for the first move in this level
+    def _show_move(self):
+        """
+        Show the current move on the HUD and the LED.
+        """
         self.display.show_level(
             self.level,
             self.difficulty,
-            len(self.sequence),
+            self.seq_len,
             self.seq_index,
             self.current_move,
             1.0,
         )
-        self.state = "WAIT_INPUT"
         self.lights.set_mode("move", self.current_move)
 
-        # Reset inter move cooldown for the new level
-        self.action_cooldown_until = 0.0
-
-    # --------------- State: Wait for Player Input ---------------
-
-    def _state_wait_input(self):
+    def _tick_wait_input(self):
         """
         Active gameplay state.
 
         Logic:
-        - Check if the current move has timed out
+        - Consume queued input events in capture order
+        - Judge each event against its own timestamp, not the frame time
+        - Drop events stamped before the current move started
         - Respect a cooldown window so a single action cannot advance multiple steps
-        - Check if the player performed the correct input
         - Advance to the next move or next level or win / game over
+        - Finally check if the current move has timed out
         """
-        now = time.monotonic()
-
-        # Check per move timeout first
-        if now - self.move_start_time > self.per_move_time:
-            print("WAIT_INPUT: time up, game over")
-            self.state = "GAME_OVER"
-            self.display.show_game_over()
-            self.lights.set_mode("game_over")
-            return
-
-        # Ignore inputs during cooldown to avoid double counting a single action
-        if now < self.action_cooldown_until:
-            return
-
-        # Check if the expected move has been completed
-        if self._is_move_correct(self.current_move):
-            print("WAIT_INPUT: correct move", self.current_move)
+        events = self.inputs.events
+
+        while True:
+            kind = events.pop()
+            if kind == EVT_NONE:
+                break
+            t_ns = events.time_ns
+
+            # An action made after the move expired does not count
+            if t_ns - self.move_start_ns > self.per_move_ns:
+                break
+
+            # An action made before this move was shown belongs to an
+            # earlier one (keypad and FIFO stamps can predate the frame)
+            if t_ns < self.move_start_ns:
+                continue
+
+            # Ignore inputs during cooldown to avoid double counting a single action
+            if t_ns < self.action_cooldown_until_ns:
+                continue
+
+            # Check if the event completes the expected move
+            if not _MOVE_EVENTS[self.current_move] & (1 << kind):
+                continue
+
+            log.debug(log.MOVE_OK, self.seq_index, self.current_move)
+            self.lights.flash()
+            if self._adaptive is not None:
+                self._adaptive.add(t_ns - self.move_start_ns, self.per_move_ns)
+            if self.stats is not None:
+                self.stats.add(self.current_move, t_ns - self.move_start_ns)
 
             # Start cooldown window before accepting the next move
-            self.action_cooldown_until = now + config.ACTION_COOLDOWN
+            self.action_cooldown_until_ns = t_ns + config.ACTION_COOLDOWN_NS
 
             self.seq_index += 1
 
             # All moves for this level are complete
-            if self.seq_index >= len(self.sequence):
+            if self.seq_index >= self.seq_len:
                 self.level += 1
                 if self.level > config.TOTAL_LEVELS:
                     # Player has completed all levels
-                    print("GAME_WIN: passed all levels")
-                    self.state = "GAME_WIN"
-                    self.display.show_game_win()
-                    self.lights.set_mode("game_win")
+                    log.info(log.GAME_WIN)
+                    self.enter(GAME_WIN)
                 else:
                     # Advance to the next level
-                    self.state = "LEVEL_START"
+                    self.enter(LEVEL_START)
                 return
 
-            # Move to the next action within the current level
+            # Move to the next action within the current level.
+            # Timing for the next move starts when this action happened.
             self.current_move = self.sequence[self.seq_index]
-            self.move_start_time = now  # Reset timing for the next move
-            self.display.show_level(
-                self.level,
-                self.difficulty,
-                len(self.sequence),
-                self.seq_index,
-                self.current_move,
-                1.0,
-            )
-            self.lights.set_mode("move", self.current_move)
+            self.per_move_ns = self._move_ns[self.current_move]
+            self.move_start_ns = t_ns
+            self._show_move()
+
+        # Check per move timeout
+        now_ns = time.monotonic_ns()
+        elapsed_ns = now_ns - self.move_start_ns
+        if elapsed_ns > self.per_move_ns:
+            log.info(log.TIME_UP, self.level, self.seq_index)
+            self.enter(GAME_OVER)
+            return
+
+        # Shrink the countdown bar and the LED chase, at most
+        # COUNTDOWN_BAR_HZ times a second
+        if now_ns >= self.bar_next_ns:
+            self.bar_next_ns = now_ns + self.bar_period_ns
+            remaining_ns = self.per_move_ns - elapsed_ns
+            self.display.set_countdown(remaining_ns, self.per_move_ns)
+            self.lights.set_countdown(remaining_ns, self.per_move_ns)
+
+        # Draw the next level's moves while the player reacts to this one
+        self._sequences.prepare()
 
     # --------------- State: Game Over / Win ---------------
 
-    def _state_game_over(self):
+    def _enter_game_over(self):
+        # Shown when time runs out; solid red light
+        self.display.show_game_over()
+        self.lights.set_mode("game_over")
+        self._end_stats()
+
+    def _enter_game_win(self):
+        # Shown after the last level
+        self.display.show_game_win()
+        self.lights.set_mode("game_win")
+        self._end_stats()
+
+    def _end_stats(self):
+        # Only marks the game as done; the summary is built and written
+        # from the idle frames that follow
+        if self.stats is not None:
+            self.stats.end(self._DIFFICULTY_ORDER.index(self.difficulty), self.level)
+
+    def _tick_game_end(self):
         """
-        Game over state.
+        Game over and game win states.
 
-        The light mode has already been set to "game_over".
-        A single button press returns the player to the menu and re enables
-        the menu rainbow lights.
+        A single button press returns the player to the difficulty menu.
         """
         if self.inputs.button_pressed:
-            self.state = "MENU"
-            self.menu_needs_redraw = True
-            self.display.show_menu(self.difficulty)
-            self.lights.set_mode("menu")
+            self.enter(MENU)
+        else:
+            self._sequences.prepare()
+            if self.stats is not None:
+                self.stats.idle()
+
+    # --------------- State: Stats Viewer ---------------
+
+    def _enter_stats(self):
+        self.stats_page = 0
+        self._show_stats_page()
+
+    def _show_stats_page(self):
+        stats = self.stats
+        if self.stats_page == 0:
+            self.display.show_reaction_stats(stats.last_p50, stats.last_p90)
+        elif self.stats_page == 1:
+            self.display.show_best_runs(
+                self._DIFFICULTY_ORDER, stats.best_levels, stats.best_moves
+            )
+        else:
+            self.display.show_high_scores(self._DIFFICULTY_ORDER, stats.scores)
 
-    def _state_game_win(self):
+    def _tick_stats(self):
         """
-        Game win state.
+        Stats viewer, opened by a short press in the menu.
 
-        Similar to game over, a button press sends the player back to
-        the difficulty menu.
+        Rotating flips between the pages; a press returns to the menu.
         """
         if self.inputs.button_pressed:
-            self.state = "MENU"
-            self.menu_needs_redraw = True
-            self.display.show_menu(self.difficulty)
-            self.lights.set_mode("menu")
+            self.enter(MENU)
+            return
+        if self.inputs.rotated_cw:
+            self.stats_page = (self.stats_page + 1) % _STATS_PAGES
+            self._show_stats_page()
+        elif self.inputs.rotated_ccw:
+            self.stats_page = (self.stats_page - 1) % _STATS_PAGES
+            self._show_stats_page()
 
-    # --------------- Difficulty Cycling and Move Checking ---------------
+    # --------------- Difficulty Cycling ---------------
 
     def _next_difficulty(self):
         """
         Cycle difficulty to the next value in the fixed order.
         EASY -> MEDIUM -> HARD -> EASY
         """
-        order = ["EASY", "MEDIUM", "HARD"]
+        order = self._DIFFICULTY_ORDER
         idx = order.index(self.difficulty)
         return order[(idx + 1) % len(order)]
 
@@ -317,27 +548,6 @@ class Game:
         Cycle difficulty to the previous value in the fixed order.
         EASY <- MEDIUM <- HARD <- EASY
         """
-        order = ["EASY", "MEDIUM", "HARD"]
+        order = self._DIFFICULTY_ORDER
         idx = order.index(self.difficulty)
         return order[(idx - 1) % len(order)]
-
-    def _is_move_correct(self, move_name):
-        """
-        Check if the player's input matches the expected move.
-
-        Mapping:
-        - MOVE_CW    uses inputs.rotated_cw
-        - MOVE_CCW   uses inputs.rotated_ccw
-        - MOVE_PRESS uses a single press edge, not just button down
-        - MOVE_SHAKE uses the shake flag from the accelerometer
-        """
-        if move_name == config.MOVE_CW:
-            return self.inputs.rotated_cw
-        if move_name == config.MOVE_CCW:
-            return self.inputs.rotated_ccw
-        if move_name == config.MOVE_PRESS:
-            # Only respond to the press edge, not a held button
-            return self.inputs.button_pressed
-        if move_name == config.MOVE_SHAKE:
-            return self.inputs.shake_detected
-        return False
@@ -1,9 +1,18 @@
 import time
 import math
 import digitalio
-from adafruit_adxl34x import ADXL345
 
 import config
+import log
+from encoder import make_encoder
+from events import (
+    EventQueue,
+    EVT_ROTATE_CW,
+    EVT_ROTATE_CCW,
+    EVT_PRESS,
+    EVT_SHAKE,
+    EVT_RELEASE,
+)
 
 
 class InputManager:
@@ -14,112 +23,421 @@ class InputManager:
     - Accelerometer-based shake gesture
 
     This module abstracts raw hardware signals into clean event flags
-    that the game engine can read each frame.
+    that the game engine can read each frame, and also records every
+    action in a timestamped event queue (self.events) so that actions
+    landing in the same frame can be handled in order.
+
+    With a replay source, no hardware is touched: recorded events are
+    injected at their original times instead (see replay.py).
+
+    The accelerometer can be started later with start_accel(), so the
+    encoder and button work as soon as possible at boot; shakes are not
+    detected until then. While the game is idle, power.py puts it in a
+    low-power mode with set_accel_power() and frees the button pin for
+    a light-sleep wake alarm with release_button().
     """
 
-    def __init__(self, i2c):
+    def __init__(self, i2c, source=None, accel=True):
         """
         Initialize hardware interfaces for the encoder and accelerometer.
+
+        Parameters:
+        - i2c: shared I2C bus (unused when replaying)
+        - source: optional replay.ReplaySource that replaces the hardware
+        - accel: set up the accelerometer now (False: call start_accel())
         """
+        # Optional replay.Recorder that logs every input edge
+        self.recorder = None
+
+        # Optional awaitable flag (an asyncio.Event) set whenever an event
+        # is queued, so an asyncio game loop can sleep until there is input.
+        # Anything with a set() method works (code.py uses the PowerManager
+        # to leave idle mode as soon as input arrives).
+        self.ready = None
+
+        # Timestamped action queue consumed by the game engine
+        self.events = EventQueue(config.INPUT_QUEUE_SIZE)
+
+        # Inputs sampled by poll() and not yet reported in the frame flags
+        self._pending_delta = 0
+        self._press_pending = False
+        self._shake_pending = False
 
-        # Rotary encoder channel A (quadrature signal)
-        self.encA = digitalio.DigitalInOut(config.ENCODER_PIN_A)
-        self.encA.switch_to_input(pull=digitalio.Pull.UP)
+        self.source = source
+        self._i2c = i2c
 
-        # Rotary encoder channel B (quadrature signal)
-        self.encB = digitalio.DigitalInOut(config.ENCODER_PIN_B)
-        self.encB.switch_to_input(pull=digitalio.Pull.UP)
-        self.lastA = self.encA.value  # Track previous A state for direction detection
+        # Accelerometer power mode (shake.ACCEL_ON = 0) and its switch,
+        # created on first use
+        self.accel_mode = 0
+        self._accel_power = None
 
+        # Accelerometer reads failed in a row. Only the first failure of
+        # a run is logged as a warning (warnings print at once), the run
+        # length is logged once reads work again.
+        self._accel_failures = 0
+
+        if source is None:
+            self.shake_mode = "off"
+            self._init_hardware()
+            if accel:
+                self.start_accel()
+        else:
+            self.shake_mode = "replay"
+            self._last_button = True
+
+        # Initialize event flags
+        self.reset_actions()
+
+    def _init_hardware(self):
+        """
+        Set up the encoder and button.
+        """
+        # Rotary encoder quadrature channels A and B.
+        # The backend (hardware counter, background scan or polling)
+        # is chosen in config.ENCODER_BACKEND.
+        self.encoder = make_encoder(
+            config.ENCODER_PIN_A,
+            config.ENCODER_PIN_B,
+            config.ENCODER_BACKEND,
+            config.ENCODER_DIVISOR,
+            config.ENCODER_SCAN_INTERVAL,
+        )
+
+        self._init_button()
+
+    def _init_button(self):
         # Rotary encoder push button (active low)
         self.button = digitalio.DigitalInOut(config.ENCODER_BUTTON)
         self.button.switch_to_input(pull=digitalio.Pull.UP)
         self._last_button = self.button.value  # Save previous button state
 
-        # Initialize ADXL345 accelerometer
-        # Compute initial magnitude for shake comparison
+    def release_button(self):
+        """
+        Free the button pin, e.g. for an alarm.pin.PinAlarm while the
+        board light-sleeps. Call claim_button() afterwards.
+        """
+        self.button.deinit()
+        self.button = None
+
+    def claim_button(self):
+        """
+        Take the button pin back after release_button(). A press that is
+        still held (the one that woke the board) is not a new press.
+        """
+        self._init_button()
+
+    def start_accel(self):
+        """
+        Set up the accelerometer and start shake detection. The driver
+        and detector modules are only imported here.
+        """
+        if self.shake_mode != "off":
+            return
+        from adafruit_adxl34x import ADXL345
+        from shake import (
+            AccelActivity,
+            AccelFifo,
+            ShakeDetector,
+            delta_to_act_threshold,
+            delta_to_mag_sq,
+        )
+
+        i2c = self._i2c
         self.accel = ADXL345(i2c)
-        x, y, z = self.accel.acceleration
-        mag = math.sqrt(x * x + y * y + z * z)
-        self._last_mag = mag
+        self.shake_mode = config.SHAKE_MODE
         self._last_shake_time = time.monotonic()
+        self._last_shake_ns = 0
 
-        # Encoder rotation cooldown to prevent multiple triggers per step
-        self._last_rotate_time = time.monotonic()
+        if self.shake_mode == "activity":
+            # The ADXL345 compares samples itself; only INT_SOURCE is read
+            self.accel_activity = AccelActivity(
+                i2c,
+                delta_to_act_threshold(config.SHAKE_DELTA_THRESHOLD),
+                config.ACCEL_INT_PIN,
+            )
+            self._shake_cooldown_ns = int(config.SHAKE_COOLDOWN * 1000000000)
+        elif self.shake_mode == "fifo":
+            # Chip-side sampling at a fixed rate, drained once per frame
+            self.accel_fifo = AccelFifo(i2c, config.ACCEL_FIFO_RATE)
+            self.shake_detector = ShakeDetector(
+                delta_to_mag_sq(config.SHAKE_DELTA_THRESHOLD),
+                delta_to_mag_sq(config.SHAKE_MAX_DELTA),
+                int(config.SHAKE_COOLDOWN * config.ACCEL_FIFO_RATE),
+                config.SHAKE_FILTER_WINDOW,
+                config.SHAKE_MIN_HITS,
+            )
+        else:
+            # Compute initial magnitude for per-frame shake comparison
+            x, y, z = self.accel.acceleration
+            self._last_mag = math.sqrt(x * x + y * y + z * z)
 
-        # Initialize event flags
-        self.reset_actions()
+    def set_accel_power(self, mode):
+        """
+        Switch the accelerometer to shake.ACCEL_ON, ACCEL_LOW or
+        ACCEL_STANDBY. Shakes are only detected in ACCEL_ON; anything the
+        chip latched or buffered meanwhile is dropped when it is back on.
+        Does nothing before start_accel() or when replaying.
+        """
+        if self.shake_mode in ("off", "replay") or mode == self.accel_mode:
+            return
+        try:
+            if self._accel_power is None:
+                from shake import AccelPower
+
+                self._accel_power = AccelPower(self._i2c)
+            self._accel_power.set(mode)
+            if not mode:
+                if self.shake_mode == "activity":
+                    self.accel_activity.poll()
+                elif self.shake_mode == "fifo":
+                    self.accel_fifo.clear()
+        except OSError as e:
+            self._accel_failed(e)
+            return
+        if self._accel_failures:
+            self._accel_recovered()
+        self.accel_mode = mode
 
     def reset_actions(self):
         """
         Reset all per-frame input flags.
         This ensures that actions are only detected once per frame.
         """
+        self.rotate_delta = 0         # Signed detents this frame (+ = CW)
         self.rotated_cw = False
         self.rotated_ccw = False
         self.button_pressed = False   # True only on rising edge (one-frame pulse)
         self.button_down = False      # True while held down
         self.shake_detected = False
 
-    def update(self):
+    def poll(self):
         """
-        Poll all hardware inputs and update event flags.
-        This method should be called once per frame from code.py.
+        Sample the encoder and button between frames.
+        Events are queued with the time they were seen, and the frame
+        flags are filled in at the next update(). Useful with the polling
+        encoder backend; background backends count edges on their own.
         """
-        self.reset_actions()
+        self._sample_fast(time.monotonic_ns())
+
+    def _emit(self, kind, t_ns):
+        """
+        Queue an event for the game and log it when recording.
+        """
+        self.events.push(kind, t_ns)
+        if self.recorder is not None:
+            self.recorder.event(kind, t_ns)
+        if self.ready is not None:
+            self.ready.set()
+
+    def inject(self, kind, t_ns):
+        """
+        Apply a recorded event as if the hardware had just produced it.
+        """
+        if kind == EVT_ROTATE_CW:
+            self._pending_delta += 1
+        elif kind == EVT_ROTATE_CCW:
+            self._pending_delta -= 1
+        elif kind == EVT_PRESS:
+            self._press_pending = True
+            self._last_button = False
+        elif kind == EVT_RELEASE:
+            self._last_button = True
+            return
+        elif kind == EVT_SHAKE:
+            self._shake_pending = True
+        self.events.push(kind, t_ns)
+        if self.ready is not None:
+            self.ready.set()
+
+    def _sample_fast(self, now_ns):
+        """
+        Read the encoder and button, queue events and accumulate them
+        for the next frame's flags.
+
+        Detents carry the time the encoder backend saw them when it
+        keeps one (keypad). With rotaryio, polling and for the button,
+        now_ns, the time of this sample, stands in: the edge happened
+        somewhere since the previous sample, up to one input poll
+        (config.INPUT_RATE_HZ, or a frame without poll()) earlier.
+        """
+        if self.source is not None:
+            self.source.feed(self, now_ns)
+            return
 
         # -------------------------------
         # Rotary Encoder Rotation
         # -------------------------------
 
-        currentA = self.encA.value
-        currentB = self.encB.value
-        now = time.monotonic()
-
-        # If A changed, a rotation occurred
-        if currentA != self.lastA:
-            # Apply cooldown so only one step is counted
-            if now - self._last_rotate_time > config.ROTATE_COOLDOWN:
-                # Determine direction using quadrature logic
-                if currentA == currentB:
-                    self.rotated_cw = True
-                else:
-                    self.rotated_ccw = True
-
-                self._last_rotate_time = now
+        # Detents counted by the backend since the previous sample
+        steps = self.encoder.read()
+        if config.ENCODER_REVERSE:
+            steps = -steps
+        self._pending_delta += steps
 
-        self.lastA = currentA
+        # One event per detent so fast spins are not merged
+        encoder = self.encoder
+        i = 0
+        while steps > 0:
+            self._emit(EVT_ROTATE_CW, encoder.stamp_ns(i, now_ns))
+            steps -= 1
+            i += 1
+        while steps < 0:
+            self._emit(EVT_ROTATE_CCW, encoder.stamp_ns(i, now_ns))
+            steps += 1
+            i += 1
 
         # -------------------------------
         # Button Press Detection
         # -------------------------------
 
         now_btn = self.button.value      # High = not pressed, Low = pressed
-        self.button_down = (not now_btn)
 
         # Button press edge: last = high, now = low
         if self._last_button and not now_btn:
-            self.button_pressed = True
+            self._press_pending = True
+            self._emit(EVT_PRESS, now_ns)
+        elif now_btn and not self._last_button and self.recorder is not None:
+            self.recorder.event(EVT_RELEASE, now_ns)
 
         self._last_button = now_btn
 
+    def update(self):
+        """
+        Poll all hardware inputs, update event flags and queue events.
+        This method should be called once per frame from code.py.
+        """
+        self.reset_actions()
+        self._sample_fast(time.monotonic_ns())
+
+        # Frame flags cover everything sampled since the previous frame
+        steps = self._pending_delta
+        self._pending_delta = 0
+        self.rotate_delta = steps
+        self.rotated_cw = steps > 0
+        self.rotated_ccw = steps < 0
+
+        self.button_pressed = self._press_pending
+        self._press_pending = False
+        self.button_down = not self._last_button
+
         # -------------------------------
         # Accelerometer Shake Detection
         # -------------------------------
 
+        self.sample_accel()
+        self.shake_detected = self._shake_pending
+        self._shake_pending = False
+
+    def sample_accel(self):
+        """
+        Check the accelerometer for a shake and keep it for the next
+        frame's flags. Called by update() and by service_accel().
+        """
+        if self.accel_mode:
+            # Accelerometer in low power or standby (power.py)
+            pass
+        elif self.shake_mode == "activity":
+            self._update_shake_activity()
+        elif self.shake_mode == "fifo":
+            self._update_shake_fifo()
+        elif self.shake_mode == "replay" or self.shake_mode == "off":
+            # Shakes are injected, or the accelerometer is not started yet
+            pass
+        else:
+            self._update_shake_poll()
+
+    def service_accel(self):
+        """
+        Bus arbiter service, run right before a long display transfer
+        (bus.py): reads the activity latch or drains the FIFO. The poll
+        detector is left alone; it compares one reading per frame, so an
+        extra read in between would change the deltas it sees.
+        """
+        if self.shake_mode == "activity" or self.shake_mode == "fifo":
+            self.sample_accel()
+
+    def _accel_failed(self, e):
+        """
+        Count a failed accelerometer read; warn on the first of a run.
+        """
+        if not self._accel_failures:
+            log.warn(log.ACCEL_READ_FAILED, e.errno or 0)
+        self._accel_failures += 1
+
+    def _accel_recovered(self):
+        """
+        Log the length of the run of failed reads that just ended.
+        """
+        log.info(log.ACCEL_RECOVERED, self._accel_failures)
+        self._accel_failures = 0
+
+    def _update_shake_activity(self):
+        """
+        Check the ADXL345 activity latch (one byte, or just the INT pin).
+        """
+        try:
+            active = self.accel_activity.poll()
+        except OSError as e:
+            # Retries used up (bus.py); the latch stays set on the chip
+            # and is read next frame
+            self._accel_failed(e)
+            return
+        if self._accel_failures:
+            self._accel_recovered()
+
+        if not active:
+            return
+
+        now_ns = time.monotonic_ns()
+        if now_ns - self._last_shake_ns > self._shake_cooldown_ns:
+            self._shake_pending = True
+            self._last_shake_ns = now_ns
+            self._emit(EVT_SHAKE, now_ns)
+
+    def _update_shake_fifo(self):
+        """
+        Drain the ADXL345 FIFO and run the streaming detector over the batch.
+        The shake event is timestamped with the sample that triggered it.
+        """
+        try:
+            samples_ago = self.accel_fifo.drain(self.shake_detector)
+        except OSError as e:
+            # Retries used up (bus.py); samples not read yet stay
+            # buffered on the chip and are read next frame
+            self._accel_failed(e)
+            return
+        if self._accel_failures:
+            self._accel_recovered()
+
+        if samples_ago >= 0:
+            self._shake_pending = True
+            self._emit(
+                EVT_SHAKE,
+                time.monotonic_ns() - samples_ago * self.accel_fifo.sample_period_ns,
+            )
+
+    def _update_shake_poll(self):
+        """
+        Fallback detector: one acceleration read per frame, compared
+        with the magnitude from the previous frame.
+        """
         try:
             x, y, z = self.accel.acceleration
-        except OSError:
+        except OSError as e:
             # Sometimes the ADXL345 may fail to read briefly.
             # In that case, skip the shake detection for this frame.
+            self._accel_failed(e)
             return
+        if self._accel_failures:
+            self._accel_recovered()
 
         # Compute magnitude and compare change since last frame
         mag = math.sqrt(x * x + y * y + z * z)
         delta_mag = abs(mag - self._last_mag)
 
-        # Debug print used during tuning
-        print("delta_mag =", delta_mag)
+        # Logged for threshold tuning (set config.LOG_LEVEL to log.DEBUG)
+        if log.enabled(log.DEBUG):
+            log.debug(log.SHAKE_DELTA, int(delta_mag * 1000))
 
         self._last_mag = mag
         now = time.monotonic()
@@ -129,6 +447,7 @@ class InputManager:
             delta_mag >= config.SHAKE_DELTA_THRESHOLD
             and now - self._last_shake_time > config.SHAKE_COOLDOWN
         ):
-            self.shake_detected = True
+            self._shake_pending = True
             self._last_shake_time = now
-            print("SHAKE DETECTED, delta_mag =", delta_mag)
+            self._emit(EVT_SHAKE, time.monotonic_ns())
+            log.debug(log.SHAKE, int(delta_mag * 1000))
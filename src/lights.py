@@ -1,52 +1,149 @@
 # Handles all LED feedback for the device, including rainbow animations,
 # static colors during gameplay, and move-specific color indicators.
+#
+# The whole strip (config.NEOPIXEL_COUNT pixels) is driven from one frame
+# buffer rendered by effects.Strip:
+# - splash / menu: rainbow spread along the strip
+# - move: countdown chase in the move's color, shrinking as time runs out
+# - a short flash of the whole strip on every correct move
+# - static colors for the other modes
+#
+# A frame is only rendered when its input changed (mode, rainbow index,
+# countdown level), and pixels.show() is rate limited to
+# config.LIGHTS_MAX_SHOW_HZ.
+#
+# The strip can be started after the game with start(); until then
+# modes are only remembered, and the first frame shows the current one.
+# neopixel and the effect tables are imported by start().
+#
+# While the game is idle, power.py dims the strip with set_brightness()
+# and turns it off with sleep(); wake() shows the current mode again.
 
 import time
-import board
-import neopixel
-from rainbowio import colorwheel
 import config
 
+# Animation of the current mode
+_STATIC = 0
+_RAINBOW = 1
+_CHASE = 2
+
+_OFF = (0, 0, 0)
+
+# Colors of the static modes (anything else is off)
+_STATIC_COLORS = {
+    "game_start": (0, 0, 150),     # Entry effect when beginning a level
+    "playing": (0, 0, 40),         # Dim blue background during gameplay
+    "game_over": (200, 0, 0),      # Solid red indicator
+}
+
 
 class Lights:
-    def __init__(self):
-        # Initialize NeoPixel (1 LED) on pin D10
-        self.pixels = neopixel.NeoPixel(
-            board.D10,
-            1,
-            brightness=0.3,
-            auto_write=False
-        )
+    def __init__(self, start=True):
+        # NeoPixel strip and frame buffer, created by start()
+        self.pixels = None
+        self.strip = None
+
+        # Chase levels on the whole strip (pixels * CHASE_STEPS)
+        self._chase_levels = 0
 
         # Current lighting behavior mode
         self.mode = "idle"
 
-        # Stores the current move color when in "move" mode
+        # Strip brightness, and whether the strip is off (see sleep())
+        self.brightness = config.NEOPIXEL_BRIGHTNESS
+        self.asleep = False
+
+        # Stores the current move when in "move" mode
         self.current_move = None
 
+        self._anim = _STATIC
+        self._color = _OFF
+
+        # Input of the frame last rendered (rainbow index, chase level,
+        # 0 for a static color; -1 = render again)
+        self._key = -1
+
         # Internal counter used for smooth rainbow animation
         self._rainbow_pos = 0.0
 
-    # Set a single RGB color on the LED
-    def _set_color(self, color):
-        self.pixels[0] = color
-        self.pixels.show()
+        # Move countdown shown by the chase, as remaining / total
+        self._remaining = 1
+        self._total = 1
 
-    # Set color based on the required move type
-    def _set_move_color(self, move):
-        # Map each gameplay action to a specific color
-        if move == config.MOVE_CW:
-            color = (255, 255, 0)          # Rotate right: yellow
-        elif move == config.MOVE_CCW:
-            color = (0, 255, 255)          # Rotate left: cyan
-        elif move == config.MOVE_PRESS:
-            color = (0, 255, 0)            # Button press: green
-        elif move == config.MOVE_SHAKE:
-            color = (255, 255, 255)        # Shake: white
+        # Seconds left of a correct-move flash
+        self._flash_left = 0.0
+
+        # Whether the frame still has to be shown because of the
+        # show() rate limit
+        self._dirty = False
+        if config.LIGHTS_MAX_SHOW_HZ:
+            self._show_period_ns = 1000000000 // config.LIGHTS_MAX_SHOW_HZ
         else:
-            color = (0, 0, 0)              # Fallback: off
+            self._show_period_ns = 0
+        self._next_show_ns = 0
+
+        if start:
+            self.start()
 
-        self._set_color(color)
+    def start(self):
+        """
+        Initialize the NeoPixel strip and show the current mode.
+        """
+        if self.pixels is not None:
+            return
+        import neopixel
+        from effects import Strip, CHASE_STEPS
+
+        self.pixels = neopixel.NeoPixel(
+            config.NEOPIXEL_PIN,
+            config.NEOPIXEL_COUNT,
+            brightness=self.brightness,
+            auto_write=False
+        )
+        self.strip = Strip(config.NEOPIXEL_COUNT)
+        self._chase_levels = config.NEOPIXEL_COUNT * CHASE_STEPS
+        self._key = -1
+        self._render()
+        if self._dirty:
+            self._show()
+
+    # Push the frame to the strip unless the last show was too recent;
+    # update() retries while the frame is dirty
+    def _show(self):
+        now = time.monotonic_ns()
+        if now < self._next_show_ns:
+            return
+        self._next_show_ns = now + self._show_period_ns
+        self.pixels[:] = self.strip.frame
+        self.pixels.show()
+        self._dirty = False
+
+    # Render the current mode into the frame if its input changed
+    def _render(self):
+        if self._flash_left > 0 or self.strip is None or self.asleep:
+            return
+        anim = self._anim
+        if anim == _RAINBOW:
+            key = int(self._rainbow_pos) & 255
+            if key == self._key:
+                return
+            self.strip.rainbow(key)
+        elif anim == _CHASE:
+            remaining = self._remaining
+            if remaining <= 0:
+                key = 0
+            else:
+                key = self._chase_levels * remaining // self._total
+            if key == self._key:
+                return
+            self.strip.chase(self._color, key)
+        else:
+            if self._key == 0:
+                return
+            key = 0
+            self.strip.solid(self._color)
+        self._key = key
+        self._dirty = True
 
     def set_mode(self, mode, move=None):
         """
@@ -56,42 +153,93 @@ class Lights:
             "splash"      Startup screen rainbow animation
             "menu"        Difficulty selection rainbow animation
             "playing"     Game has started, static background color
-            "move"        Show the color associated with the current move
+            "move"        Countdown chase in the color of the current move
             "game_start"  Flash color when entering the first level
             "game_over"   Red indicator when time is up
             "idle"        LED off
         """
+        if mode == self.mode and move == self.current_move:
+            return
         self.mode = mode
         self.current_move = move
+        self._key = -1
 
-        # Splash and menu both use continuous rainbow animations
         if mode in ("splash", "menu"):
-            # Rainbow is handled inside update()
-            return
+            # Splash and menu both use continuous rainbow animations
+            self._anim = _RAINBOW
+        elif mode == "move" and move is not None:
+            # Each gameplay action has its own color (config.MOVE_COLORS);
+            # the chase starts full
+            self._anim = _CHASE
+            self._color = config.MOVE_COLORS[move]
+            self._remaining = self._total = 1
+        else:
+            # Other modes use static single colors
+            self._anim = _STATIC
+            self._color = _STATIC_COLORS.get(mode, _OFF)
 
-        # Other modes use static single colors
-        if mode == "idle":
-            self._set_color((0, 0, 0))
+        self._render()
+        if self._dirty:
+            self._show()
 
-        elif mode == "game_start":
-            # Entry effect when beginning a level
-            self._set_color((0, 0, 150))
+    def set_countdown(self, remaining, total):
+        """
+        Time left for the current move, shown by the "move" chase.
+        Both are integers in the same unit (nanoseconds from the game).
+        """
+        self._remaining = remaining
+        self._total = total
 
-        elif mode == "playing":
-            # Dim blue background during gameplay
-            self._set_color((0, 0, 40))
+    def flash(self):
+        """
+        Light the whole strip for config.LIGHTS_FLASH_TIME seconds, then
+        go back to the current mode. Used as correct-move feedback.
+        """
+        if self.strip is None or self.asleep:
+            return
+        self._flash_left = config.LIGHTS_FLASH_TIME
+        self.strip.solid(config.LIGHTS_FLASH_COLOR)
+        self._key = -1
+        self._dirty = True
+        self._show()
 
-        elif mode == "move":
-            # Show action feedback color
-            self._set_move_color(move)
+    def set_brightness(self, brightness):
+        """
+        Scale the whole strip, e.g. down while the game is idle.
+        """
+        self.brightness = brightness
+        if self.pixels is not None:
+            self.pixels.brightness = brightness
+            self._dirty = True
+            self._next_show_ns = 0
+            self._show()
 
-        elif mode == "game_over":
-            # Solid red indicator
-            self._set_color((200, 0, 0))
+    def sleep(self):
+        """
+        Turn every LED off until wake(). Modes set meanwhile are kept.
+        """
+        was_asleep = self.asleep
+        self.asleep = True
+        if was_asleep or self.strip is None:
+            return
+        self._flash_left = 0.0
+        self.strip.solid(_OFF)
+        self._key = -1
+        self._dirty = True
+        self._next_show_ns = 0
+        self._show()
 
-        else:
-            # Default off for any unknown mode
-            self._set_color((0, 0, 0))
+    def wake(self):
+        """
+        Show the current mode again after sleep().
+        """
+        if not self.asleep:
+            return
+        self.asleep = False
+        self._next_show_ns = 0
+        self._render()
+        if self._dirty:
+            self._show()
 
     def update(self, dt):
         """
@@ -100,15 +248,17 @@ class Lights:
 
         dt = time elapsed since last frame, used to control speed smoothly.
         """
+        if self._flash_left > 0:
+            self._flash_left -= dt
 
         # Rainbow animation only applies in certain UI screens
-        if self.mode in ("splash", "menu"):
+        if self._anim == _RAINBOW:
             # Move the rainbow cursor based on passed time
             # Adjust 120 to change the animation speed
             self._rainbow_pos = (self._rainbow_pos + 120 * dt) % 255
 
-            # Convert position to colorwheel value
-            idx = int(self._rainbow_pos) & 255
-            self.pixels[0] = colorwheel(idx)
-            self.pixels.show()
+        self._render()
 
+        # Show a frame held back by the rate limit
+        if self._dirty:
+            self._show()
@@ -0,0 +1,230 @@
+# Leveled in-RAM logger.
+#
+# Printing over USB serial blocks for milliseconds and formats floats into
+# new strings, so the game does not print while it runs. Instead each log
+# call stores a compact record (message code, level, time and two ints)
+# in a preallocated ring buffer. Records are only turned into text when
+# flush() is called, and calls below the configured level return at once.
+#
+#     import log
+#     log.info(log.LEVEL_START, level, per_move_ms)
+#     ...
+#     log.flush()            # to serial
+#     log.flush("/log.txt")  # to a file (needs a writable filesystem)
+#
+# When the ring is full the oldest records are overwritten and counted.
+# Warnings and errors (config.LOG_ECHO_LEVEL and above) are also printed
+# as they happen; they are rare and should not wait for a flush.
+
+import time
+from array import array
+
+import config
+import states
+
+# Levels
+DEBUG = 10
+INFO = 20
+WARN = 30
+ERROR = 40
+OFF = 100
+
+_LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARN: "WARN", ERROR: "ERROR"}
+
+# Lookup tables for arguments shown as names
+_DIFFICULTY_NAMES = ("EASY", "MEDIUM", "HARD")
+_STATE_NAMES = states.STATE_NAMES
+_MOVE_NAMES = config.MOVE_NAMES
+_POWER_MODES = ("ACTIVE", "IDLE", "SLEEP")
+
+# ----------------------------------------
+# Message codes
+# ----------------------------------------
+# Each code has a format with up to two %s fields for the record's ints.
+# A names table after the format shows that argument as a name instead.
+SPLASH_PRESS = 1
+MENU_DIFFICULTY = 2
+GAME_START = 3
+LEVEL_START = 4
+MOVE_OK = 5
+GAME_WIN = 6
+TIME_UP = 7
+SHAKE = 8
+SHAKE_DELTA = 9
+ACCEL_READ_FAILED = 10
+RECORD_FULL = 11
+RECORD_WRITE_FAILED = 12
+REPLAY_MISMATCH = 13
+TRANSITION = 14
+STATS_SAVED = 15
+STATS_WRITE_FAILED = 16
+STATS_NO_STORE = 17
+POWER_MODE = 18
+POWER_NO_ALARM = 19
+ADAPTIVE_SCALE = 20
+ACCEL_RECOVERED = 21
+RECORD_OVERFLOW = 22
+
+_MESSAGES = (
+    None,
+    ("SPLASH: button pressed, go to MENU",),
+    ("MENU: difficulty = %s", _DIFFICULTY_NAMES),
+    ("MENU: long press to start game, held = %s ms",),
+    ("LEVEL_START: level = %s, per move = %s ms",),
+    ("WAIT_INPUT: correct move %s (%s)", None, _MOVE_NAMES),
+    ("GAME_WIN: passed all levels",),
+    ("WAIT_INPUT: time up at level %s move %s, game over",),
+    ("SHAKE DETECTED, delta_mag = %s mm/s^2",),
+    ("delta_mag = %s mm/s^2",),
+    ("ACCEL: read failed, errno %s",),
+    ("REPLAY: recording file full, recording stopped",),
+    ("REPLAY: cannot write recording, errno %s",),
+    ("REPLAY: transition %s does not match the recording (got %s)", None, _STATE_NAMES),
+    ("STATE: %s -> %s", _STATE_NAMES, _STATE_NAMES),
+    ("STATS: game %s summarised, %s correct moves",),
+    ("STATS: cannot write, errno %s",),
+    ("STATS: no NVM, stats are not kept",),
+    ("POWER: %s -> %s", _POWER_MODES, _POWER_MODES),
+    ("POWER: no alarm module, sleeping without light sleep",),
+    ("LEVEL_START: adaptive time scale = %s %%, mean reaction = %s %% of the time",),
+    ("ACCEL: reads work again after %s failed",),
+    ("REPLAY: buffer full during a game, recording stopped",),
+)
+
+try:
+    from supervisor import ticks_ms as _ticks_ms
+except ImportError:
+    def _ticks_ms():
+        return (time.monotonic_ns() // 1000000) & 0x3FFFFFFF
+
+
+class _Ring:
+    """
+    Preallocated record storage shared by the module-level functions.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.codes = bytearray(capacity)
+        self.levels = bytearray(capacity)
+        self.times = array("L", [0] * capacity)
+        self.a = array("l", [0] * capacity)
+        self.b = array("l", [0] * capacity)
+        self.head = 0       # Index of the oldest record
+        self.count = 0
+        self.dropped = 0
+
+
+_ring = _Ring(config.LOG_CAPACITY)
+_level = config.LOG_LEVEL
+_echo_level = config.LOG_ECHO_LEVEL
+
+
+def set_level(level):
+    global _level
+    _level = level
+
+
+def enabled(level):
+    """
+    True if records at this level are kept. Lets callers skip computing
+    arguments for messages that would be dropped.
+    """
+    return level >= _level
+
+
+def _write(level, code, a, b):
+    ring = _ring
+    if ring.count == ring.capacity:
+        ring.head = (ring.head + 1) % ring.capacity
+        ring.count -= 1
+        ring.dropped += 1
+    i = (ring.head + ring.count) % ring.capacity
+    ring.codes[i] = code
+    ring.levels[i] = level
+    ring.times[i] = _ticks_ms()
+    ring.a[i] = a
+    ring.b[i] = b
+    ring.count += 1
+    if level >= _echo_level:
+        print(_format(i))
+
+
+def debug(code, a=0, b=0):
+    if DEBUG >= _level:
+        _write(DEBUG, code, a, b)
+
+
+def info(code, a=0, b=0):
+    if INFO >= _level:
+        _write(INFO, code, a, b)
+
+
+def warn(code, a=0, b=0):
+    if WARN >= _level:
+        _write(WARN, code, a, b)
+
+
+def error(code, a=0, b=0):
+    if ERROR >= _level:
+        _write(ERROR, code, a, b)
+
+
+def _arg(value, names):
+    if names is not None and 0 <= value < len(names):
+        return names[value]
+    return value
+
+
+def _format(i):
+    ring = _ring
+    message = _MESSAGES[ring.codes[i]]
+    fmt = message[0]
+    fields = fmt.count("%s")
+    args = (
+        _arg(ring.a[i], message[1] if len(message) > 1 else None),
+        _arg(ring.b[i], message[2] if len(message) > 2 else None),
+    )[:fields]
+    return "[%8d ms] %-5s %s" % (
+        ring.times[i], _LEVEL_NAMES.get(ring.levels[i], "?"), fmt % args
+    )
+
+
+def pending():
+    """
+    Number of records waiting to be flushed.
+    """
+    return _ring.count
+
+
+def flush(path=None):
+    """
+    Print every buffered record, oldest first, and empty the buffer.
+    With a path, the records are appended to that file instead.
+    """
+    ring = _ring
+    out = None
+    if path is not None:
+        try:
+            out = open(path, "a")
+        except OSError:
+            print("LOG: cannot open", path, "- printing instead")
+    try:
+        if ring.dropped:
+            line = "LOG: %d older records dropped" % ring.dropped
+            if out is None:
+                print(line)
+            else:
+                out.write(line + "\n")
+        for k in range(ring.count):
+            line = _format((ring.head + k) % ring.capacity)
+            if out is None:
+                print(line)
+            else:
+                out.write(line + "\n")
+    finally:
+        if out is not None:
+            out.close()
+    ring.head = 0
+    ring.count = 0
+    ring.dropped = 0
@@ -0,0 +1,274 @@
+# Idle power manager.
+#
+# The game spends most of its battery time on screens that only wait for
+# input (splash, menu, stats, end screens) with the whole loop running at
+# full rate. PowerManager steps down in two stages once nothing has
+# happened for a while:
+#
+#     ACTIVE  full rates, LEDs at NEOPIXEL_BRIGHTNESS, accelerometer on
+#     IDLE    after POWER_IDLE_AFTER s: game, lights and display tasks at
+#             POWER_IDLE_RATE_HZ, input sampling at POWER_IDLE_INPUT_HZ,
+#             LEDs dimmed, accelerometer in low-power mode
+#     SLEEP   after POWER_SLEEP_AFTER s: LEDs and OLED off, accelerometer
+#             in standby, and the board light-sleeps (alarm module) until
+#             the encoder button is pressed
+#
+# A screen counts as waiting only while the game has no deadline, no
+# screen animation runs and the button is up. In code.py the manager is
+# InputManager.ready, so the first queued input event restores the full
+# rates and the next scheduler pass already ticks at them.
+#
+# Time in each mode is kept together with an estimate of the current
+# drawn (config.POWER_MA_*): CPU busy / waiting / light sleep from the
+# scheduler's sleep time, OLED and accelerometer by mode, NeoPixels from
+# the frame shown and the brightness. report() prints the averages.
+
+import time
+
+import config
+import log
+from shake import ACCEL_ON, ACCEL_LOW, ACCEL_STANDBY
+
+# Modes
+ACTIVE = 0
+IDLE = 1
+SLEEP = 2
+
+MODE_NAMES = ("ACTIVE", "IDLE", "SLEEP")
+
+
+class PowerManager:
+    """
+    Steps the running game down to lower power modes while it waits for
+    input. Call tick() every game tick after InputManager.update().
+
+    Parameters:
+    - inputs: InputManager
+    - display: Display
+    - lights: Lights
+    - game: Game
+    """
+
+    def __init__(self, inputs, display, lights, game):
+        self.inputs = inputs
+        self.display = display
+        self.lights = lights
+        self.game = game
+        self.mode = ACTIVE
+
+        # Scheduler and the tasks slowed down while idle, see attach()
+        self.loop = None
+        self._tasks = ()
+
+        self._idle_after_ns = int(config.POWER_IDLE_AFTER * 1000000000)
+        self._sleep_after_ns = int(config.POWER_SLEEP_AFTER * 1000000000)
+        self._light_sleep = config.POWER_LIGHT_SLEEP
+
+        # Time of the last input or of the last frame that was not waiting
+        now = time.monotonic_ns()
+        self._active_ns = now
+
+        # Time and estimated charge (mA * ns) per mode, accounted up to
+        # _mode_start_ns
+        self.mode_ns = [0, 0, 0]
+        self.mode_charge = [0.0, 0.0, 0.0]
+        self._mode_start_ns = now
+        self._loop_slept_ns = 0
+        self._light_slept_ns = 0
+
+    def attach(self, loop, tasks):
+        """
+        Let the manager slow down scheduler tasks while idle.
+
+        Parameters:
+        - loop: the Scheduler (its sleep time feeds the CPU estimate)
+        - tasks: (task, rate, idle_rate) for each task to slow down
+        """
+        self.loop = loop
+        self._loop_slept_ns = loop.slept_ns
+        self._tasks = tasks
+
+    # -------------------------------
+    # Mode changes
+    # -------------------------------
+
+    def tick(self):
+        """
+        Go back to ACTIVE on input or activity, otherwise step down once
+        the game has waited long enough.
+        """
+        inputs = self.inputs
+        now = time.monotonic_ns()
+        if (
+            inputs.rotate_delta
+            or inputs.button_pressed
+            or inputs.button_down
+            or inputs.shake_detected
+            or self.display.animating
+            or self.game.next_deadline_ns() is not None
+        ):
+            self._active_ns = now
+            if self.mode != ACTIVE:
+                self.set()
+            return
+
+        waited = now - self._active_ns
+        if self.mode == ACTIVE:
+            if waited >= self._idle_after_ns:
+                self._enter_idle()
+        elif self.mode == IDLE:
+            if self._sleep_after_ns and waited >= self._sleep_after_ns:
+                self._enter_sleep()
+
+    def next_step_ns(self):
+        """
+        Time at which the next lower mode is due if nothing happens, or
+        None. Lets an event-driven loop tick the game just for tick().
+        """
+        if self.mode == ACTIVE:
+            return self._active_ns + self._idle_after_ns
+        if self.mode == IDLE and self._sleep_after_ns:
+            return self._active_ns + self._sleep_after_ns
+        return None
+
+    def set(self):
+        """
+        Go back to ACTIVE. Named like asyncio.Event.set() so the manager
+        can be InputManager.ready and wake on the first input event.
+        """
+        if self.mode == ACTIVE:
+            return
+        was_asleep = self.mode == SLEEP
+        self._switch(ACTIVE)
+        self._active_ns = time.monotonic_ns()
+
+        for task, rate, idle_rate in self._tasks:
+            task.set_rate(rate)
+        if was_asleep:
+            self.display.wake()
+        self.lights.set_brightness(config.NEOPIXEL_BRIGHTNESS)
+        self.lights.wake()
+        self.inputs.set_accel_power(ACCEL_ON)
+
+    def _enter_idle(self):
+        self._switch(IDLE)
+        for task, rate, idle_rate in self._tasks:
+            task.set_rate(idle_rate)
+        self.lights.set_brightness(config.POWER_IDLE_BRIGHTNESS)
+        self.inputs.set_accel_power(ACCEL_LOW)
+
+    def _enter_sleep(self):
+        self._switch(SLEEP)
+        self.lights.sleep()
+        self.display.sleep()
+        self.inputs.set_accel_power(ACCEL_STANDBY)
+        if self._light_sleep:
+            self._sleep_until_press()
+
+    def _sleep_until_press(self):
+        """
+        Light-sleep until the button is pressed, then wake up. Without
+        the alarm module sleep mode keeps polling at the idle rates.
+        """
+        try:
+            import alarm
+        except ImportError:
+            log.warn(log.POWER_NO_ALARM)
+            self._light_sleep = False
+            return
+
+        inputs = self.inputs
+        inputs.release_button()
+        start = time.monotonic_ns()
+        try:
+            alarm.light_sleep_until_alarms(
+                alarm.pin.PinAlarm(config.ENCODER_BUTTON, value=False, pull=True)
+            )
+        finally:
+            self._light_slept_ns += time.monotonic_ns() - start
+            inputs.claim_button()
+        self.set()
+
+    def _switch(self, mode):
+        self._account(time.monotonic_ns())
+        log.info(log.POWER_MODE, self.mode, mode)
+        self.mode = mode
+        if config.POWER_REPORT:
+            self.report()
+
+    # -------------------------------
+    # Current estimate
+    # -------------------------------
+
+    def _account(self, now):
+        """
+        Add the time since the last call to the current mode, with the
+        current estimated from how it was spent.
+        """
+        elapsed = now - self._mode_start_ns
+        if elapsed <= 0:
+            return
+        self._mode_start_ns = now
+
+        slept = 0
+        if self.loop is not None:
+            slept = self.loop.slept_ns - self._loop_slept_ns
+            self._loop_slept_ns = self.loop.slept_ns
+        light = self._light_slept_ns
+        self._light_slept_ns = 0
+
+        # Without a scheduler (code_async.py) the CPU counts as waiting
+        # whenever it is not in light sleep
+        if self.loop is None:
+            slept = elapsed - light
+        busy = max(0, elapsed - slept - light)
+        cpu = (
+            busy * config.POWER_MA_CPU_BUSY
+            + slept * config.POWER_MA_CPU_WAIT
+            + light * config.POWER_MA_CPU_LIGHT_SLEEP
+        ) / elapsed
+
+        if self.mode == SLEEP:
+            oled = config.POWER_MA_OLED_SLEEP
+        else:
+            oled = config.POWER_MA_OLED
+        accel = 0.0
+        if self.inputs.shake_mode not in ("off", "replay"):
+            accel = config.POWER_MA_ACCEL[self.inputs.accel_mode]
+
+        ma = cpu + oled + accel + self._leds_ma()
+        self.mode_ns[self.mode] += elapsed
+        self.mode_charge[self.mode] += ma * elapsed
+
+    def _leds_ma(self):
+        lights = self.lights
+        if lights.pixels is None:
+            return 0.0
+        ma = config.NEOPIXEL_COUNT * config.POWER_MA_PIXEL
+        if not lights.asleep:
+            ma += sum(lights.strip.frame) / 765 * lights.brightness * config.POWER_MA_PIXEL_FULL
+        return ma
+
+    def report(self):
+        """
+        Print the time spent in each mode with its estimated average
+        current, and the average over all of them.
+        """
+        self._account(time.monotonic_ns())
+        total_ns = 0
+        total_charge = 0.0
+        for mode in range(len(MODE_NAMES)):
+            ns = self.mode_ns[mode]
+            if not ns:
+                continue
+            total_ns += ns
+            total_charge += self.mode_charge[mode]
+            print(
+                "POWER: %-6s %8.1f s %7.2f mA"
+                % (MODE_NAMES[mode], ns / 1000000000, self.mode_charge[mode] / ns)
+            )
+        if total_ns:
+            print(
+                "POWER: %-6s %8.1f s %7.2f mA"
+                % ("total", total_ns / 1000000000, total_charge / total_ns)
+            )
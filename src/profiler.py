@@ -0,0 +1,368 @@
+# Opt-in frame profiler.
+#
+# Nothing in the game calls into this module directly. When
+# config.PROFILE_ENABLED is set, code.py wraps the hot methods of each
+# subsystem with timing probes; when it is off nothing is wrapped, so the
+# disabled cost is zero.
+#
+# Each probe keeps a count, total, maximum and a log2 histogram of call
+# durations in preallocated integer storage, so recording a sample does
+# not allocate any containers.
+
+import time
+from array import array
+
+from states import SPLASH, MENU, GAME_OVER, GAME_WIN, STATE_NAMES
+
+# Histogram bucket i holds durations below (_FIRST_BUCKET_US << i) µs;
+# the last bucket also holds everything longer.
+_FIRST_BUCKET_US = 64
+_BUCKETS = 14  # 64 µs ... 262 ms
+
+# Game state transitions kept for the summary
+_TRACE_SIZE = 16
+
+
+class Probe:
+    """
+    Timing statistics for one instrumented call site.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.total_us = 0
+        self.max_us = 0
+        self.hist = array("L", [0] * _BUCKETS)
+
+    def record(self, elapsed_ns):
+        us = elapsed_ns // 1000
+        self.count += 1
+        self.total_us += us
+        if us > self.max_us:
+            self.max_us = us
+
+        idx = 0
+        limit = _FIRST_BUCKET_US
+        while us >= limit and idx < _BUCKETS - 1:
+            idx += 1
+            limit <<= 1
+        self.hist[idx] += 1
+
+    def percentile_us(self, pct):
+        """
+        Upper bucket bound (µs) below which pct percent of calls finished,
+        capped at the slowest call seen.
+        """
+        if not self.count:
+            return 0
+        target = max(1, (self.count * pct + 99) // 100)
+        seen = 0
+        for i in range(_BUCKETS - 1):
+            seen += self.hist[i]
+            if seen >= target:
+                return min(_FIRST_BUCKET_US << i, self.max_us)
+        return self.max_us
+
+    def reset(self):
+        self.count = 0
+        self.total_us = 0
+        self.max_us = 0
+        for i in range(_BUCKETS):
+            self.hist[i] = 0
+
+
+class CountingI2C:
+    """
+    Pass-through wrapper around a busio.I2C that counts transactions
+    and bytes per device address.
+
+    Python drivers that talk through adafruit_bus_device (the ADXL345)
+    accept this wrapper in place of the bus. The OLED uses the native
+    display bus, which needs the real busio.I2C and is not counted here;
+    Display keeps its own estimate of bytes sent per refresh.
+
+    busio takes the end arguments as ints only, so a None end is
+    resolved to the buffer length before it is passed on.
+    """
+
+    def __init__(self, i2c):
+        self._i2c = i2c
+        # address -> array [transactions, bytes_written, bytes_read]
+        self.counters = {}
+
+    def _count(self, address, written, read):
+        counter = self.counters.get(address)
+        if counter is None:
+            counter = array("L", [0, 0, 0])
+            self.counters[address] = counter
+        counter[0] += 1
+        counter[1] += written
+        counter[2] += read
+
+    def try_lock(self):
+        return self._i2c.try_lock()
+
+    def unlock(self):
+        self._i2c.unlock()
+
+    def scan(self):
+        return self._i2c.scan()
+
+    def writeto(self, address, buffer, *, start=0, end=None):
+        if end is None:
+            end = len(buffer)
+        self._count(address, end - start, 0)
+        self._i2c.writeto(address, buffer, start=start, end=end)
+
+    def readfrom_into(self, address, buffer, *, start=0, end=None):
+        if end is None:
+            end = len(buffer)
+        self._count(address, 0, end - start)
+        self._i2c.readfrom_into(address, buffer, start=start, end=end)
+
+    def writeto_then_readfrom(
+        self, address, out_buffer, in_buffer, *,
+        out_start=0, out_end=None, in_start=0, in_end=None
+    ):
+        if out_end is None:
+            out_end = len(out_buffer)
+        if in_end is None:
+            in_end = len(in_buffer)
+        self._count(address, out_end - out_start, in_end - in_start)
+        self._i2c.writeto_then_readfrom(
+            address, out_buffer, in_buffer,
+            out_start=out_start, out_end=out_end,
+            in_start=in_start, in_end=in_end,
+        )
+
+    def reset(self):
+        for counter in self.counters.values():
+            counter[0] = counter[1] = counter[2] = 0
+
+
+# Timed wrappers, one per argument count, so a call does not pack its
+# arguments into a tuple the way fn(*args) would
+def _timed0(fn, record):
+    def timed():
+        start = time.monotonic_ns()
+        result = fn()
+        record(time.monotonic_ns() - start)
+        return result
+    return timed
+
+
+def _timed1(fn, record):
+    def timed(a):
+        start = time.monotonic_ns()
+        result = fn(a)
+        record(time.monotonic_ns() - start)
+        return result
+    return timed
+
+
+def _timed2(fn, record):
+    def timed(a, b):
+        start = time.monotonic_ns()
+        result = fn(a, b)
+        record(time.monotonic_ns() - start)
+        return result
+    return timed
+
+
+def _timed3(fn, record):
+    def timed(a, b, c):
+        start = time.monotonic_ns()
+        result = fn(a, b, c)
+        record(time.monotonic_ns() - start)
+        return result
+    return timed
+
+
+def _timed6(fn, record):
+    def timed(a, b, c, d, e, f):
+        start = time.monotonic_ns()
+        result = fn(a, b, c, d, e, f)
+        record(time.monotonic_ns() - start)
+        return result
+    return timed
+
+
+_TIMED = {0: _timed0, 1: _timed1, 2: _timed2, 3: _timed3, 6: _timed6}
+
+# Display methods timed by instrument_display, with their argument counts
+_DISPLAY_METHODS = (
+    ("refresh", 0),
+    ("animate", 1),
+    ("show_splash", 0),
+    ("show_menu", 1),
+    ("show_game_over", 0),
+    ("show_game_win", 0),
+    ("show_reaction_stats", 2),
+    ("show_best_runs", 3),
+    ("show_high_scores", 2),
+    ("show_level", 6),
+)
+
+
+class Profiler:
+    """
+    Owns the probes and installs timing wrappers on subsystem methods.
+
+    Parameters:
+    - dump_on_game_over: print the summary when the game reaches
+      GAME_OVER or GAME_WIN
+    """
+
+    def __init__(self, dump_on_game_over=True):
+        self.probes = []
+        self.i2c = None
+        self.bus = None
+        self.display = None
+        self.dump_on_game_over = dump_on_game_over
+
+        # Ring of recent transitions: time and old / new state ids
+        self._state_names = None
+        self._trace_times = [0] * _TRACE_SIZE
+        self._trace_old = bytearray(_TRACE_SIZE)
+        self._trace_new = bytearray(_TRACE_SIZE)
+        self._trace_count = 0
+
+    def probe(self, name):
+        """
+        Create and register a probe.
+        """
+        p = Probe(name)
+        self.probes.append(p)
+        return p
+
+    def wrap(self, obj, method_name, probe_name, nargs=0):
+        """
+        Replace obj.method_name, which takes nargs positional arguments,
+        with a timed wrapper.
+        Must be called before anything caches the bound method.
+        """
+        probe = self.probe(probe_name)
+        setattr(obj, method_name, _TIMED[nargs](getattr(obj, method_name), probe.record))
+
+    def count_i2c(self, i2c):
+        """
+        Return a counting wrapper for the shared bus.
+        """
+        self.i2c = CountingI2C(i2c)
+        return self.i2c
+
+    def instrument_inputs(self, inputs):
+        self.wrap(inputs, "update", "inputs.update")
+        self.wrap(inputs, "poll", "inputs.poll")
+
+    def instrument_display(self, display):
+        # Every show_* screen plus animation steps and frame commit
+        self.display = display
+        for name, nargs in _DISPLAY_METHODS:
+            self.wrap(display, name, "display." + name, nargs)
+
+    def instrument_lights(self, lights):
+        self.wrap(lights, "update", "lights.update", 1)
+
+    def instrument_game(self, game):
+        """
+        Time Game.update separately for each state it was in when called,
+        and trace the game's state transitions.
+        """
+        self._state_names = STATE_NAMES
+        fn = game.update
+        by_state = [self.probe("game." + name) for name in STATE_NAMES]
+
+        def timed(dt):
+            probe = by_state[game.state]
+            start = time.monotonic_ns()
+            fn(dt)
+            probe.record(time.monotonic_ns() - start)
+
+        game.update = timed
+
+        def trace(old, new):
+            i = self._trace_count % _TRACE_SIZE
+            self._trace_times[i] = time.monotonic_ns()
+            self._trace_old[i] = old
+            self._trace_new[i] = new
+            self._trace_count += 1
+            if self.dump_on_game_over and (new == GAME_OVER or new == GAME_WIN):
+                self.dump()
+
+        game.add_listener(trace)
+
+    def check_gesture(self, inputs, state):
+        """
+        Dump the summary on a shake in the splash screen or the menu,
+        where no game state uses shakes. Call once per frame after
+        inputs.update().
+        """
+        if inputs.shake_detected and (state == SPLASH or state == MENU):
+            self.dump()
+
+    def dump(self):
+        """
+        Print a summary of every probe and the I2C counters over serial.
+        """
+        print("PROFILE: name count mean_us p50_us p95_us max_us")
+        for p in self.probes:
+            if not p.count:
+                continue
+            print(
+                "PROFILE:", p.name, p.count,
+                p.total_us // p.count,
+                p.percentile_us(50),
+                p.percentile_us(95),
+                p.max_us,
+            )
+
+        if self.display is not None:
+            print(
+                "PROFILE: display refreshes =", self.display.refresh_count,
+                "bytes ~", self.display.bytes_sent,
+                "full-frame bytes ~", self.display.bytes_full_frame,
+            )
+
+        if self.i2c is not None:
+            for address, counter in self.i2c.counters.items():
+                print(
+                    "PROFILE: i2c 0x%02x txns = %d wrote = %d read = %d"
+                    % (address, counter[0], counter[1], counter[2])
+                )
+
+        if self.bus is not None:
+            self.bus.report()
+
+        self._dump_trace()
+
+    def _dump_trace(self):
+        """
+        Print the recent transitions with the time spent in each state.
+        """
+        count = self._trace_count
+        if not count:
+            return
+        names = self._state_names
+        first = max(0, count - _TRACE_SIZE)
+        prev = None
+        for n in range(first, count):
+            i = n % _TRACE_SIZE
+            t = self._trace_times[i]
+            line = "PROFILE: transition %s -> %s" % (
+                names[self._trace_old[i]], names[self._trace_new[i]]
+            )
+            if prev is not None:
+                line += " after %d ms" % ((t - prev) // 1000000)
+            print(line)
+            prev = t
+
+    def reset(self):
+        for p in self.probes:
+            p.reset()
+        self._trace_count = 0
+        if self.i2c is not None:
+            self.i2c.reset()
+        if self.bus is not None:
+            self.bus.reset()
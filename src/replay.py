@@ -0,0 +1,343 @@
+# Session recording and replay.
+#
+# A recording holds everything needed to reproduce a session: the seed
+# given to `random` at boot and every input event with its capture time.
+# State transitions are recorded too, so a replay can check that the game
+# took exactly the same path.
+#
+# File layout (appended to, one session per boot):
+#     session header  0xFF "AGR" version:u8 seed:u32 game_rate_hz:u16
+#     record          kind:u8 delta_us:varint
+# kind < 0x10 is an input event (events.EVT_*), kind 0x10 + i is a
+# transition into state i (states.py). delta_us is the time since the previous
+# record in microseconds, zigzag-encoded (0, -1, 1, -2, ... as 0, 1, 2,
+# 3, ...) and stored as a LEB128 varint (7 bits per byte), so most records
+# take two or three bytes. Deltas are signed because FIFO shake events are
+# stamped with the sample that triggered them, which can be older than
+# the record before. Version 1 files, with unsigned deltas, still load.
+#
+# Records are buffered and appended to the file only when a screen that
+# waits for input is entered (menu, end screens, stats) and when the main
+# loop stops (App.stop), never while a move is being timed. The buffer
+# (config.RECORD_BUFFER) holds a whole game; if a game still overflows
+# it, later records are dropped and recording stops at the next waiting
+# screen, after writing what fitted. A session cut short by a power-off
+# or an overflow loses what was not written, but the file always ends on
+# a whole record; a replay compares transitions only up to the last
+# recorded time.
+#
+# Writing to flash from code needs the filesystem remounted writable in
+# boot.py (storage.remount("/", readonly=False)). If the file cannot be
+# written, recording is switched off and the game carries on.
+
+import os
+import time
+
+import log
+from states import MENU, GAME_OVER, GAME_WIN, STATS
+
+_MAGIC = b"\xffAGR"
+_VERSION = 2
+_HEADER_SIZE = 11
+
+# Record kinds at or above this value are state transitions
+_TRANSITION = 0x10
+
+# Transitions after which the buffer is written out: screens that wait
+# for input
+_FLUSH_STATES = (MENU, GAME_OVER, GAME_WIN, STATS)
+
+
+def new_seed():
+    """
+    Return a fresh 32-bit seed, from the hardware RNG when available.
+    """
+    try:
+        b = os.urandom(4)
+        return b[0] | (b[1] << 8) | (b[2] << 16) | (b[3] << 24)
+    except (AttributeError, NotImplementedError):
+        return time.monotonic_ns() & 0xFFFFFFFF
+
+
+class Recorder:
+    """
+    Buffers records in a preallocated bytearray and appends them to the
+    recording file when a waiting screen is entered or flush() is called
+    at the end of the session.
+
+    Parameters:
+    - path: recording file
+    - seed: seed given to random for this session
+    - rate: game tick rate in Hz (stored for replay)
+    - buffer_size: bytes buffered between flash writes (one game's worth)
+    - max_bytes: stop recording once the file would grow past this
+    """
+
+    def __init__(self, path, seed, rate, buffer_size=2048, max_bytes=65536):
+        self.path = path
+        self.seed = seed
+        self.max_bytes = max_bytes
+        self.enabled = True
+        self.bytes_written = 0
+        self.start_ns = 0
+        self._last_us = 0
+        self._buf = bytearray(max(buffer_size, _HEADER_SIZE + 6))
+        self._len = 0
+        # Set when a record did not fit; recording stops at the next flush
+        self._overflow = False
+
+        try:
+            self._file_size = os.stat(path)[6]
+        except OSError:
+            self._file_size = 0
+
+        buf = self._buf
+        buf[0:4] = _MAGIC
+        buf[4] = _VERSION
+        for i in range(4):
+            buf[5 + i] = (seed >> (8 * i)) & 0xFF
+        buf[9] = rate & 0xFF
+        buf[10] = (rate >> 8) & 0xFF
+        self._len = _HEADER_SIZE
+
+    def start(self, now_ns):
+        """
+        Set time zero of the session (the first game tick).
+        """
+        self.start_ns = now_ns
+        self._last_us = 0
+
+    def event(self, kind, t_ns):
+        if self.enabled:
+            self._put(kind, t_ns)
+
+    def transition(self, state, t_ns):
+        """
+        Record a transition into state (a state id); flush when the game
+        starts waiting for input.
+        """
+        if not self.enabled:
+            return
+        self._put(_TRANSITION + state, t_ns)
+        if state in _FLUSH_STATES:
+            self.flush()
+            if self._overflow:
+                # Records after the gap could not be placed in time
+                log.warn(log.RECORD_OVERFLOW)
+                self.enabled = False
+
+    def _put(self, kind, t_ns):
+        # A record is at most 1 + 5 bytes for deltas below 2^34 us.
+        # Writing to flash here would stall a running move, so a record
+        # that does not fit is dropped, and so is everything after it.
+        if self._overflow or self._len + 6 > len(self._buf):
+            self._overflow = True
+            return
+
+        t_us = (t_ns - self.start_ns) // 1000
+        # FIFO shake events can be stamped slightly in the past, so the
+        # delta is signed (zigzag) and every time is kept as judged
+        delta = t_us - self._last_us
+        self._last_us = t_us
+        delta = delta << 1 if delta >= 0 else ((-delta) << 1) - 1
+
+        buf = self._buf
+        n = self._len
+        buf[n] = kind
+        n += 1
+        while delta >= 0x80:
+            buf[n] = (delta & 0x7F) | 0x80
+            delta >>= 7
+            n += 1
+        buf[n] = delta
+        self._len = n + 1
+
+    def flush(self):
+        """
+        Append the buffered records to the recording file.
+        """
+        if not self._len or not self.enabled:
+            return
+        if self._file_size + self._len > self.max_bytes:
+            log.warn(log.RECORD_FULL)
+            self.enabled = False
+            return
+        try:
+            with open(self.path, "ab") as f:
+                f.write(memoryview(self._buf)[: self._len])
+        except OSError as e:
+            log.error(log.RECORD_WRITE_FAILED, e.errno or 0)
+            self.enabled = False
+            return
+        self._file_size += self._len
+        self.bytes_written += self._len
+        self._len = 0
+
+
+class Session:
+    """
+    One decoded recording.
+
+    Input events are kept in `kinds` and `times_us` (microseconds from
+    the session start); transitions in `states` (state ids) and
+    `state_times_us`.
+    """
+
+    def __init__(self, seed, rate):
+        self.seed = seed
+        self.rate = rate
+        self.kinds = bytearray()
+        self.times_us = []
+        self.states = bytearray()
+        self.state_times_us = []
+
+    @property
+    def duration_us(self):
+        """
+        Time of the last record, in microseconds from the session start.
+        """
+        # Events may be stored out of time order (back-dated shakes)
+        last = max(self.times_us) if self.times_us else 0
+        if self.state_times_us and self.state_times_us[-1] > last:
+            last = self.state_times_us[-1]
+        return last
+
+
+def parse_sessions(data):
+    """
+    Decode every session in the bytes of a recording file.
+    """
+    sessions = []
+    session = None
+    n = len(data)
+    i = 0
+    t_us = 0
+    signed = True
+    while i < n:
+        if data[i] == 0xFF and data[i:i + 4] == _MAGIC:
+            version = data[i + 4]
+            if version != _VERSION and version != 1:
+                raise ValueError("unsupported recording version")
+            signed = version != 1
+            seed = data[i + 5] | (data[i + 6] << 8) | (data[i + 7] << 16) | (data[i + 8] << 24)
+            session = Session(seed, data[i + 9] | (data[i + 10] << 8))
+            sessions.append(session)
+            i += _HEADER_SIZE
+            t_us = 0
+            continue
+        if session is None:
+            raise ValueError("recording does not start with a session header")
+
+        kind = data[i]
+        i += 1
+        delta = 0
+        shift = 0
+        while True:
+            b = data[i]
+            i += 1
+            delta |= (b & 0x7F) << shift
+            if b < 0x80:
+                break
+            shift += 7
+        if signed:
+            delta = (delta >> 1) ^ -(delta & 1)
+        t_us += delta
+
+        if kind >= _TRANSITION:
+            session.states.append(kind - _TRANSITION)
+            session.state_times_us.append(t_us)
+        else:
+            session.kinds.append(kind)
+            session.times_us.append(t_us)
+    return sessions
+
+
+def load_session(path, index=-1):
+    """
+    Read one session from a recording file (default: the latest).
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    return parse_sessions(data)[index]
+
+
+class ReplaySource:
+    """
+    Stands in for the encoder, button and accelerometer: hands recorded
+    events to an InputManager once their time has come, and checks the
+    game's transitions against the recorded ones.
+
+    Parameters:
+    - session: Session to replay
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self.start_ns = 0
+        self._next = 0
+        self._next_state = 0
+        self.mismatches = 0
+
+        # Time of the last record; the recording says nothing after it
+        self.end_ns = 0
+
+    def start(self, now_ns):
+        self.start_ns = now_ns
+        self._next = 0
+        self._next_state = 0
+        self.mismatches = 0
+        self.end_ns = now_ns + self.session.duration_us * 1000
+
+    def next_time_ns(self):
+        """
+        Time of the next recorded event, or None when all were replayed.
+        """
+        if self._next >= len(self.session.kinds):
+            return None
+        return self.start_ns + self.session.times_us[self._next] * 1000
+
+    def feed(self, inputs, now_ns):
+        """
+        Inject every recorded event due at or before now_ns.
+        """
+        kinds = self.session.kinds
+        times = self.session.times_us
+        i = self._next
+        start = self.start_ns
+        while i < len(kinds):
+            t_ns = start + times[i] * 1000
+            if t_ns > now_ns:
+                break
+            inputs.inject(kinds[i], t_ns)
+            i += 1
+        self._next = i
+
+    def check(self, state, t_ns):
+        """
+        Compare a transition into state (a state id) at t_ns with the
+        recording. Returns True if it matches. Transitions after the
+        recorded ones, from the last record's time on, are not compared:
+        the recording may just have been cut off there.
+        """
+        states = self.session.states
+        i = self._next_state
+        if i >= len(states) and t_ns >= self.end_ns:
+            return True
+        self._next_state = i + 1
+        if i < len(states) and states[i] == state:
+            return True
+        if not self.mismatches:
+            log.error(log.REPLAY_MISMATCH, i, state)
+        self.mismatches += 1
+        return False
+
+    @property
+    def done(self):
+        return self._next >= len(self.session.kinds)
+
+    @property
+    def matched(self):
+        """
+        True if every transition so far matched and all were reproduced.
+        """
+        return not self.mismatches and self._next_state == len(self.session.states)
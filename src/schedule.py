@@ -0,0 +1,190 @@
+# Level schedule and move sequences.
+#
+# Everything a level needs that only depends on difficulty and level
+# number is computed once at import from config.DIFFICULTIES and
+# config.MOVE_TIME_WEIGHTS, so starting a level is a table lookup:
+#
+#     SEQ_LEN[difficulty][level]                moves in the level
+#     MOVE_NS[difficulty][level * MOVE_COUNT + move]
+#                                               time allowed for that move
+#
+# Move sequences are drawn ahead of time into a spare buffer (Sequences)
+# while the game is idle, and swapped in when the level starts.
+# Adaptive scales per-move times from the player's reactions; it is
+# updated once per correct move and applied once per level.
+
+import random
+from array import array
+
+import config
+
+MOVE_COUNT = len(config.ALL_MOVES)
+
+# Index 0 is unused so tables can be indexed by the 1-based level
+SEQ_LEN = {}
+MOVE_NS = {}
+
+
+def _level_time(curve, level):
+    """
+    Seconds for a level from a level_time entry: a number, or
+    (level, seconds) points interpolated linearly.
+    """
+    if not isinstance(curve, (tuple, list)):
+        return curve
+    first_level, seconds = curve[0]
+    if level <= first_level:
+        return seconds
+    for next_level, next_seconds in curve[1:]:
+        if level <= next_level:
+            span = next_level - first_level
+            return seconds + (next_seconds - seconds) * (level - first_level) / span
+        first_level, seconds = next_level, next_seconds
+    return seconds
+
+
+def _build():
+    longest = 1
+    weights = config.MOVE_TIME_WEIGHTS
+    for name, params in config.DIFFICULTIES.items():
+        lengths = bytearray(config.TOTAL_LEVELS + 1)
+        times = [0] * ((config.TOTAL_LEVELS + 1) * MOVE_COUNT)
+        for level in range(1, config.TOTAL_LEVELS + 1):
+            # Each level adds one extra move on top of the base
+            # Level 1: base_moves
+            # Level 2: base_moves + 1
+            # Level 3: base_moves + 2
+            n = params["base_moves"] + (level - 1)
+            lengths[level] = n
+            # Per move time budget is the level time divided by the
+            # number of moves, weighted by how long each move takes
+            per_move = _level_time(params["level_time"], level) / n
+            for move in range(MOVE_COUNT):
+                times[level * MOVE_COUNT + move] = int(per_move * weights[move] * 1000000000)
+            if n > longest:
+                longest = n
+        SEQ_LEN[name] = lengths
+        MOVE_NS[name] = times
+    return longest
+
+
+# Longest sequence of any level
+MAX_SEQ_LEN = _build()
+
+# Adaptive scales and limits as fixed point (256 = 1.0)
+_SCALES_Q8 = array("H", [int(s * 256) for s in config.ADAPTIVE_SCALES])
+_FAST_Q8 = int(config.ADAPTIVE_FAST * 256)
+_SLOW_Q8 = int(config.ADAPTIVE_SLOW * 256)
+
+
+def _neutral_step():
+    best = 0
+    for i in range(len(_SCALES_Q8)):
+        if abs(_SCALES_Q8[i] - 256) < abs(_SCALES_Q8[best] - 256):
+            best = i
+    return best
+
+
+class Sequences:
+    """
+    Two move buffers of MAX_SEQ_LEN: the one being played and a spare
+    one that prepare() fills with random moves. advance() swaps them, so
+    a level can start without drawing any random numbers.
+
+    A level of n moves plays the first n entries of the buffer.
+    """
+
+    def __init__(self):
+        self.current = bytearray(MAX_SEQ_LEN)
+        self._spare = bytearray(MAX_SEQ_LEN)
+        self.ready = False
+
+    def prepare(self):
+        """
+        Fill the spare buffer if that has not been done yet. Meant for
+        frames in which the game is otherwise idle.
+        """
+        if self.ready:
+            return
+        buf = self._spare
+        moves = config.ALL_MOVES
+        for i in range(MAX_SEQ_LEN):
+            buf[i] = random.choice(moves)
+        self.ready = True
+
+    def advance(self):
+        """
+        Make the prepared buffer current (preparing it first if needed)
+        and return it.
+        """
+        if not self.ready:
+            self.prepare()
+        self.current, self._spare = self._spare, self.current
+        self.ready = False
+        return self.current
+
+
+class Adaptive:
+    """
+    Rolling mean of the player's reaction times, as a share of the time
+    each move allowed, and the per-move time scale chosen from it.
+
+    Parameters:
+    - window: number of recent reactions averaged
+    """
+
+    def __init__(self, window=8):
+        # Reaction shares in 1/256 of the allowed time
+        self._shares = bytearray(window)
+        self.reset()
+
+    def reset(self):
+        """
+        Forget the reactions seen so far and go back to the neutral scale.
+        """
+        self._next = 0
+        self._count = 0
+        self._sum = 0
+        self.step = _neutral_step()
+        self.scale_q8 = _SCALES_Q8[self.step]
+
+    def add(self, reaction_ns, allowed_ns):
+        """
+        Record the reaction to one correct move.
+        """
+        share = reaction_ns * 256 // allowed_ns
+        if share > 255:
+            share = 255
+        elif share < 0:
+            share = 0
+        i = self._next
+        if self._count == len(self._shares):
+            self._sum -= self._shares[i]
+        else:
+            self._count += 1
+        self._shares[i] = share
+        self._sum += share
+        self._next = (i + 1) % len(self._shares)
+
+    @property
+    def mean_q8(self):
+        return self._sum // self._count if self._count else 0
+
+    def adjust(self):
+        """
+        Move one scale step towards the player's pace once the window is
+        full. Returns the scale to use (256 = 1.0).
+        """
+        if self._count == len(self._shares):
+            mean = self._sum // self._count
+            step = self.step
+            if mean < _FAST_Q8 and step > 0:
+                step -= 1
+            elif mean > _SLOW_Q8 and step < len(_SCALES_Q8) - 1:
+                step += 1
+            if step != self.step:
+                # Judge the new pace on a fresh window
+                self.step = step
+                self.scale_q8 = _SCALES_Q8[step]
+                self._count = self._sum = self._next = 0
+        return self.scale_q8
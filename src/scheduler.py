@@ -0,0 +1,145 @@
+# Fixed-timestep cooperative scheduler for the main loop.
+#
+# Each subsystem is registered as a task with its own tick rate.
+# Deadlines are absolute, so the tick rate does not drift with the cost
+# of a frame, and the loop sleeps only until the next deadline.
+# On-demand tasks (rate 0) run only after request() has been called.
+
+import time
+
+
+class Task:
+    """
+    One scheduled subsystem.
+
+    Parameters:
+    - name: label used in reports
+    - callback: function called as callback(dt) with dt in seconds
+    - rate: ticks per second, or 0 for an on-demand task
+    - max_catchup: most ticks run back to back after falling behind
+    """
+
+    def __init__(self, name, callback, rate, max_catchup=1):
+        self.name = name
+        self.callback = callback
+        self.period_ns = 1000000000 // rate if rate else 0
+        self.dt = self.period_ns / 1000000000
+        self.max_catchup = max_catchup
+        self.next_due = 0
+        self.pending = False
+
+        # Statistics
+        self.ticks = 0
+        self.overruns = 0   # Times the task fell more than one period behind
+        self.dropped = 0    # Ticks skipped because the catch-up limit was hit
+
+    def request(self):
+        """
+        Ask an on-demand task to run on the next scheduler pass.
+        """
+        self.pending = True
+
+    def set_rate(self, rate):
+        """
+        Change the rate of a periodic task. The next tick is due at once,
+        so a faster rate takes effect on the next scheduler pass.
+        """
+        self.period_ns = 1000000000 // rate
+        self.dt = self.period_ns / 1000000000
+        self.next_due = time.monotonic_ns()
+
+
+class Scheduler:
+    """
+    Runs tasks at their own fixed rates with deadline-based sleeping.
+    """
+
+    def __init__(self):
+        self.tasks = []
+        # Time spent sleeping between deadlines, for power estimates
+        self.slept_ns = 0
+
+    def add(self, name, callback, rate, max_catchup=1):
+        """
+        Register a task and return it. Tasks run in registration order
+        when several are due in the same pass.
+        """
+        task = Task(name, callback, rate, max_catchup)
+        task.next_due = time.monotonic_ns()
+        self.tasks.append(task)
+        return task
+
+    def run_once(self):
+        """
+        Run every due task once (or several times to catch up) and return
+        the absolute time of the next periodic deadline in nanoseconds.
+        """
+        next_due = None
+        for task in self.tasks:
+            period = task.period_ns
+
+            if not period:
+                # On-demand task
+                if task.pending:
+                    task.pending = False
+                    task.callback(0.0)
+                    task.ticks += 1
+                continue
+
+            now = time.monotonic_ns()
+            if now >= task.next_due:
+                behind = (now - task.next_due) // period
+                if behind:
+                    task.overruns += 1
+
+                runs = behind + 1
+                if runs > task.max_catchup:
+                    # Too far behind: run the allowed ticks and resync
+                    task.dropped += runs - task.max_catchup
+                    runs = task.max_catchup
+                    task.next_due = now + period
+                else:
+                    task.next_due += runs * period
+
+                for _ in range(runs):
+                    task.callback(task.dt)
+                task.ticks += runs
+
+            if next_due is None or task.next_due < next_due:
+                next_due = task.next_due
+
+        return next_due
+
+    def run_forever(self, report_interval=0):
+        """
+        Main loop: run due tasks, then sleep until the next deadline.
+
+        Parameters:
+        - report_interval: seconds between overrun reports, 0 to disable
+        """
+        report_ns = int(report_interval * 1000000000)
+        next_report = time.monotonic_ns() + report_ns
+
+        while True:
+            next_due = self.run_once()
+            now = time.monotonic_ns()
+
+            if report_ns and now >= next_report:
+                self.report()
+                next_report = now + report_ns
+
+            if next_due is not None and next_due > now:
+                self.slept_ns += next_due - now
+                time.sleep((next_due - now) / 1000000000)
+
+    def report(self):
+        """
+        Print tick, overrun and dropped-tick counts for every task.
+        """
+        for task in self.tasks:
+            print(
+                "SCHED:", task.name,
+                "ticks =", task.ticks,
+                "overruns =", task.overruns,
+                "dropped =", task.dropped,
+            )
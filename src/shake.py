@@ -0,0 +1,351 @@
+# ADXL345 FIFO access, streaming shake detection and hardware activity
+# detection.
+#
+# In FIFO mode the accelerometer samples at a fixed output data rate and
+# buffers up to 32 samples on the chip. Each frame the game drains the
+# buffer under one bus lock and runs every sample through
+# ShakeDetector, so short shakes between frames are no longer missed.
+# All detector math is done on raw integer counts (no sqrt, no floats).
+#
+# In activity mode the chip itself compares every sample against a
+# threshold and latches an interrupt flag, so each frame only needs a
+# one-byte INT_SOURCE read, or no bus traffic at all if the INT1 pin is
+# wired and stays low.
+#
+# AccelPower switches the chip to its low-power sampling mode or to
+# standby while the game is idle (see power.py).
+
+# ADXL345 registers
+_REG_THRESH_ACT = 0x24
+_REG_ACT_INACT_CTL = 0x27
+_REG_BW_RATE = 0x2C
+_REG_POWER_CTL = 0x2D
+_REG_INT_ENABLE = 0x2E
+_REG_INT_MAP = 0x2F
+_REG_INT_SOURCE = 0x30
+_REG_DATA_FORMAT = 0x31
+_REG_DATAX0 = 0x32
+_REG_FIFO_CTL = 0x38
+_REG_FIFO_STATUS = 0x39
+
+_FIFO_MODE_BYPASS = 0x00
+_FIFO_MODE_STREAM = 0x80
+
+# POWER_CTL measure bit (clear = standby), BW_RATE low-power bit and the
+# rate used with it (12.5 Hz, about 35 uA instead of 140 uA)
+_POWER_MEASURE = 0x08
+_BW_LOW_POWER = 0x10
+_RATE_12_5_HZ = 0x07
+
+# AccelPower modes
+ACCEL_ON = 0
+ACCEL_LOW = 1
+ACCEL_STANDBY = 2
+
+# AC-coupled activity on X, Y and Z: each axis is compared with the
+# reference taken when detection started, so gravity does not count
+_ACT_AC_XYZ = 0xF0
+_INT_ACTIVITY = 0x10
+
+# THRESH_ACT scale
+_ACT_MG_PER_LSB = 62.5
+
+# Full resolution, +/-4 g: keeps the 3.9 mg/LSB scale the Adafruit
+# driver assumes while clipping less during hard shakes
+_DATA_FORMAT_FULL_RES_4G = 0x09
+
+# Output data rate (Hz) -> BW_RATE register code
+_RATE_CODES = {
+    25: 0x08,
+    50: 0x09,
+    100: 0x0A,
+    200: 0x0B,
+    400: 0x0C,
+}
+
+# Nominal counts per g in full resolution mode
+LSB_PER_G = 256
+STANDARD_GRAVITY = 9.80665
+
+
+def delta_to_mag_sq(delta):
+    """
+    Convert a magnitude change in m/s^2 (the unit of SHAKE_DELTA_THRESHOLD)
+    into the equivalent change of squared magnitude in raw counts.
+
+    Around rest the magnitude is close to 1 g, so
+    |m1^2 - m0^2| = |m1 - m0| * (m1 + m0) ~= delta * 2 g.
+    """
+    delta_lsb = delta * LSB_PER_G / STANDARD_GRAVITY
+    return int(2 * LSB_PER_G * delta_lsb)
+
+
+def delta_to_act_threshold(delta):
+    """
+    Convert a magnitude change in m/s^2 into a THRESH_ACT register value
+    (62.5 mg per count, at least 1).
+    """
+    counts = round(delta / STANDARD_GRAVITY * 1000 / _ACT_MG_PER_LSB)
+    return max(1, min(255, counts))
+
+
+class ShakeDetector:
+    """
+    Streaming shake detector over raw accelerometer samples.
+
+    Each sample's squared magnitude is compared with the mean of the
+    previous `window` samples (a small moving-average high-pass filter),
+    which removes gravity and slow tilt. A shake is reported once
+    `min_hits` filtered values lie between the threshold and the spike
+    limit without a gap longer than the window, so a single desk tap does
+    not count. Detection is then suppressed for `cooldown` samples.
+
+    Parameters:
+    - threshold: minimum filtered squared magnitude (raw counts^2)
+    - max_delta: larger values are discarded as sensor glitches
+    - cooldown: samples to ignore after a detection
+    - window: moving-average length, must be a power of two
+    - min_hits: over-threshold samples needed to report a shake
+    """
+
+    def __init__(self, threshold, max_delta, cooldown, window=8, min_hits=3):
+        self.threshold = threshold
+        self.max_delta = max_delta
+        self.cooldown = cooldown
+        self.min_hits = min_hits
+
+        self._window = window
+        self._mask = window - 1
+        self._shift = 0
+        while (1 << self._shift) < window:
+            self._shift += 1
+        self._ring = [0] * window
+        self._sum = 0
+        self._pos = 0
+        self._primed = False
+        self._hold = 0  # Remaining cooldown samples
+        self._hits = 0  # Over-threshold samples in the current burst
+        self._gap = 0   # Samples since the last over-threshold one
+
+    def feed(self, x, y, z):
+        """
+        Process one sample in raw counts. Returns True if it completes a shake.
+        """
+        mag_sq = x * x + y * y + z * z
+
+        # Fill the window with the first sample so start-up is not a "shake"
+        if not self._primed:
+            for i in range(self._window):
+                self._ring[i] = mag_sq
+            self._sum = mag_sq * self._window
+            self._primed = True
+
+        # High-pass: distance from the recent moving average
+        delta = mag_sq - (self._sum >> self._shift)
+        if delta < 0:
+            delta = -delta
+
+        pos = self._pos
+        self._sum += mag_sq - self._ring[pos]
+        self._ring[pos] = mag_sq
+        self._pos = (pos + 1) & self._mask
+
+        if self._hold:
+            self._hold -= 1
+            return False
+
+        if self.threshold <= delta <= self.max_delta:
+            self._hits += 1
+            self._gap = 0
+            if self._hits >= self.min_hits:
+                self._hits = 0
+                self._hold = self.cooldown
+                return True
+        else:
+            self._gap += 1
+            if self._gap > self._window:
+                self._hits = 0
+        return False
+
+
+class AccelFifo:
+    """
+    Runs the ADXL345 in FIFO stream mode and drains it under one bus lock.
+
+    The chip only advances its FIFO after a 6-byte data read, so draining
+    means one status read plus one short read per buffered sample, all
+    done under a single bus lock.
+
+    Parameters:
+    - i2c: shared I2C bus
+    - rate: output data rate in Hz (25, 50, 100, 200 or 400)
+    - address: ADXL345 I2C address
+    """
+
+    def __init__(self, i2c, rate=100, address=0x53):
+        from adafruit_bus_device.i2c_device import I2CDevice
+
+        self.rate = rate
+        self.sample_period_ns = 1000000000 // rate
+        self._device = I2CDevice(i2c, address)
+
+        # Preallocated transfer buffers
+        self._cmd = bytearray(2)
+        self._status = bytearray(1)
+        self._data = bytearray(6)
+
+        self._write_register(_REG_DATA_FORMAT, _DATA_FORMAT_FULL_RES_4G)
+        self._write_register(_REG_BW_RATE, _RATE_CODES[rate])
+        self._write_register(_REG_FIFO_CTL, _FIFO_MODE_STREAM)
+
+    def _write_register(self, reg, value):
+        self._cmd[0] = reg
+        self._cmd[1] = value
+        with self._device as dev:
+            dev.write(self._cmd)
+
+    def drain(self, detector):
+        """
+        Feed every buffered sample to the detector.
+
+        Returns how many samples before the newest one the first shake
+        was detected (0 = newest sample), or -1 if there was no shake.
+        Raises OSError if the bus transfer fails.
+        """
+        cmd = self._cmd
+        data = self._data
+        found = -1
+
+        with self._device as dev:
+            cmd[0] = _REG_FIFO_STATUS
+            dev.write_then_readinto(cmd, self._status, out_end=1)
+            count = self._status[0] & 0x3F
+
+            cmd[0] = _REG_DATAX0
+            for i in range(count):
+                dev.write_then_readinto(cmd, data, out_end=1)
+
+                # Little-endian signed 16-bit counts
+                x = data[0] | (data[1] << 8)
+                y = data[2] | (data[3] << 8)
+                z = data[4] | (data[5] << 8)
+                if x & 0x8000:
+                    x -= 0x10000
+                if y & 0x8000:
+                    y -= 0x10000
+                if z & 0x8000:
+                    z -= 0x10000
+
+                if detector.feed(x, y, z) and found < 0:
+                    found = count - 1 - i
+
+        return found
+
+    def clear(self):
+        """
+        Drop the buffered samples, e.g. ones taken in low-power mode.
+        """
+        self._write_register(_REG_FIFO_CTL, _FIFO_MODE_BYPASS)
+        self._write_register(_REG_FIFO_CTL, _FIFO_MODE_STREAM)
+
+
+class AccelActivity:
+    """
+    Uses the ADXL345 activity interrupt as a hardware shake detector.
+
+    Parameters:
+    - i2c: shared I2C bus
+    - threshold: THRESH_ACT value (see delta_to_act_threshold)
+    - int_pin: optional board pin wired to the ADXL345 INT1 output
+    - address: ADXL345 I2C address
+    """
+
+    def __init__(self, i2c, threshold, int_pin=None, address=0x53):
+        from adafruit_bus_device.i2c_device import I2CDevice
+
+        self._device = I2CDevice(i2c, address)
+        self._cmd = bytearray(2)
+        self._source = bytearray(1)
+
+        self._write_register(_REG_INT_ENABLE, 0)
+        self._write_register(_REG_THRESH_ACT, threshold)
+        self._write_register(_REG_ACT_INACT_CTL, _ACT_AC_XYZ)
+        self._write_register(_REG_INT_MAP, 0)  # All interrupts on INT1
+        self._write_register(_REG_INT_ENABLE, _INT_ACTIVITY)
+
+        # INT1 is active high; while it stays low there is nothing to read
+        self._int_pin = None
+        if int_pin is not None:
+            import digitalio
+
+            self._int_pin = digitalio.DigitalInOut(int_pin)
+            self._int_pin.switch_to_input()
+
+        # Clear anything latched during configuration
+        self.poll()
+
+    def _write_register(self, reg, value):
+        self._cmd[0] = reg
+        self._cmd[1] = value
+        with self._device as dev:
+            dev.write(self._cmd)
+
+    def poll(self):
+        """
+        Return True if activity was latched since the previous poll.
+        Reading INT_SOURCE clears the latch.
+        Raises OSError if the bus transfer fails.
+        """
+        if self._int_pin is not None and not self._int_pin.value:
+            return False
+
+        self._cmd[0] = _REG_INT_SOURCE
+        with self._device as dev:
+            dev.write_then_readinto(self._cmd, self._source, out_end=1)
+        return bool(self._source[0] & _INT_ACTIVITY)
+
+
+class AccelPower:
+    """
+    Switches the ADXL345 between normal measurement, low-power sampling
+    at 12.5 Hz and standby. The output data rate in use when this is
+    created is restored by ACCEL_ON.
+
+    Parameters:
+    - i2c: shared I2C bus
+    - address: ADXL345 I2C address
+    """
+
+    def __init__(self, i2c, address=0x53):
+        from adafruit_bus_device.i2c_device import I2CDevice
+
+        self._device = I2CDevice(i2c, address)
+        self._cmd = bytearray(2)
+        self._value = bytearray(1)
+
+        self._cmd[0] = _REG_BW_RATE
+        with self._device as dev:
+            dev.write_then_readinto(self._cmd, self._value, out_end=1)
+        self._rate = self._value[0] & 0x0F
+        self.mode = ACCEL_ON
+
+    def _write_register(self, reg, value):
+        self._cmd[0] = reg
+        self._cmd[1] = value
+        with self._device as dev:
+            dev.write(self._cmd)
+
+    def set(self, mode):
+        """
+        Switch to ACCEL_ON, ACCEL_LOW or ACCEL_STANDBY.
+        Raises OSError if the bus transfer fails.
+        """
+        if mode == ACCEL_STANDBY:
+            self._write_register(_REG_POWER_CTL, 0)
+        elif mode == ACCEL_LOW:
+            self._write_register(_REG_BW_RATE, _BW_LOW_POWER | _RATE_12_5_HZ)
+            self._write_register(_REG_POWER_CTL, _POWER_MEASURE)
+        else:
+            self._write_register(_REG_BW_RATE, self._rate)
+            self._write_register(_REG_POWER_CTL, _POWER_MEASURE)
+        self.mode = mode
@@ -0,0 +1,106 @@
+# Staged start-up and boot timeline.
+#
+# app.App brings up the OLED and puts the splash on it before importing
+# anything else, then builds the inputs (encoder and button only) and
+# the game. Hardware the splash screen does not need (the accelerometer,
+# the NeoPixels) and the stats store are set up afterwards by an
+# on-demand scheduler task, one stage per scheduler pass (a task of its
+# own in code_async.py), while the splash already animates and reacts
+# to the button.
+#
+# The timeline keeps the milliseconds from the start of the entry point
+# (code.py or code_async.py) to each milestone and prints them once the
+# last stage has run when config.BOOT_TRACE is set:
+#
+#     BOOT: first frame        212 ms
+#     BOOT: interactive        498 ms
+#     BOOT: accelerometer      523 ms
+#     ...
+
+import time
+
+
+class Timeline:
+    """
+    Named milestones in milliseconds since start_ns.
+
+    Parameters:
+    - start_ns: time zero, from time.monotonic_ns()
+    """
+
+    def __init__(self, start_ns):
+        self.start_ns = start_ns
+        self.names = []
+        self.times_ms = []
+
+    def mark(self, name):
+        """
+        Record that a milestone was reached now. Returns its time in ms.
+        """
+        ms = (time.monotonic_ns() - self.start_ns) // 1000000
+        self.names.append(name)
+        self.times_ms.append(ms)
+        return ms
+
+    def get(self, name):
+        """
+        Time of a milestone in ms, or None if it was not reached.
+        """
+        if name in self.names:
+            return self.times_ms[self.names.index(name)]
+        return None
+
+    def report(self):
+        for name, ms in zip(self.names, self.times_ms):
+            print("BOOT: %-16s %5d ms" % (name, ms))
+
+
+class Stages:
+    """
+    Start-up work deferred until the game loop runs. Register run() as
+    an on-demand scheduler task with start(); each run executes the next
+    stage, marks it on the timeline and requests the task again until
+    none are left. Without a task (asyncio), call run() until done.
+
+    Parameters:
+    - timeline: Timeline the stages are marked on
+    - trace: print the timeline after the last stage
+    """
+
+    def __init__(self, timeline, trace=False):
+        self.timeline = timeline
+        self.trace = trace
+        self.task = None
+        self._stages = []
+
+    def add(self, name, fn):
+        """
+        Queue fn() to run as the stage called name.
+        """
+        self._stages.append((name, fn))
+
+    @property
+    def done(self):
+        return not self._stages
+
+    def start(self, task):
+        """
+        Attach the scheduler task and ask for the first stage.
+        """
+        self.task = task
+        if self._stages:
+            task.request()
+        elif self.trace:
+            self.timeline.report()
+
+    def run(self, dt):
+        if not self._stages:
+            return
+        name, fn = self._stages.pop(0)
+        fn()
+        self.timeline.mark(name)
+        if self._stages:
+            if self.task is not None:
+                self.task.request()
+        elif self.trace:
+            self.timeline.report()
@@ -0,0 +1,19 @@
+# Game state ids and names.
+#
+# The ids index the handler tables in game_engine.Game, are stored in
+# session recordings (replay.py) and are shown as names in log records.
+# They live in their own module so log.py and replay.py can use them
+# without importing the game engine. To add a state, give it the next
+# id and a name here and register its handlers in Game.__init__.
+
+SPLASH = 0
+MENU = 1
+LEVEL_START = 2
+WAIT_INPUT = 3
+GAME_OVER = 4
+GAME_WIN = 5
+STATS = 6
+
+STATE_NAMES = (
+    "SPLASH", "MENU", "LEVEL_START", "WAIT_INPUT", "GAME_OVER", "GAME_WIN", "STATS",
+)
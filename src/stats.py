@@ -0,0 +1,429 @@
+# Reaction-time stats and their store in non-volatile memory.
+#
+# During a game the reaction to every correct move (time from the move
+# being shown to the input completing it) goes into preallocated arrays.
+# When the game has ended, the next idle frame (end screen or menu) turns
+# them into a fixed-size summary record: per-move median and 90th
+# percentile, level reached and number of correct moves. Nothing is
+# computed or written while the player is in WAIT_INPUT.
+#
+# Records are appended to a circular region of slots, either
+# microcontroller.nvm or a file:
+#
+#     record  magic:u8 seq:u32 difficulty:u8 level:u8 moves:u16
+#             p50_ms:u16 * MOVE_COUNT  p90_ms:u16 * MOVE_COUNT  check:u8
+#
+# Game number seq goes into slot seq % slots, so writes walk through the
+# whole region instead of rewriting the same bytes, and a record is never
+# modified once written.
+#
+# The ring forgets games once it wraps, so the all-time best run per
+# difficulty and the high-score table are kept in a small block after
+# the slots, written only when a game changes them:
+#
+#     records magic:u8 upto:u32
+#             (level:u8 moves:u16) * difficulties
+#             (moves:u16 level:u8 difficulty:u8) * high_scores  check:u8
+#
+# upto is the last game it includes. The block has two copies, written
+# in turn, so a power cut during a write leaves the other one; at boot
+# the valid copy with the higher upto is used, and ring records of later
+# games are folded on top of it.
+
+from array import array
+
+import config
+import log
+
+MOVE_COUNT = len(config.ALL_MOVES)
+
+_MAGIC = 0xA7
+_P50 = 9
+_P90 = _P50 + 2 * MOVE_COUNT
+RECORD_SIZE = _P90 + 2 * MOVE_COUNT + 1
+
+_RECORDS_MAGIC = 0xA8
+# Difficulty of an unused high-score entry
+_NO_SCORE = 0xFF
+
+
+def records_size(high_scores):
+    """
+    Bytes of one copy of the all-time records block.
+    """
+    return 5 + 3 * len(config.DIFFICULTIES) + 4 * high_scores + 1
+
+
+def region_size(slots, high_scores):
+    """
+    Bytes used by `slots` records and both copies of the records block.
+    """
+    return slots * RECORD_SIZE + 2 * records_size(high_scores)
+
+
+class NvmRegion:
+    """
+    Part of microcontroller.nvm. Every write is one slice assignment.
+
+    Parameters:
+    - nvm: microcontroller.nvm
+    - offset: first byte used
+    - size: bytes used
+    """
+
+    def __init__(self, nvm, offset, size):
+        self._nvm = nvm
+        self.offset = offset
+        self.size = size
+
+    def read(self):
+        return bytes(self._nvm[self.offset:self.offset + self.size])
+
+    def write(self, pos, data):
+        start = self.offset + pos
+        self._nvm[start:start + len(data)] = data
+
+
+class FileRegion:
+    """
+    Fixed-size file, grown by appending and then overwritten in place.
+    Writing needs the filesystem remounted writable in boot.py.
+
+    Parameters:
+    - path: file
+    - size: bytes used
+    """
+
+    def __init__(self, path, size):
+        self.path = path
+        self.size = size
+
+    def read(self):
+        try:
+            with open(self.path, "rb") as f:
+                return f.read(self.size)
+        except OSError:
+            return b""
+
+    def write(self, pos, data):
+        try:
+            f = open(self.path, "r+b")
+        except OSError:
+            f = open(self.path, "wb")
+        with f:
+            f.seek(pos)
+            f.write(data)
+
+
+def open_region(path, nvm_offset, slots, high_scores=4):
+    """
+    Region for `slots` records and the records block: the file at path,
+    or microcontroller.nvm from nvm_offset when path is None (with fewer
+    slots if the NVM is too small). Returns None if there is no NVM.
+    """
+    if path is not None:
+        return FileRegion(path, region_size(slots, high_scores))
+    try:
+        from microcontroller import nvm
+    except ImportError:
+        nvm = None
+    if nvm is not None:
+        fit = (len(nvm) - nvm_offset - 2 * records_size(high_scores)) // RECORD_SIZE
+        slots = min(slots, fit)
+    if nvm is None or slots < 1:
+        log.warn(log.STATS_NO_STORE)
+        return None
+    return NvmRegion(nvm, nvm_offset, region_size(slots, high_scores))
+
+
+def _check(buf, start, size=RECORD_SIZE):
+    total = 0
+    for i in range(start, start + size - 1):
+        total += buf[i]
+    return (total & 0xFF) ^ 0xFF
+
+
+def _u16(buf, i):
+    return buf[i] | (buf[i + 1] << 8)
+
+
+def _u32(buf, i):
+    return buf[i] | (buf[i + 1] << 8) | (buf[i + 2] << 16) | (buf[i + 3] << 24)
+
+
+def _put_u16(buf, i, value):
+    buf[i] = value & 0xFF
+    buf[i + 1] = value >> 8
+
+
+def _percentile(samples, pct):
+    """
+    Nearest-rank percentile of a sorted list (0 when empty).
+    """
+    if not samples:
+        return 0
+    return samples[(len(samples) * pct + 99) // 100 - 1]
+
+
+class Stats:
+    """
+    Reaction times of the current game and the stats kept in a region.
+
+    Parameters:
+    - region: NvmRegion or FileRegion of region_size(slots, high_scores)
+    - capacity: reactions kept per game (later ones are counted only)
+    - batch: finished games queued before they are written together
+    - high_scores: length of the high-score table
+
+    Viewer data, as of the last finished game:
+    - last_p50, last_p90: per-move percentiles in ms (0 = no sample)
+    - best_levels, best_moves: all-time best run per difficulty index
+    - scores: all-time high scores as (moves, level, difficulty index),
+      best first
+    - games: number of games in the ring
+    """
+
+    def __init__(self, region, capacity=256, batch=1, high_scores=4):
+        self.region = region
+        self._records = bytearray(records_size(high_scores))
+        self.slots = (region.size - 2 * len(self._records)) // RECORD_SIZE
+        self.enabled = self.slots > 0
+
+        # Current game: reaction ms and move id of each correct move
+        self._ms = array("H", [0] * capacity)
+        self._moves = bytearray(capacity)
+        self._count = 0
+        self.moves = 0
+
+        # Game that ended and is not summarised yet: (difficulty, level)
+        self._ended = None
+
+        # Records waiting to be written
+        self._pending = bytearray(max(1, batch) * RECORD_SIZE)
+        self._queued = 0
+        self._next_seq = 0
+
+        self.last_p50 = array("H", [0] * MOVE_COUNT)
+        self.last_p90 = array("H", [0] * MOVE_COUNT)
+        count = len(config.DIFFICULTIES)
+        self.best_levels = bytearray(count)
+        self.best_moves = array("H", [0] * count)
+        self.scores = []
+        self._max_scores = high_scores
+        self.games = 0
+
+        # All-time records block: copy written next, and whether a game
+        # changed the records since the last write
+        self._records_copy = 0
+        self._records_dirty = False
+
+        if self.enabled:
+            self._load()
+
+    def _load(self):
+        data = self.region.read()
+
+        size = len(self._records)
+        at = self.slots * RECORD_SIZE
+        upto = -1
+        for copy in range(2):
+            start = at + copy * size
+            if (len(data) < start + size or data[start] != _RECORDS_MAGIC
+                    or data[start + size - 1] != _check(data, start, size)):
+                continue
+            seq = _u32(data, start + 1)
+            if seq > upto:
+                upto = seq
+                self._load_records(data, start)
+                self._records_copy = copy ^ 1
+
+        found = []
+        for slot in range(self.slots):
+            start = slot * RECORD_SIZE
+            if (len(data) < start + RECORD_SIZE or data[start] != _MAGIC
+                    or data[start + RECORD_SIZE - 1] != _check(data, start)):
+                continue
+            found.append((_u32(data, start + 1), start))
+        found.sort()
+        # Games up to `upto` are already in the records block
+        for seq, start in found:
+            self._fold(data, start, seq > upto)
+        self._next_seq = upto + 1
+        if found and found[-1][0] >= self._next_seq:
+            self._next_seq = found[-1][0] + 1
+
+    def _load_records(self, buf, start):
+        pos = start + 5
+        for difficulty in range(len(self.best_levels)):
+            self.best_levels[difficulty] = buf[pos]
+            self.best_moves[difficulty] = _u16(buf, pos + 1)
+            pos += 3
+        scores = []
+        for i in range(self._max_scores):
+            if buf[pos + 3] != _NO_SCORE:
+                scores.append((_u16(buf, pos), buf[pos + 2], buf[pos + 3]))
+            pos += 4
+        self.scores = scores
+
+    def _fold(self, buf, start, records=True):
+        """
+        Add one record to the viewer data; with records False, only to
+        the last game's percentiles and the game count.
+        """
+        for move in range(MOVE_COUNT):
+            self.last_p50[move] = _u16(buf, start + _P50 + 2 * move)
+            self.last_p90[move] = _u16(buf, start + _P90 + 2 * move)
+        self.games += 1
+        if not records:
+            return
+
+        difficulty = buf[start + 5]
+        level = buf[start + 6]
+        moves = _u16(buf, start + 7)
+        if difficulty < len(self.best_levels):
+            if (level, moves) > (self.best_levels[difficulty], self.best_moves[difficulty]):
+                self.best_levels[difficulty] = level
+                self.best_moves[difficulty] = moves
+                self._records_dirty = True
+        scores = self.scores
+        if len(scores) < self._max_scores or (moves, level, difficulty) > scores[-1]:
+            scores.append((moves, level, difficulty))
+            scores.sort(reverse=True)
+            del scores[self._max_scores:]
+            self._records_dirty = True
+
+    def _write_records(self):
+        """
+        Write the all-time records over the older copy of the block.
+        """
+        buf = self._records
+        upto = self._next_seq - 1
+        buf[0] = _RECORDS_MAGIC
+        for i in range(4):
+            buf[1 + i] = (upto >> (8 * i)) & 0xFF
+        pos = 5
+        for difficulty in range(len(self.best_levels)):
+            buf[pos] = self.best_levels[difficulty]
+            _put_u16(buf, pos + 1, self.best_moves[difficulty])
+            pos += 3
+        scores = self.scores
+        for i in range(self._max_scores):
+            if i < len(scores):
+                moves, level, difficulty = scores[i]
+            else:
+                moves, level, difficulty = 0, 0, _NO_SCORE
+            _put_u16(buf, pos, moves)
+            buf[pos + 2] = level
+            buf[pos + 3] = difficulty
+            pos += 4
+        buf[pos] = _check(buf, 0, len(buf))
+
+        copy = self._records_copy
+        self.region.write(self.slots * RECORD_SIZE + copy * len(buf), buf)
+        self._records_copy = copy ^ 1
+        self._records_dirty = False
+
+    # --------------- During a game ---------------
+
+    def start(self):
+        """
+        Forget the previous game's reactions (summarising it first if
+        that has not happened yet).
+        """
+        self.idle()
+        self._count = 0
+        self.moves = 0
+
+    def add(self, move, reaction_ns):
+        """
+        Record the reaction to one correct move. Does not allocate.
+        """
+        self.moves += 1
+        i = self._count
+        if i == len(self._ms):
+            return
+        ms = reaction_ns // 1000000
+        if ms > 0xFFFF:
+            ms = 0xFFFF
+        elif ms < 0:
+            ms = 0
+        self._ms[i] = ms
+        self._moves[i] = move
+        self._count = i + 1
+
+    def end(self, difficulty, level):
+        """
+        Mark the game as finished. The summary is built and stored by the
+        next idle() call.
+
+        Parameters:
+        - difficulty: difficulty index
+        - level: level the game ended on (TOTAL_LEVELS + 1 after a win)
+        """
+        self._ended = (difficulty, level)
+
+    # --------------- Between games ---------------
+
+    def idle(self):
+        """
+        Summarise a finished game and write queued records once the batch
+        is full. Call from frames in which the game is idle; returns at
+        once when there is nothing to do.
+        """
+        if self._ended is None or not self.enabled:
+            return
+        difficulty, level = self._ended
+        self._ended = None
+
+        buf = self._pending
+        start = self._queued * RECORD_SIZE
+        seq = self._next_seq
+        self._next_seq = seq + 1
+        buf[start] = _MAGIC
+        for i in range(4):
+            buf[start + 1 + i] = (seq >> (8 * i)) & 0xFF
+        buf[start + 5] = difficulty
+        buf[start + 6] = level
+        _put_u16(buf, start + 7, min(self.moves, 0xFFFF))
+        for move in range(MOVE_COUNT):
+            samples = sorted(
+                self._ms[i] for i in range(self._count) if self._moves[i] == move
+            )
+            _put_u16(buf, start + _P50 + 2 * move, _percentile(samples, 50))
+            _put_u16(buf, start + _P90 + 2 * move, _percentile(samples, 90))
+        buf[start + RECORD_SIZE - 1] = _check(buf, start)
+        self._fold(buf, start)
+        self._queued += 1
+        log.info(log.STATS_SAVED, seq, self.moves)
+
+        if self._queued * RECORD_SIZE >= len(buf):
+            self.flush()
+
+    def flush(self):
+        """
+        Write every queued record to its slot, then the records block if
+        one of them changed it.
+        """
+        queued = self._queued
+        if not queued or not self.enabled:
+            return
+        self._queued = 0
+        first = self._next_seq - queued
+        data = memoryview(self._pending)
+        try:
+            # Queued records go to consecutive slots; split where the
+            # slots wrap round to the start of the region
+            done = 0
+            while done < queued:
+                slot = (first + done) % self.slots
+                n = min(queued - done, self.slots - slot)
+                self.region.write(
+                    slot * RECORD_SIZE,
+                    data[done * RECORD_SIZE:(done + n) * RECORD_SIZE],
+                )
+                done += n
+            if self._records_dirty:
+                self._write_records()
+        except OSError as e:
+            log.error(log.STATS_WRITE_FAILED, e.errno or 0)
+            self.enabled = False
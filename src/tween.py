@@ -0,0 +1,56 @@
+# Frame-driven tweens for screen animations.
+#
+# A tween does not sleep or loop: it is advanced by the frame's dt from
+# the game loop and calls an apply function with the current progress,
+# so inputs and lights keep running while it plays.
+
+
+class Tween:
+    """
+    Progress from 0.0 to 1.0 over a fixed duration.
+
+    Parameters:
+    - duration: length in seconds
+    - apply: called as apply(progress) on every advance and at the end
+    - easing: optional curve applied to the linear progress
+    - on_done: optional callback run once when the tween completes
+    """
+
+    def __init__(self, duration, apply, easing=None, on_done=None):
+        self.duration = duration
+        self.apply = apply
+        self.easing = easing
+        self.on_done = on_done
+        self.elapsed = 0.0
+        self.active = True
+        apply(0.0)
+
+    def advance(self, dt):
+        """
+        Move the tween forward by dt seconds.
+        Returns True while it is still running.
+        """
+        if not self.active:
+            return False
+
+        self.elapsed += dt
+        if self.elapsed >= self.duration:
+            self.finish()
+            return False
+
+        progress = self.elapsed / self.duration
+        if self.easing:
+            progress = self.easing(progress)
+        self.apply(progress)
+        return True
+
+    def finish(self):
+        """
+        Jump straight to the end state (used to skip an animation).
+        """
+        if not self.active:
+            return
+        self.active = False
+        self.apply(1.0)
+        if self.on_done:
+            self.on_done()